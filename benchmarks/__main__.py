@@ -0,0 +1,52 @@
+"""
+Phase 3 ベンチマーク - エントリーポイント
+
+使用例:
+    python -m benchmarks --projects 20 --issues 100 --history 20 --output bench/latest.json
+    python -m benchmarks --compare bench/baseline.json --threshold 1.25
+"""
+import argparse
+import json
+import sys
+from benchmarks.runner import BenchmarkRunner, compare_results, format_report, save_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Phase 3 ベンチマーク')
+    parser.add_argument('--projects', type=int, default=10, help='プロジェクト数 (N)')
+    parser.add_argument('--issues', type=int, default=50, help='プロジェクトあたりの問題数 (M)')
+    parser.add_argument('--history', type=int, default=10, help='問題あたりの履歴数 (K)')
+    parser.add_argument('--items', type=int, default=50, help='依頼・配置・テスト・バグの各件数')
+    parser.add_argument('--files', type=int, default=20, help='コマンド生成対象のファイル数')
+    parser.add_argument('--lines', type=int, default=200, help='ファイルあたりの行数')
+    parser.add_argument('--repeat', type=int, default=5, help='各計測の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=42, help='乱数シード')
+    parser.add_argument('--no-ui', action='store_true', help='タブの refresh 計測を省略')
+    parser.add_argument('--output', help='結果JSONの保存先')
+    parser.add_argument('--compare', help='比較対象（基準）の結果JSON')
+    parser.add_argument('--threshold', type=float, default=1.2, help='回帰とみなす中央値の倍率')
+    args = parser.parse_args(argv)
+
+    runner = BenchmarkRunner(
+        projects=args.projects, issues=args.issues, history=args.history, items=args.items,
+        files=args.files, lines=args.lines, repeat=args.repeat, seed=args.seed,
+        include_ui=not args.no_ui
+    )
+    results = runner.run()
+
+    regressions = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        results['regressions'] = regressions
+
+    if args.output:
+        save_results(results, args.output)
+
+    print(format_report(results, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
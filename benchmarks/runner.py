@@ -0,0 +1,308 @@
+"""
+ベンチマーク実行・結果保存・回帰判定
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from benchmarks.synthetic import SyntheticDataGenerator
+from models.implementation_manager import ImplementationManager
+from models.implementation_project import ImplementationProject
+from utils.code_generator import CodeGenerator
+from utils.design_index import DesignIndex
+from utils.duplicate_detector import DuplicateDetector
+from utils.exporter import Exporter
+from utils.file_handler import FileHandler
+from utils.issue_analytics import IssueAnalytics
+from utils.json_bulk_importer import JSONBulkImporter
+from utils.prompt_generator import PromptGenerator, PromptSectionCache
+from utils.search_index import SearchIndex
+from utils.validators import Validators
+
+# (属性名, モジュール, クラス名) - MainWindow の TAB_SPECS と同じ並び
+TAB_CLASSES = [
+    ('request_tab', 'ui.request_tab', 'RequestTab'),
+    ('deploy_tab', 'ui.deploy_tab', 'DeployTab'),
+    ('test_tab', 'ui.test_tab', 'TestTab'),
+    ('issue_tab', 'ui.issue_tab', 'IssueTab'),
+    ('analytics_tab', 'ui.analytics_tab', 'AnalyticsTab'),
+]
+
+
+class _TabHost:
+    """タブが参照する MainWindow の最小限の代役"""
+
+    def __init__(self, project: ImplementationProject, config_manager, manager: ImplementationManager):
+        self.current_project = project
+        self.config_manager = config_manager
+        self.manager = manager
+
+    def save_current_project(self):
+        pass
+
+
+class BenchmarkRunner:
+    """合成データで主要処理の所要時間を計測するクラス"""
+
+    def __init__(self, projects: int = 10, issues: int = 50, history: int = 10, items: int = 50,
+                 files: int = 20, lines: int = 200, repeat: int = 5, seed: int = 42,
+                 include_ui: bool = True):
+        self.params = {
+            'projects': projects,
+            'issues': issues,
+            'history': history,
+            'items': items,
+            'files': files,
+            'lines': lines,
+            'repeat': repeat,
+            'seed': seed
+        }
+        self.repeat = repeat
+        self.include_ui = include_ui
+        self.generator = SyntheticDataGenerator(seed)
+        self.results: Dict[str, Dict] = {}
+        self.skipped: Dict[str, str] = {}
+        self.meta: Dict = {}
+
+    def measure(self, name: str, fn: Callable, setup: Optional[Callable] = None):
+        """fn を repeat 回実行して所要時間を記録（setup の戻り値を引数に渡す）"""
+        samples = []
+        for _ in range(self.repeat):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            fn(*args)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        self.results[name] = {
+            'min_ms': round(min(samples), 3),
+            'median_ms': round(statistics.median(samples), 3),
+            'mean_ms': round(statistics.fmean(samples), 3),
+            'max_ms': round(max(samples), 3),
+            'runs': len(samples)
+        }
+
+    def run(self) -> Dict:
+        """全ベンチマークを一時ディレクトリ内で実行"""
+        original_cwd = os.getcwd()
+        with tempfile.TemporaryDirectory(prefix='phase3_bench_') as workdir:
+            os.chdir(workdir)
+            try:
+                self._run_in(Path(workdir))
+            finally:
+                os.chdir(original_cwd)
+
+        return self.to_dict()
+
+    def _run_in(self, workdir: Path):
+        p = self.params
+        data_file = workdir / 'data' / 'phase3_implementations.json'
+        data_file.parent.mkdir(parents=True, exist_ok=True)
+
+        data = self.generator.generate_manager_data(p['projects'], p['issues'], p['history'], p['items'])
+        FileHandler.save_json(data, str(data_file))
+        self.meta['data_file_bytes'] = data_file.stat().st_size
+
+        # 永続化
+        manager = ImplementationManager(str(data_file), autoload=False)
+        self.measure('manager.load_projects', manager.load_projects)
+        self.measure('manager.save_projects', manager.save_projects)
+
+        project = manager.projects[0]
+
+        # JSON一括インポート（毎回元の状態のコピーに適用）
+        payload = self.generator.generate_bulk_payload(p['issues'], p['items'])
+        snapshot = project.to_dict()
+        self.measure(
+            'json_bulk_importer.import_to_project',
+            JSONBulkImporter.import_to_project,
+            lambda: (ImplementationProject(snapshot), payload)
+        )
+
+        # プロンプト生成
+        self.measure('prompt_generator.generate_full_prompt',
+                     lambda: PromptGenerator.generate_full_prompt(project),
+                     lambda: PromptSectionCache.clear() or ())
+        self.measure('prompt_generator.generate_full_prompt.cached',
+                     lambda: PromptGenerator.generate_full_prompt(project))
+
+        # 設計要素の関連度検索（依頼1件あたり4種別を検索）
+        design = self.generator.generate_phase2_design(p['items'] * 4)
+        self.measure('design_index.build', lambda: DesignIndex.from_phase2(design))
+        design_index = DesignIndex.from_phase2(design)
+        query = f"{project.code_requests[0]['function_name']} {project.code_requests[0]['details']}"
+        self.measure('design_index.search',
+                     lambda: design_index.search_by_kind(query, {'model': 3, 'screen': 3, 'feature': 3, 'constraint': 3}))
+        
+        # 全文検索（全プロジェクトの索引構築・1件変更後の差分更新・検索）
+        self.measure('search_index.build', lambda: SearchIndex().sync(manager.projects))
+        search_index = SearchIndex()
+        search_index.sync(manager.projects)
+
+        def edited_copy():
+            # 毎回元の状態に戻した索引に、問題を1件追加したプロジェクトを反映する
+            search_index.update_project(project)
+            edited = ImplementationProject(snapshot)
+            edited.add_issue("検索 ベンチマーク", "差分更新 の 計測")
+            return (edited,)
+        self.measure('search_index.update_project', search_index.update_project, edited_copy)
+        search_query = project.issues[0].title.split()[0]
+        self.measure('search_index.search', lambda: search_index.search(search_query))
+
+        # 問題ライフサイクル集計（キャッシュなしの全件集計・1プロジェクト変更後の再集計）
+        def cold_analytics():
+            IssueAnalytics.clear()
+            return ()
+        self.measure('issue_analytics.summarize.cold', lambda: IssueAnalytics.summarize(manager.projects), cold_analytics)
+
+        def edited_analytics():
+            IssueAnalytics.summarize(manager.projects)
+            project.bump_revision()
+            return ()
+        self.measure('issue_analytics.summarize.edited', lambda: IssueAnalytics.summarize(manager.projects), edited_analytics)
+
+        # 重複検出（全プロジェクトの MinHash 索引構築・新規問題1件の類似検索）
+        self.measure('duplicate_detector.build', lambda: DuplicateDetector().sync(manager.projects))
+        detector = DuplicateDetector()
+        detector.sync(manager.projects)
+        issue = project.issues[0]
+        self.measure('duplicate_detector.find_similar',
+                     lambda: detector.find_similar(issue.title, issue.description, project_id=project.project_id))
+        self._expect_exact_duplicate(detector, project)
+
+        # Phase 4エクスポート（エクスポート可能な状態のプロジェクトで計測）
+        ready_snapshot = self.generator.generate_project(
+            9999, p['issues'], p['history'], p['items'], ready=True
+        ).to_dict()
+        exporter = Exporter()
+        self.measure(
+            'exporter.export_to_phase4',
+            lambda proj: self._expect_success(exporter.export_to_phase4(proj)),
+            lambda: (ImplementationProject(ready_snapshot),)
+        )
+        self.measure('validators.calculate_data_checksum',
+                     lambda: Validators.calculate_data_checksum(ready_snapshot))
+
+        # シェルコマンド生成
+        files = self.generator.generate_code_files(p['files'], p['lines'])
+        work_dir = str(workdir / 'work')
+        self.measure('code_generator.powershell',
+                     lambda: CodeGenerator.generate_powershell_commands(work_dir, files))
+        self.measure('code_generator.terminal',
+                     lambda: CodeGenerator.generate_terminal_commands(work_dir, files))
+        self.measure('code_generator.cmd',
+                     lambda: CodeGenerator.generate_cmd_commands(work_dir, files))
+
+        if self.include_ui:
+            self._run_tab_benchmarks(manager, project, workdir)
+
+    @staticmethod
+    def _expect_success(result):
+        if not result[0]:
+            raise RuntimeError(result[1])
+
+    @staticmethod
+    def _expect_exact_duplicate(detector: DuplicateDetector, project: ImplementationProject):
+        """索引済みの問題・バグと同じ内容が類似度 1.0 で見つかることを確認（インポート時の照合と同じ経路）"""
+        for key, document in (DuplicateDetector.issue_document(project.project_id, project.issues[0]),
+                              DuplicateDetector.bug_document(project.project_id, project.bugs[0])):
+            matches = detector.find_similar_text(document['text'], kinds=[document['kind']],
+                                                 project_id=project.project_id, limit=1)
+            if not matches or matches[0]['similarity'] != 1.0:
+                raise RuntimeError(f"同じ内容の {key} の類似度が 1.0 になりません: {matches}")
+
+    def _run_tab_benchmarks(self, manager: ImplementationManager, project: ImplementationProject, workdir: Path):
+        """各タブの refresh をオフスクリーン Qt で計測"""
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        try:
+            import importlib
+            from PySide6.QtWidgets import QApplication
+        except ImportError as e:
+            self.skipped['tabs'] = f"PySide6 を読み込めません: {e}"
+            return
+
+        from utils.config_manager import ConfigManager
+
+        app = QApplication.instance() or QApplication([])
+        host = _TabHost(project, ConfigManager(str(workdir / 'config.json')), manager)
+
+        for attr, module_name, class_name in TAB_CLASSES:
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+            tab = tab_class(host)
+            self.measure(f"tab.{attr}.refresh", tab.refresh)
+            tab.deleteLater()
+
+        # 履歴の長い問題の履歴ダイアログ（最初のページだけを表示する）
+        from ui.issue_tab import IssueHistoryDialog
+        long_issue = self.generator.generate_issue(1, self.params['history'] * 100)
+        self.measure('dialog.issue_history.open', lambda: IssueHistoryDialog(long_issue).deleteLater())
+        app.processEvents()
+
+    def to_dict(self) -> Dict:
+        """結果を保存用の辞書に変換"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'params': self.params,
+            'meta': self.meta,
+            'results': self.results,
+            'skipped': self.skipped
+        }
+
+
+def save_results(results: Dict, filepath: str):
+    """結果をJSONで保存"""
+    path = Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    FileHandler.save_json(results, str(path))
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 1.2) -> List[Dict]:
+    """基準結果と比較し、中央値が threshold 倍を超えた計測を回帰として返す"""
+    regressions = []
+    # パラメータが異なる場合でも比較はするが、結果に明記する
+    note = 'params differ' if current.get('params') != baseline.get('params') else ''
+
+    for name, result in current.get('results', {}).items():
+        base = baseline.get('results', {}).get(name)
+        if not base or base['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / base['median_ms']
+        if ratio > threshold:
+            regressions.append({
+                'name': name,
+                'baseline_ms': base['median_ms'],
+                'current_ms': result['median_ms'],
+                'ratio': round(ratio, 2),
+                'note': note
+            })
+    return regressions
+
+
+def format_report(results: Dict, regressions: List[Dict] = None) -> str:
+    """結果を表形式のテキストにする"""
+    lines = [f"Phase 3 ベンチマーク ({results['timestamp'][:19]})", f"params: {json.dumps(results['params'])}", ""]
+    width = max((len(name) for name in results['results']), default=10)
+    lines.append(f"{'name'.ljust(width)}  {'median':>10}  {'min':>10}  {'max':>10}")
+    for name, r in results['results'].items():
+        lines.append(f"{name.ljust(width)}  {r['median_ms']:>8.2f}ms  {r['min_ms']:>8.2f}ms  {r['max_ms']:>8.2f}ms")
+
+    for name, reason in results.get('skipped', {}).items():
+        lines.append(f"(skipped {name}: {reason})")
+
+    if regressions is not None:
+        lines.append("")
+        if regressions:
+            lines.append(f"⚠️ 回帰: {len(regressions)}件")
+            for r in regressions:
+                lines.append(f"- {r['name']}: {r['baseline_ms']:.2f}ms → {r['current_ms']:.2f}ms (x{r['ratio']})")
+        else:
+            lines.append("✅ 回帰なし")
+
+    return "\n".join(lines)
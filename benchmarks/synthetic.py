@@ -0,0 +1,209 @@
+"""
+ベンチマーク用の合成プロジェクトデータ生成
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+from models.implementation_project import ImplementationProject
+from models.issue import Issue, IssueHistory
+
+WORDS = [
+    'ユーザー', 'ログイン', '登録', '画面', 'データ', '保存', '読み込み', '検索',
+    'エクスポート', 'インポート', '設定', '一覧', '詳細', '削除', '更新', '認証',
+    'エラー', 'タイムアウト', '文字化け', 'レイアウト', 'JSON', 'PySide6', 'ファイル', '履歴'
+]
+
+ISSUE_STATUSES = ['発見', '対応中', '解決', '再発']
+
+
+class SyntheticDataGenerator:
+    """N プロジェクト × M 問題 × K 履歴 × 各種レコードの合成データを生成するクラス"""
+
+    def __init__(self, seed: int = 42):
+        self.random = random.Random(seed)
+        self.base_time = datetime(2025, 1, 1, 9, 0, 0)
+
+    def _sentence(self, words: int) -> str:
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def _timestamp(self, offset_minutes: int) -> str:
+        return (self.base_time + timedelta(minutes=offset_minutes)).isoformat()
+
+    def generate_issue(self, issue_no: int, history_count: int, resolved: bool = False) -> Issue:
+        """履歴付きの問題を生成"""
+        issue = Issue()
+        issue.issue_id = f"ISS{issue_no:03d}"
+        issue.title = self._sentence(4)
+        issue.description = self._sentence(20)
+        issue.impact = self.random.choice(['低', '中', '高'])
+        issue.created_at = self._timestamp(issue_no * 60)
+
+        for h in range(max(1, history_count)):
+            entry = IssueHistory()
+            entry.timestamp = self._timestamp(issue_no * 60 + h * 30)
+            if h == 0:
+                entry.status = '発見'
+            elif resolved and h == history_count - 1:
+                entry.status = '解決'
+            else:
+                entry.status = self.random.choice(ISSUE_STATUSES)
+            entry.notes = self._sentence(12)
+            entry.resolution = self._sentence(8) if entry.status == '解決' else ''
+            entry.user = self.random.choice(['manual', 'json_import'])
+            issue.history.append(entry)
+            if entry.status == '再発':
+                issue.recurrence_count += 1
+
+        issue.current_status = issue.history[-1].status
+        issue.last_updated = issue.history[-1].timestamp
+        return issue
+
+    def generate_project(self, index: int, issues: int, history: int, items: int,
+                         ready: bool = False) -> ImplementationProject:
+        """合成プロジェクトを生成（ready=True ならエクスポート可能な状態にする）"""
+        project = ImplementationProject()
+        project.project_id = f"BENCH_{index:04d}"
+        project.project_name = f"ベンチマークプロジェクト {index}"
+        project.import_info = {
+            'source_file': f"export_BENCH_{index:04d}_Phase2.json",
+            'import_date': self._timestamp(0),
+            'phase1_data': {
+                'purpose': self._sentence(30),
+                'main_features': [self._sentence(2) for _ in range(5)],
+                'constraints': [self._sentence(6) for _ in range(3)]
+            },
+            'design_data': {
+                'tech_stack': {'gui_framework': 'PySide6 6.10.0', 'data_storage': 'JSON'},
+                'data_models': [
+                    {'model_name': f"Model{i}", 'description': self._sentence(10)} for i in range(10)
+                ],
+                'screens': [
+                    {'screen_name': f"Screen{i}", 'description': self._sentence(10)} for i in range(10)
+                ]
+            }
+        }
+
+        project.issues = [
+            self.generate_issue(i + 1, history, resolved=ready) for i in range(issues)
+        ]
+        project.issue_counter = issues + 1
+
+        for i in range(items):
+            request_date = self._timestamp(i * 45)
+            project.code_requests.append({
+                'id': i + 1,
+                'function_name': self._sentence(3),
+                'details': self._sentence(40),
+                'request_date': request_date,
+                'received_date': request_date if ready or i % 2 else None,
+                'status': '受領済み' if ready or i % 2 else '依頼中',
+                'related_issues': [f"ISS{(i % max(1, issues)) + 1:03d}"]
+            })
+            project.deployed_files.append({
+                'id': i + 1,
+                'filename': f"module_{i}.py",
+                'filepath': f"./pkg{i % 5}/module_{i}.py",
+                'deployed_date': request_date,
+                'status': self.random.choice(['OK', 'NG', '未確認']),
+                'notes': self._sentence(6)
+            })
+            project.test_results.append({
+                'id': i + 1,
+                'function_name': self._sentence(3),
+                'test_date': request_date,
+                'result': self.random.choice(['OK', 'NG']),
+                'notes': self._sentence(8)
+            })
+            status = '解決済み' if ready else self.random.choice(['未対応', '対応中', '解決済み'])
+            project.bugs.append({
+                'id': i + 1,
+                'title': self._sentence(4),
+                'description': self._sentence(20),
+                'severity': self.random.choice(['低', '中', '高', '致命的']),
+                'found_date': request_date,
+                'status': status,
+                'resolved_date': request_date if status == '解決済み' else None
+            })
+
+        return project
+
+    def generate_phase2_design(self, entries: int) -> Dict:
+        """設計要素を entries 件ずつ持つ Phase 2 データ（phase1_data / design_data）を生成"""
+        return {
+            'phase1_data': {
+                'purpose': self._sentence(30),
+                'main_features': [self._sentence(2) + '機能' for _ in range(entries)],
+                'constraints': [self._sentence(6) for _ in range(max(1, entries // 10))]
+            },
+            'design_data': {
+                'tech_stack': {'gui_framework': 'PySide6 6.10.0', 'data_storage': 'JSON'},
+                'data_models': [
+                    {'model_name': f"Model{i}", 'description': self._sentence(10),
+                     'fields': [{'name': self._sentence(1), 'type': 'str'} for _ in range(5)]}
+                    for i in range(entries)
+                ],
+                'screens': [
+                    {'screen_name': f"Screen{i}", 'description': self._sentence(10),
+                     'ui_elements': [self._sentence(2) for _ in range(5)]}
+                    for i in range(entries)
+                ]
+            }
+        }
+    
+    def generate_projects(self, projects: int, issues: int, history: int, items: int) -> List[ImplementationProject]:
+        """合成プロジェクトのリストを生成"""
+        return [self.generate_project(i + 1, issues, history, items) for i in range(projects)]
+
+    def generate_manager_data(self, projects: int, issues: int, history: int, items: int) -> Dict:
+        """ImplementationManager のデータファイル形式で生成"""
+        return {
+            'version': '1.0',
+            'projects': [p.to_dict() for p in self.generate_projects(projects, issues, history, items)],
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def generate_bulk_payload(self, issues: int, items: int) -> Dict:
+        """JSONBulkImporter 用のペイロードを生成"""
+        return {
+            'issue_updates': [
+                {
+                    'issue_id': f"ISS{i + 1:03d}",
+                    'action': 'update',
+                    'new_status': self.random.choice(ISSUE_STATUSES),
+                    'notes': self._sentence(10)
+                } for i in range(issues)
+            ] + [
+                {
+                    'action': 'create',
+                    'title': self._sentence(4),
+                    'description': self._sentence(20),
+                    'impact': '中',
+                    'new_status': '発見'
+                } for _ in range(issues)
+            ],
+            'code_requests': [
+                {'function_name': self._sentence(3), 'details': self._sentence(30)} for _ in range(items)
+            ],
+            'deployed_files': [
+                {'filename': f"f{i}.py", 'filepath': f"./f{i}.py", 'status': 'OK'} for i in range(items)
+            ],
+            'test_results': [
+                {'function_name': self._sentence(3), 'result': 'OK'} for _ in range(items)
+            ],
+            'bugs': [
+                {'title': self._sentence(4), 'description': self._sentence(15)} for _ in range(items)
+            ]
+        }
+
+    def generate_code_files(self, files: int, lines: int) -> List[Dict]:
+        """CodeGenerator 用のファイル情報を生成"""
+        return [
+            {
+                'filename': f"module_{i}.py",
+                'filepath': f"./pkg{i % 5}/module_{i}.py",
+                'description': self._sentence(5),
+                'content': "\n".join(
+                    f"    value_{j} = '{self._sentence(3)}'  # {j}" for j in range(lines)
+                )
+            } for i in range(files)
+        ]
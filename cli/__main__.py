@@ -0,0 +1,15 @@
+"""
+Phase 3 実装管理ツール - ヘッドレスCLIエントリーポイント
+
+使用例:
+    python -m cli stats --json
+    python -m cli import-phase2 exports/*.json
+    python -m cli export --all
+    python -m cli bulk-import responses/ --project P2_P20251029_002
+    python -m cli prompt full --all --output-dir prompts/
+"""
+import sys
+from cli.commands import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,459 @@
+"""
+ヘッドレスCLI - インポート・エクスポート・プロンプト生成・統計
+
+PySide6 を読み込まずに models / utils だけで動作するため、バッチジョブや
+パイプラインから利用できる。全サブコマンドは --json で機械可読な出力を返す。
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+from models.implementation_manager import ImplementationManager
+from models.implementation_project import ImplementationProject
+from utils.config_manager import ConfigManager
+from utils.exporter import Exporter, EXPORT_FORMATS
+from utils.json_bulk_importer import JSONBulkImporter
+from utils.search_index import SearchIndex, DOC_LABELS
+from utils.duplicate_detector import DuplicateDetector, DUPLICATE_THRESHOLD
+from utils.issue_analytics import IssueAnalytics
+from utils.prompt_generator import PromptGenerator
+from utils.implementation_prompt_generator import ImplementationPromptGenerator
+
+DEFAULT_DATA_FILE = 'data/phase3_implementations.json'
+
+
+class CLIError(Exception):
+    """CLI実行時のエラー"""
+
+
+def _emit(args, payload: Dict, text: str):
+    """結果を --json 指定に応じて出力"""
+    if args.json:
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    else:
+        print(text)
+
+
+def _select_projects(manager: ImplementationManager, args) -> List[ImplementationProject]:
+    """--project / --all 指定から対象プロジェクトを選択"""
+    if getattr(args, 'all', False) or not args.project:
+        return list(manager.projects)
+
+    projects = []
+    for project_id in args.project:
+        project = manager.get_project_by_id(project_id)
+        if project is None:
+            raise CLIError(f"プロジェクト '{project_id}' が見つかりません")
+        projects.append(project)
+    return projects
+
+
+def _get_single_project(manager: ImplementationManager, project_id: str) -> ImplementationProject:
+    """IDでプロジェクトを1件取得"""
+    project = manager.get_project_by_id(project_id)
+    if project is None:
+        raise CLIError(f"プロジェクト '{project_id}' が見つかりません")
+    return project
+
+
+def _project_stats(project: ImplementationProject) -> Dict:
+    """プロジェクトの統計情報を作成"""
+    is_ready, errors = project.is_ready_for_export()
+    return {
+        'project_id': project.project_id,
+        'project_name': project.project_name,
+        'issues': len(project.issues),
+        'unresolved_issues': project.get_unresolved_issues_count(),
+        'recurrent_issues': len(project.get_recurrent_issues()),
+        'code_requests': len(project.code_requests),
+        'pending_requests': sum(1 for r in project.code_requests if r['status'] == '依頼中'),
+        'deployed_files': len(project.deployed_files),
+        'test_results': len(project.test_results),
+        'bugs': len(project.bugs),
+        'unresolved_bugs': project.get_unresolved_bugs_count(),
+        'ready_for_export': is_ready,
+        'readiness_errors': errors,
+        'updated_at': project.updated_at
+    }
+
+
+def cmd_list(args, manager: ImplementationManager) -> int:
+    """プロジェクト一覧を表示"""
+    projects = [
+        {'project_id': p.project_id, 'project_name': p.project_name, 'updated_at': p.updated_at}
+        for p in manager.projects
+    ]
+    text = "\n".join(f"{p['project_id']}\t{p['project_name']}" for p in projects) or "(プロジェクトなし)"
+    _emit(args, {'projects': projects}, text)
+    return 0
+
+
+def cmd_stats(args, manager: ImplementationManager) -> int:
+    """プロジェクト統計を表示"""
+    stats = [_project_stats(p) for p in _select_projects(manager, args)]
+
+    lines = []
+    for s in stats:
+        ready = "✅ エクスポート可" if s['ready_for_export'] else "⏳ 未完了"
+        lines.append(f"## {s['project_id']}: {s['project_name']} ({ready})")
+        lines.append(f"- 問題: {s['issues']}件（未解決: {s['unresolved_issues']}件 / 再発: {s['recurrent_issues']}件）")
+        lines.append(f"- コード依頼: {s['code_requests']}件（依頼中: {s['pending_requests']}件）")
+        lines.append(f"- 配置ファイル: {s['deployed_files']}件 / テスト結果: {s['test_results']}件")
+        lines.append(f"- バグ: {s['bugs']}件（未解決: {s['unresolved_bugs']}件）")
+        lines.append("")
+
+    _emit(args, {'projects': stats}, "\n".join(lines).rstrip() or "(プロジェクトなし)")
+    return 0
+
+
+def _format_days(days) -> str:
+    return "-" if days is None else f"{days:.1f}日"
+
+
+def cmd_analytics(args, manager: ImplementationManager) -> int:
+    """問題ライフサイクル指標（平均解決時間・再発率・未解決の経過日数・バグ重要度）を表示"""
+    summary = IssueAnalytics.summarize(_select_projects(manager, args))
+
+    sections = [(f"{r['project_id']}: {r['project_name']}", r) for r in summary['projects']]
+    sections.append(("全体", summary['total']))
+
+    lines = []
+    for name, m in sections:
+        lines.append(f"## {name}")
+        lines.append(f"- 問題: {m['issues']}件（未解決: {m['unresolved']}件 / 最古: {_format_days(m['oldest_open_days'])}）")
+        lines.append(f"- 解決時間: 平均 {_format_days(m['mttr_days'])} / 中央値 {_format_days(m['median_resolution_days'])}"
+                     f"（{m['resolutions']}回）")
+        lines.append(f"- 再発: {m['recurrent_issues']}件 / {m['recurrences']}回（再発率 {m['recurrence_rate']:.1%}）")
+        lines.append("- 経過日数: " + " / ".join(f"{label} {count}件" for label, count in m['aging'].items()))
+        lines.append("- バグ: " + " / ".join(
+            f"{severity} {b['total']}件（未解決 {b['unresolved']}）" for severity, b in m['bugs'].items() if b['total']
+        ))
+        lines.append("")
+
+    _emit(args, summary, "\n".join(lines).rstrip())
+    return 0
+
+
+def cmd_search(args, manager: ImplementationManager) -> int:
+    """問題・履歴・コード依頼・バグを全文検索"""
+    index = SearchIndex()
+    index.sync(_select_projects(manager, args))
+    results = index.search(args.query, limit=args.limit, kinds=args.kind)
+
+    text = "\n".join(
+        f"[{r['project_id']}] {DOC_LABELS[r['kind']]} {r['ref']}: {r['title']}\n  {r['snippet']}"
+        for r in results
+    )
+    _emit(args, {'query': args.query, 'documents': len(index), 'results': results}, text or "(該当なし)")
+    return 0
+
+
+def cmd_duplicates(args, manager: ImplementationManager) -> int:
+    """プロジェクトごとに重複の可能性がある問題・バグの組を一覧"""
+    results = []
+    lines = []
+    for project in _select_projects(manager, args):
+        detector = DuplicateDetector(args.threshold)
+        detector.update_project(project)
+        pairs = detector.find_duplicate_pairs()
+        results.append({'project_id': project.project_id, 'pairs': pairs})
+        if pairs:
+            lines.append(f"=== {project.project_name} ({project.project_id}) ===")
+            for pair in pairs:
+                left, right = pair['left'], pair['right']
+                lines.append(f"- {pair['similarity']:.2f}  {DOC_LABELS[left['kind']]} {left['ref']}「{left['title']}」"
+                             f" ≒ {DOC_LABELS[right['kind']]} {right['ref']}「{right['title']}」")
+            lines.append("")
+
+    _emit(args, {'threshold': args.threshold, 'results': results}, "\n".join(lines).rstrip() or "(重複の候補なし)")
+    return 0
+
+
+def cmd_import_phase2(args, manager: ImplementationManager) -> int:
+    """Phase 2エクスポートを一括インポート（ファイルごとに並列処理、保存は最後に1回のみ）"""
+    report = manager.import_batch(args.files, args.workers)
+    results = report['results']
+
+    text = "\n".join(
+        f"{'✅' if r['success'] else '❌'} {r['file']}: {r['message']}" for r in results
+    )
+    _emit(args, {'imported': report['succeeded'], 'failed': report['failed'],
+                 'workers': report['workers'], 'results': results}, text)
+    return 0 if report['failed'] == 0 else 1
+
+
+def cmd_export(args, manager: ImplementationManager) -> int:
+    """Phase 4へ一括エクスポート（プロジェクトごとに並列処理、保存は最後に1回のみ）"""
+    output_format = args.format or ConfigManager(args.config).get_export_format()
+    report = manager.export_batch(
+        _select_projects(manager, args), output_format,
+        reference_blobs=not args.embed_blobs, max_workers=args.workers
+    )
+    results = report['results']
+
+    text = "\n".join(
+        f"{'✅' if r['success'] else '❌'} {r['project_id']}: {r['filepath'] or r['message']}"
+        for r in results
+    )
+    _emit(args, {'exported': report['succeeded'], 'failed': report['failed'],
+                 'workers': report['workers'], 'results': results}, text)
+    return 0 if report['failed'] == 0 else 1
+
+
+def _format_item_refs(refs: Dict[str, List[int]]) -> str:
+    """{セクション: [要素番号]} を表示用の文字列に変換"""
+    return ", ".join(f"{name}[{', '.join(str(i) for i in indexes)}]" for name, indexes in refs.items())
+
+
+def cmd_verify_export(args, manager: ImplementationManager) -> int:
+    """Phase 4エクスポートファイルを Merkle ツリーで検証し、改ざんされた要素を特定"""
+    results = []
+    for filepath in args.files:
+        result = Exporter.verify_export(filepath)
+        result['file'] = filepath
+        results.append(result)
+
+    lines = []
+    for r in results:
+        if r['valid']:
+            lines.append(f"✅ {r['file']}: 検証OK")
+            continue
+        lines.append(f"❌ {r['file']}: 検証NG")
+        if not r['root_matches']:
+            lines.append("  - チェックサムと Merkle 情報が一致しません")
+        for label, key in (('改ざん', 'tampered'), ('追加', 'added'), ('削除', 'removed')):
+            if r[key]:
+                lines.append(f"  - {label}: {_format_item_refs(r[key])}")
+        for ref, status in r['blobs'].items():
+            if status != 'ok':
+                lines.append(f"  - 参照ファイル{'なし' if status == 'missing' else '不一致'}: {ref}")
+
+    _emit(args, {'results': results}, "\n".join(lines))
+    return 0 if all(r['valid'] for r in results) else 1
+
+
+def cmd_bulk_import(args, manager: ImplementationManager) -> int:
+    """Claude回答JSONを一括インポート（ファイル・フォルダ・JSONL）"""
+    default_project = _get_single_project(manager, args.project) if args.project else None
+
+    payloads = []
+    for path in args.paths:
+        if Path(path).is_file() and Path(path).suffix == '.json':
+            payloads.append((Path(path).name, Path(path).read_text(encoding='utf-8-sig')))
+        else:
+            payloads.extend(JSONBulkImporter.load_batch_payloads(path))
+
+    validated = JSONBulkImporter.validate_batch(payloads, args.workers)
+    success, message, stats = JSONBulkImporter.import_batch(
+        manager.projects, validated, default_project
+    )
+
+    if success and not args.dry_run:
+        manager.save_projects()
+
+    _emit(args, {'success': success, 'dry_run': args.dry_run, 'stats': stats}, message)
+    return 0 if success and not stats['errors'] else 1
+
+
+def _write_prompt(args, project_id: str, kind: str, prompt: str, results: List[Dict]):
+    """プロンプトを出力先に書き出し、結果を記録"""
+    entry = {'project_id': project_id, 'kind': kind, 'length': len(prompt)}
+
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        filepath = output_dir / f"{project_id}_{kind}.md"
+        filepath.write_text(prompt, encoding='utf-8')
+        entry['filepath'] = str(filepath)
+    elif not args.json:
+        print(prompt)
+    else:
+        entry['prompt'] = prompt
+
+    results.append(entry)
+
+
+def cmd_prompt(args, manager: ImplementationManager) -> int:
+    """プロンプトを生成"""
+    config = ConfigManager(args.config)
+    work_dir = args.work_dir or config.get_work_directory()
+    shell_type = args.shell or config.get_shell_type()
+    results = []
+
+    if args.kind == 'full':
+        token_budget = config.get_prompt_token_budget() if args.token_budget is None else args.token_budget
+        for project in _select_projects(manager, args):
+            prompt, stats = PromptGenerator.generate_budgeted_prompt(project, token_budget)
+            _write_prompt(args, project.project_id, 'full', prompt, results)
+            results[-1]['tokens'] = stats['tokens']
+            results[-1]['summarized'] = stats['issues_summarized']
+            results[-1]['elided'] = stats['issues_elided']
+            if args.record:
+                PromptGenerator.record_watermark(project, 'full', stats['tokens'])
+    elif args.kind == 'delta':
+        for project in _select_projects(manager, args):
+            prompt, stats = PromptGenerator.generate_delta_prompt(project)
+            _write_prompt(args, project.project_id, 'delta', prompt, results)
+            results[-1].update({k: stats[k] for k in ('mode', 'since', 'tokens')})
+            results[-1]['changed'] = stats.get('changed')
+            if args.record:
+                PromptGenerator.record_watermark(project, stats['mode'], stats['tokens'])
+    else:
+        if not args.project or len(args.project) != 1:
+            raise CLIError(f"'{args.kind}' プロンプトには --project を1つ指定してください")
+        project = _get_single_project(manager, args.project[0])
+        context = ImplementationPromptGenerator.get_project_context(project)
+
+        if args.kind == 'mvp':
+            prompt = ImplementationPromptGenerator.generate_mvp_prompt(
+                project.project_name, None, work_dir, shell_type, context=context
+            )
+        elif args.kind == 'next':
+            prompt = ImplementationPromptGenerator.generate_next_prompt_for_project(project, shell_type)
+        else:
+            if args.request_id is None:
+                raise CLIError(f"'{args.kind}' プロンプトには --request-id を指定してください")
+            request = next((r for r in project.code_requests if r['id'] == args.request_id), None)
+            if request is None:
+                raise CLIError(f"依頼ID {args.request_id} が見つかりません")
+
+            if args.kind == 'impl':
+                prompt = ImplementationPromptGenerator.generate_implementation_prompt(
+                    request, None, shell_type, context=context
+                )
+            else:
+                prompt = ImplementationPromptGenerator.generate_check_prompt(request, work_dir)
+
+        _write_prompt(args, project.project_id, args.kind, prompt, results)
+
+    if args.record and args.kind in ('full', 'delta'):
+        manager.save_projects()
+
+    if args.json:
+        print(json.dumps({'prompts': results}, ensure_ascii=False, indent=2))
+    elif args.output_dir:
+        print("\n".join(f"{r['project_id']}: {r['filepath']}" for r in results))
+    return 0
+
+
+def cmd_prompt_batch(args, manager: ImplementationManager) -> int:
+    """未完了の全依頼のプロンプトを一括生成"""
+    from utils.batch_prompt_generator import BatchPromptGenerator
+
+    config = ConfigManager(args.config)
+    work_dir = args.work_dir or config.get_work_directory()
+    shell_type = args.shell or config.get_shell_type()
+    project = _get_single_project(manager, args.project)
+
+    prompts = BatchPromptGenerator.generate(project, work_dir, shell_type, args.workers)
+    success, message, manifest = BatchPromptGenerator.write(project, prompts, args.output, work_dir, shell_type)
+
+    _emit(args, {'success': success, 'message': message, 'output': args.output, 'manifest': manifest}, message)
+    return 0 if success else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """引数パーサーを構築"""
+    parser = argparse.ArgumentParser(
+        prog='python -m cli',
+        description='Phase 3 実装管理ツール（ヘッドレスCLI）'
+    )
+    parser.add_argument('--data-file', default=DEFAULT_DATA_FILE, help='プロジェクトデータファイル')
+    parser.add_argument('--config', default='config.json', help='設定ファイル')
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力')
+
+    # サブコマンドの後ろでも --json を受け付ける（未指定時は上位の値を維持）
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', default=argparse.SUPPRESS, help='結果をJSONで出力')
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sub = subparsers.add_parser('list', parents=[common], help='プロジェクト一覧')
+    sub.set_defaults(func=cmd_list)
+
+    sub = subparsers.add_parser('stats', parents=[common], help='プロジェクト統計')
+    sub.add_argument('--project', action='append', help='対象プロジェクトID（複数指定可、省略時は全件）')
+    sub.set_defaults(func=cmd_stats)
+
+    sub = subparsers.add_parser('analytics', parents=[common], help='問題ライフサイクル指標')
+    sub.add_argument('--project', action='append', help='対象プロジェクトID（複数指定可、省略時は全件）')
+    sub.set_defaults(func=cmd_analytics)
+
+    sub = subparsers.add_parser('search', parents=[common], help='問題・履歴・コード依頼・バグを全文検索')
+    sub.add_argument('query', help='検索語（スペース区切りで AND 検索）')
+    sub.add_argument('--project', action='append', help='対象プロジェクトID（複数指定可、省略時は全件）')
+    sub.add_argument('--kind', action='append', choices=list(DOC_LABELS), help='対象の種別（複数指定可）')
+    sub.add_argument('--limit', type=int, default=20, help='表示する最大件数')
+    sub.set_defaults(func=cmd_search)
+
+    sub = subparsers.add_parser('duplicates', parents=[common], help='重複の可能性がある問題・バグを一覧')
+    sub.add_argument('--project', action='append', help='対象プロジェクトID（複数指定可、省略時は全件）')
+    sub.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD, help='重複とみなす推定類似度（0〜1）')
+    sub.set_defaults(func=cmd_duplicates)
+
+    sub = subparsers.add_parser('import-phase2', parents=[common], help='Phase 2エクスポートを一括インポート')
+    sub.add_argument('files', nargs='+', help='Phase 2エクスポートファイル')
+    sub.add_argument('--workers', type=int, help='インポートに使うプロセス数')
+    sub.set_defaults(func=cmd_import_phase2)
+
+    sub = subparsers.add_parser('export', parents=[common], help='Phase 4へ一括エクスポート')
+    group = sub.add_mutually_exclusive_group(required=True)
+    group.add_argument('--project', action='append', help='対象プロジェクトID（複数指定可）')
+    group.add_argument('--all', action='store_true', help='全プロジェクトを対象にする')
+    sub.add_argument('--format', choices=EXPORT_FORMATS, help='出力形式（既定は設定ファイルの export_format）')
+    sub.add_argument('--embed-blobs', action='store_true', help='Phase 2の元データを別ファイルにせず埋め込む')
+    sub.add_argument('--workers', type=int, help='エクスポートに使うプロセス数')
+    sub.set_defaults(func=cmd_export)
+
+    sub = subparsers.add_parser('verify-export', parents=[common], help='Phase 4エクスポートファイルを検証')
+    sub.add_argument('files', nargs='+', help='エクスポートファイル')
+    sub.set_defaults(func=cmd_verify_export)
+
+    sub = subparsers.add_parser('bulk-import', parents=[common], help='Claude回答JSONを一括インポート')
+    sub.add_argument('paths', nargs='+', help='JSONファイル・フォルダ・JSONLファイル')
+    sub.add_argument('--project', help='project_id を持たないペイロードの適用先')
+    sub.add_argument('--workers', type=int, help='検証に使うプロセス数')
+    sub.add_argument('--dry-run', action='store_true', help='保存せずに結果のみ表示')
+    sub.set_defaults(func=cmd_bulk_import)
+
+    sub = subparsers.add_parser('prompt', parents=[common], help='プロンプト生成')
+    sub.add_argument('kind', choices=['full', 'delta', 'mvp', 'next', 'impl', 'check'], help='プロンプトの種類')
+    sub.add_argument('--project', action='append', help='対象プロジェクトID（full / delta は複数指定可）')
+    sub.add_argument('--all', action='store_true', help='全プロジェクトを対象にする（full / delta のみ）')
+    sub.add_argument('--record', action='store_true',
+                     help='送信済みとしてウォーターマークを記録（full / delta のみ、次回の delta の基準になる）')
+    sub.add_argument('--token-budget', type=int, help='推定トークン数の上限（full のみ、省略時は設定値、0 は無制限）')
+    sub.add_argument('--request-id', type=int, help='対象の依頼ID（impl / check）')
+    sub.add_argument('--work-dir', help='作業ディレクトリ（省略時は設定値）')
+    sub.add_argument('--shell', choices=['powershell', 'terminal', 'cmd'], help='シェルタイプ（省略時は設定値）')
+    sub.add_argument('--output-dir', help='プロンプトをファイルに書き出すディレクトリ')
+    sub.set_defaults(func=cmd_prompt)
+
+    sub = subparsers.add_parser('prompt-batch', parents=[common],
+                                help='未完了の全依頼の実装・チェックプロンプトを一括生成')
+    sub.add_argument('--project', required=True, help='対象プロジェクトID')
+    sub.add_argument('--output', required=True, help='書き出し先フォルダ、または .zip ファイル')
+    sub.add_argument('--work-dir', help='作業ディレクトリ（省略時は設定値）')
+    sub.add_argument('--shell', choices=['powershell', 'terminal', 'cmd'], help='シェルタイプ（省略時は設定値）')
+    sub.add_argument('--workers', type=int, help='生成に使うスレッド数')
+    sub.set_defaults(func=cmd_prompt_batch)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """CLIエントリーポイント"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        Path(args.data_file).parent.mkdir(parents=True, exist_ok=True)
+        manager = ImplementationManager(args.data_file)
+        return args.func(args, manager)
+    except CLIError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"実行エラー: {str(e)}", file=sys.stderr)
+        return 1
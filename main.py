@@ -1,13 +1,15 @@
 """
 Phase 3 実装管理ツール - メインエントリーポイント
 """
+# 起動トレースの起点とするため最初に読み込む
+from utils.startup_trace import StartupTrace
 import sys
 import json
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import Qt
 from ui.main_window import MainWindow
-from utils.file_handler import FileHandler
+
+StartupTrace.mark('imports')
 
 def setup_directories():
     """必要なディレクトリを作成"""
@@ -45,6 +47,7 @@ def main():
         # アプリケーション起動
         app = QApplication(sys.argv)
         app.setStyle('Fusion')
+        StartupTrace.mark('app_created')
         
         # メインウィンドウ表示
         window = MainWindow()
@@ -2,34 +2,94 @@
 Phase 3 実装プロジェクト管理マネージャー
 """
 import json
+import os
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from models.implementation_project import ImplementationProject
 from utils.file_handler import FileHandler
+from utils.perf import PerfRecorder, timed
+
+# この件数未満のバッチはプロセス起動コストの方が大きいため直列で処理する
+PARALLEL_BATCH_THRESHOLD = 2
+
+
+def _import_job(filepath: str) -> Tuple[bool, str, Optional[Dict]]:
+    """1ファイル分の Phase 2 インポート（プロセスプールから呼ばれる）
+
+    プロジェクトはプロセス間で受け渡すため辞書に変換して返す。
+    """
+    from utils.importer import Importer
+    success, message, project = Importer().import_phase2_project(filepath)
+    return success, message, project.to_dict() if project else None
+
+
+def _export_job(project_data: Dict, output_format: str, reference_blobs: bool) -> Tuple[bool, str, str, Optional[Dict]]:
+    """1プロジェクト分の Phase 4 エクスポート（プロセスプールから呼ばれる）
+
+    子プロセス側のプロジェクトは複製のため、追加されたエクスポート履歴も返す。
+    """
+    from utils.exporter import Exporter
+    project = ImplementationProject(project_data)
+    success, message, filepath = Exporter(output_format, reference_blobs).export_to_phase4(project)
+    return success, message, filepath, project.export_history[-1] if success else None
+
+
+def _run_jobs(func: Callable, jobs: List[Tuple], max_workers: Optional[int] = None) -> Tuple[List, int]:
+    """ジョブをプロセスプールで並列に実行し、入力順の結果と使ったプロセス数を返す"""
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if len(jobs) >= PARALLEL_BATCH_THRESHOLD and workers > 1:
+        # プロセスプールは起動時間に影響するため必要時のみ読み込む
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(func, *zip(*jobs))), workers
+        except (BrokenProcessPool, OSError):
+            # プロセスを起動できない環境では直列にフォールバック
+            pass
+    return [func(*job) for job in jobs], 1
+
+
+def _summarize_batch(results: List[Dict], workers: int) -> Dict:
+    """バッチ処理結果の集計レポート"""
+    succeeded = sum(1 for r in results if r['success'])
+    return {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'workers': workers,
+        'results': results
+    }
+
 
 class ImplementationManager:
     """実装プロジェクトの管理を行うクラス"""
     
-    def __init__(self, data_file: str = 'data/phase3_implementations.json'):
+    def __init__(self, data_file: str = 'data/phase3_implementations.json', autoload: bool = True):
         self.data_file = Path(data_file)
         self.file_handler = FileHandler()
         self.projects: List[ImplementationProject] = []
-        self.load_projects()
+        if autoload:
+            self.load_projects()
     
+    @timed('manager.load_projects')
     def load_projects(self):
         """プロジェクトデータを読み込み"""
         if self.data_file.exists():
             data = self.file_handler.load_json(str(self.data_file))
-            self.projects = [ImplementationProject(p) for p in data.get('projects', [])]
+            with PerfRecorder.span('manager.build_models'):
+                self.projects = [ImplementationProject(p) for p in data.get('projects', [])]
     
+    @timed('manager.save_projects')
     def save_projects(self):
         """プロジェクトデータを保存"""
-        data = {
-            'version': '1.0',
-            'projects': [p.to_dict() for p in self.projects],
-            'last_updated': datetime.now().isoformat()
-        }
+        with PerfRecorder.span('manager.serialize_models'):
+            data = {
+                'version': '1.0',
+                'projects': [p.to_dict() for p in self.projects],
+                'last_updated': datetime.now().isoformat()
+            }
         
         # バックアップ作成
         if self.data_file.exists():
@@ -57,6 +117,8 @@ class ImplementationManager:
     
     def update_project(self, project: ImplementationProject):
         """プロジェクトを更新"""
+        # タブからの直接編集もここを通るため、派生キャッシュを無効化する
+        project.bump_revision()
         for i, p in enumerate(self.projects):
             if p.project_id == project.project_id:
                 self.projects[i] = project
@@ -74,4 +136,72 @@ class ImplementationManager:
     
     def project_exists(self, project_id: str) -> bool:
         """プロジェクトが存在するかチェック"""
-        return any(p.project_id == project_id for p in self.projects)
\ No newline at end of file
+        return any(p.project_id == project_id for p in self.projects)
+    
+    @timed('manager.import_batch')
+    def import_batch(self, filepaths: Iterable[str], max_workers: Optional[int] = None) -> Dict:
+        """複数の Phase 2 エクスポートをプロセスプールで並列にインポート（保存は最後に1回のみ）
+        
+        読み込み・検証・チェックサム照合はファイルごとに子プロセスで行い、
+        既存プロジェクトとの重複判定と追加は入力順に親プロセスで行う。
+        """
+        filepaths = list(filepaths)
+        outcomes, workers = _run_jobs(_import_job, [(path,) for path in filepaths], max_workers)
+        
+        results = []
+        for filepath, (success, message, project_data) in zip(filepaths, outcomes):
+            project = ImplementationProject(project_data) if project_data else None
+            if success and self.project_exists(project.project_id):
+                success, message = False, "このプロジェクトは既にインポート済みです"
+            if success:
+                self.projects.append(project)
+            results.append({
+                'file': filepath,
+                'success': success,
+                'message': message,
+                'project_id': project.project_id if project else None
+            })
+        
+        report = _summarize_batch(results, workers)
+        if report['succeeded']:
+            self.save_projects()
+        return report
+    
+    @timed('manager.export_batch')
+    def export_batch(self, projects: Optional[Iterable[ImplementationProject]] = None,
+                     output_format: str = 'pretty', reference_blobs: bool = True,
+                     max_workers: Optional[int] = None) -> Dict:
+        """複数プロジェクトをプロセスプールで並列に Phase 4 へエクスポート（保存は最後に1回のみ）
+        
+        projects を省略すると全プロジェクトが対象。準備状況の検証・Merkle ツリーの計算・
+        ファイル書き込みはプロジェクトごとに子プロセスで行い、エクスポート履歴は
+        親プロセスのプロジェクトに反映する。
+        """
+        projects = list(self.projects if projects is None else projects)
+        workers = min(len(projects), max_workers or os.cpu_count() or 1)
+        
+        if len(projects) < PARALLEL_BATCH_THRESHOLD or workers <= 1:
+            # 直列時はプロジェクトを複製せず、エクスポーターのセクションキャッシュを使う
+            from utils.exporter import Exporter
+            exporter = Exporter(output_format, reference_blobs)
+            outcomes = [(*exporter.export_to_phase4(p), None) for p in projects]
+            workers = 1
+        else:
+            jobs = [(p.to_dict(), output_format, reference_blobs) for p in projects]
+            outcomes, workers = _run_jobs(_export_job, jobs, max_workers)
+        
+        results = []
+        for project, (success, message, filepath, record) in zip(projects, outcomes):
+            if record is not None:
+                project.export_history.append(record)
+            results.append({
+                'project_id': project.project_id,
+                'success': success,
+                'message': message,
+                'filepath': filepath
+            })
+        
+        report = _summarize_batch(results, workers)
+        if report['succeeded']:
+            self.save_projects()
+        return report
\ No newline at end of file
@@ -5,6 +5,15 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from models.issue import Issue
 
+
+def normalize_deploy_path(filepath: str) -> str:
+    """配置パスを比較用に正規化（区切り文字を / に統一し、先頭の ./ を除く）"""
+    path = filepath.replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path
+
+
 class ImplementationProject:
     """実装プロジェクトを表すクラス（v2.0）"""
     
@@ -27,6 +36,10 @@ class ImplementationProject:
             self.import_history = data.get('import_history', [])
             
             self.export_history = data.get('export_history', [])
+            
+            # プロンプト生成履歴と差分プロンプト用のウォーターマーク
+            self.prompt_history = data.get('prompt_history', [])
+            self.prompt_watermark = data.get('prompt_watermark', {})
             self.created_at = data.get('created_at', datetime.now().isoformat())
             self.updated_at = data.get('updated_at', datetime.now().isoformat())
         else:
@@ -42,9 +55,23 @@ class ImplementationProject:
             self.issue_counter = 1
             self.import_history = []
             self.export_history = []
+            self.prompt_history = []
+            self.prompt_watermark = {}
             self.created_at = datetime.now().isoformat()
             self.updated_at = datetime.now().isoformat()
     
+        # 内容が変わるたびに増えるメモリ上のリビジョン（保存はしない）
+        self.revision = 0
+    
+    def touch(self):
+        """更新日時とリビジョンを更新"""
+        self.updated_at = datetime.now().isoformat()
+        self.bump_revision()
+    
+    def bump_revision(self):
+        """リビジョンを進める（派生データのキャッシュを無効化する）"""
+        self.revision += 1
+    
     def to_dict(self) -> Dict:
         """辞書形式に変換"""
         return {
@@ -60,6 +87,8 @@ class ImplementationProject:
             'issue_counter': self.issue_counter,
             'import_history': self.import_history,
             'export_history': self.export_history,
+            'prompt_history': self.prompt_history,
+            'prompt_watermark': self.prompt_watermark,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
@@ -81,7 +110,7 @@ class ImplementationProject:
         issue.add_history('発見', description, '', 'manual')
         
         self.issues.append(issue)
-        self.updated_at = datetime.now().isoformat()
+        self.touch()
         return issue
     
     def get_issue_by_id(self, issue_id: str) -> Optional[Issue]:
@@ -96,7 +125,31 @@ class ImplementationProject:
         issue = self.get_issue_by_id(issue_id)
         if issue:
             issue.add_history(status, notes, resolution, user)
-            self.updated_at = datetime.now().isoformat()
+            self.touch()
+    
+    def merge_issue_as_recurrence(self, duplicate_id: str, existing_id: str, user: str = 'manual') -> bool:
+        """重複して作成された問題を取り除き、既存の問題に『再発』として記録"""
+        duplicate = self.get_issue_by_id(duplicate_id)
+        existing = self.get_issue_by_id(existing_id)
+        if duplicate is None or existing is None or duplicate is existing:
+            return False
+        notes = f"{duplicate_id}「{duplicate.title}」と重複"
+        if duplicate.description:
+            notes += f"\n{duplicate.description}"
+        
+        # 重複した問題への参照を既存の問題に付け替える
+        for request in self.code_requests:
+            related = request.get('related_issues') or []
+            if duplicate_id in related:
+                request['related_issues'] = list(dict.fromkeys(
+                    existing_id if issue_id == duplicate_id else issue_id for issue_id in related
+                ))
+        existing.related_requests = list(dict.fromkeys(existing.related_requests + duplicate.related_requests))
+        
+        self.issues.remove(duplicate)
+        existing.add_history('再発', notes, '', user)
+        self.touch()
+        return True
     
     def get_unresolved_issues(self) -> List[Issue]:
         """未解決の問題を取得"""
@@ -118,7 +171,7 @@ class ImplementationProject:
             'related_issues': related_issues or []
         }
         self.code_requests.append(request)
-        self.updated_at = datetime.now().isoformat()
+        self.touch()
         return request
     
     def update_request_status(self, request_id: int, status: str, received_date: str = None):
@@ -128,11 +181,12 @@ class ImplementationProject:
                 request['status'] = status
                 if received_date:
                     request['received_date'] = received_date
-                self.updated_at = datetime.now().isoformat()
+                self.touch()
                 break
     
-    def add_deployed_file(self, filename: str, filepath: str, status: str, notes: str = '') -> Dict:
-        """配置ファイルを追加"""
+    def add_deployed_file(self, filename: str, filepath: str, status: str, notes: str = '',
+                          content_hash: str = '') -> Dict:
+        """配置ファイルを追加（content_hash は配置した内容の SHA-256）"""
         file_entry = {
             'id': len(self.deployed_files) + 1,
             'filename': filename,
@@ -141,10 +195,20 @@ class ImplementationProject:
             'status': status,
             'notes': notes
         }
+        if content_hash:
+            file_entry['content_hash'] = content_hash
         self.deployed_files.append(file_entry)
-        self.updated_at = datetime.now().isoformat()
+        self.touch()
         return file_entry
     
+    def get_deployed_hashes(self) -> Dict[str, str]:
+        """配置パスごとの最新の内容ハッシュ（ハッシュが記録された配置のみ）"""
+        hashes = {}
+        for entry in self.deployed_files:
+            if entry.get('content_hash'):
+                hashes[normalize_deploy_path(entry['filepath'])] = entry['content_hash']
+        return hashes
+    
     def add_test_result(self, function_name: str, result: str, notes: str = '') -> Dict:
         """テスト結果を追加"""
         test = {
@@ -155,7 +219,7 @@ class ImplementationProject:
             'notes': notes
         }
         self.test_results.append(test)
-        self.updated_at = datetime.now().isoformat()
+        self.touch()
         return test
     
     def add_bug(self, title: str, description: str, severity: str = '中') -> Dict:
@@ -170,7 +234,7 @@ class ImplementationProject:
             'resolved_date': None
         }
         self.bugs.append(bug)
-        self.updated_at = datetime.now().isoformat()
+        self.touch()
         return bug
     
     def update_bug_status(self, bug_id: int, status: str, resolved_date: str = None):
@@ -180,7 +244,7 @@ class ImplementationProject:
                 bug['status'] = status
                 if resolved_date:
                     bug['resolved_date'] = resolved_date
-                self.updated_at = datetime.now().isoformat()
+                self.touch()
                 break
     
     def get_unresolved_bugs_count(self) -> int:
@@ -220,4 +284,21 @@ class ImplementationProject:
             'items_count': items_count
         }
         self.import_history.append(record)
-        self.updated_at = datetime.now().isoformat()
\ No newline at end of file
+        self.updated_at = datetime.now().isoformat()
+    
+    def add_prompt_record(self, mode: str, tokens: int, snapshot: Dict):
+        """プロンプト生成履歴を追加し、ウォーターマークを更新"""
+        timestamp = datetime.now().isoformat()
+        self.prompt_history.append({
+            'timestamp': timestamp,
+            'mode': mode,
+            'tokens': tokens
+        })
+        self.prompt_watermark = {
+            'timestamp': timestamp,
+            'snapshot': snapshot
+        }
+    
+    def get_prompt_watermark(self) -> Dict:
+        """最後にプロンプトを生成した時点のウォーターマークを取得"""
+        return self.prompt_watermark
\ No newline at end of file
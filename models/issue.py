@@ -57,6 +57,11 @@ class Issue:
             self.recurrence_count = 0
             self.last_updated = datetime.now().isoformat()
             self.related_requests = []
+        
+        # ステータスごとの履歴件数と、集計済みの履歴リスト・件数（保存はしない）
+        self._status_counts: Dict[str, int] = {}
+        self._counted_history = self.history
+        self._counted = 0
     
     def to_dict(self) -> Dict:
         return {
@@ -89,6 +94,18 @@ class Issue:
         if status == '再発':
             self.recurrence_count += 1
     
+    def get_status_counts(self) -> Dict[str, int]:
+        """ステータスごとの履歴件数（前回から増えた履歴だけを数える）"""
+        if self.history is not self._counted_history or self._counted > len(self.history):
+            # 履歴のリストが差し替えられた・短くなった場合は数え直す
+            self._status_counts = {}
+            self._counted_history = self.history
+            self._counted = 0
+        for h in self.history[self._counted:]:
+            self._status_counts[h.status] = self._status_counts.get(h.status, 0) + 1
+        self._counted = len(self.history)
+        return dict(self._status_counts)
+    
     def get_status_color(self) -> str:
         """ステータスに応じた色を返す"""
         status_colors = {
@@ -0,0 +1,118 @@
+"""
+分析ダッシュボードタブ（全プロジェクトの問題ライフサイクル指標）
+"""
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView,
+                               QLabel, QGroupBox)
+from PySide6.QtCore import Qt
+from utils.issue_analytics import IssueAnalytics, AGING_BUCKETS, BUG_SEVERITIES, BUG_SEVERITY_OTHER
+from utils.perf import timed
+
+PROJECT_COLUMNS = [
+    "プロジェクト", "問題", "未解決", "平均解決日数", "解決日数(中央値)",
+    "再発率", "最古の未解決(日)", "バグ(未解決)"
+]
+
+def _format_days(days) -> str:
+    return "-" if days is None else f"{days:.1f}"
+
+def _number_item(value) -> QTableWidgetItem:
+    item = QTableWidgetItem(str(value))
+    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return item
+
+class AnalyticsTab(QWidget):
+    """分析ダッシュボードタブ（表示のたびに変更のあったプロジェクトだけ再集計）"""
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+        self.init_ui()
+
+    def init_ui(self):
+        """UIを初期化"""
+        layout = QVBoxLayout(self)
+
+        # ヘッダー（全体の要約）
+        header_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("font-weight: bold;")
+        header_layout.addWidget(self.summary_label)
+        header_layout.addStretch()
+
+        refresh_btn = QPushButton("再集計")
+        refresh_btn.clicked.connect(self.refresh)
+        header_layout.addWidget(refresh_btn)
+        layout.addLayout(header_layout)
+
+        # プロジェクト別
+        self.project_table = QTableWidget()
+        self.project_table.setColumnCount(len(PROJECT_COLUMNS))
+        self.project_table.setHorizontalHeaderLabels(PROJECT_COLUMNS)
+        header = self.project_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, len(PROJECT_COLUMNS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        self.project_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.project_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.project_table, 2)
+
+        # 未解決問題の経過日数・バグ重要度分布
+        detail_layout = QHBoxLayout()
+
+        aging_group = QGroupBox("未解決問題の経過日数")
+        aging_layout = QVBoxLayout(aging_group)
+        self.aging_table = QTableWidget(len(AGING_BUCKETS), 1)
+        self.aging_table.setHorizontalHeaderLabels(["件数"])
+        self.aging_table.setVerticalHeaderLabels([label for _, label in AGING_BUCKETS])
+        self.aging_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.aging_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        aging_layout.addWidget(self.aging_table)
+        detail_layout.addWidget(aging_group)
+
+        severity_group = QGroupBox("バグ重要度分布")
+        severity_layout = QVBoxLayout(severity_group)
+        self.severities = BUG_SEVERITIES + [BUG_SEVERITY_OTHER]
+        self.severity_table = QTableWidget(len(self.severities), 2)
+        self.severity_table.setHorizontalHeaderLabels(["件数", "未解決"])
+        self.severity_table.setVerticalHeaderLabels(self.severities)
+        self.severity_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.severity_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        severity_layout.addWidget(self.severity_table)
+        detail_layout.addWidget(severity_group)
+
+        layout.addLayout(detail_layout, 1)
+
+    @timed('tab.analytics_tab.refresh')
+    def refresh(self):
+        """集計して表示"""
+        summary = IssueAnalytics.summarize(self.main_window.manager.projects)
+        total = summary['total']
+
+        self.summary_label.setText(
+            f"問題 {total['issues']}件（未解決 {total['unresolved']}件） / "
+            f"平均解決 {_format_days(total['mttr_days'])}日 / "
+            f"再発率 {total['recurrence_rate']:.1%} / "
+            f"最古の未解決 {_format_days(total['oldest_open_days'])}日"
+        )
+
+        rows = summary['projects']
+        self.project_table.setRowCount(len(rows))
+        for row, metrics in enumerate(rows):
+            unresolved_bugs = sum(b['unresolved'] for b in metrics['bugs'].values())
+            self.project_table.setItem(row, 0, QTableWidgetItem(metrics['project_name']))
+            self.project_table.setItem(row, 1, _number_item(metrics['issues']))
+            self.project_table.setItem(row, 2, _number_item(metrics['unresolved']))
+            self.project_table.setItem(row, 3, _number_item(_format_days(metrics['mttr_days'])))
+            self.project_table.setItem(row, 4, _number_item(_format_days(metrics['median_resolution_days'])))
+            self.project_table.setItem(row, 5, _number_item(f"{metrics['recurrence_rate']:.1%}"))
+            self.project_table.setItem(row, 6, _number_item(_format_days(metrics['oldest_open_days'])))
+            self.project_table.setItem(row, 7, _number_item(unresolved_bugs))
+
+        for row, (_, label) in enumerate(AGING_BUCKETS):
+            self.aging_table.setItem(row, 0, _number_item(total['aging'][label]))
+
+        for row, severity in enumerate(self.severities):
+            counts = total['bugs'][severity]
+            self.severity_table.setItem(row, 0, _number_item(counts['total']))
+            self.severity_table.setItem(row, 1, _number_item(counts['unresolved']))
@@ -2,24 +2,114 @@
 コード実行ダイアログ - JSON からファイル作成コマンドを生成
 """
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                               QTextEdit, QPushButton, QMessageBox, QApplication,
-                               QTabWidget, QWidget)
-from PySide6.QtCore import Qt
+                               QTextEdit, QPlainTextEdit, QPushButton, QMessageBox, QApplication,
+                               QTabWidget, QWidget, QFileDialog, QCheckBox)
+from PySide6.QtCore import Qt, QTimer
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from ui.workers import FunctionWorker
 from utils.code_generator import CodeGenerator
+from utils.deployment_diff import DeploymentDiff, CHANGE_LABELS
+from utils.file_materializer import FileMaterializer, STATUS_LABELS, STATUS_ERROR
+
+# タブの並び順と同じシェルタイプ
+SHELL_TYPES = ['powershell', 'terminal', 'cmd']
+
+# スクリプト保存時の拡張子とファイルフィルター
+SCRIPT_FILE_TYPES = {
+    'powershell': ('ps1', "PowerShell Script (*.ps1)"),
+    'terminal': ('sh', "Shell Script (*.sh)"),
+    'cmd': ('bat', "Batch File (*.bat)")
+}
+
+GENERATE_BUTTON_TEXT = "🔧 コマンド生成"
+
+# 出力欄に一度に追加する行数（大量の行でも画面が固まらないよう分割して表示）
+OUTPUT_CHUNK_LINES = 2000
+
+
+def load_payload_files(json_text: str) -> Tuple[List[Dict], Optional[Tuple[str, str, str]]]:
+    """JSON テキストから files を取り出す（問題があれば (種類, タイトル, メッセージ) も返す）"""
+    if not json_text:
+        return [], ('warning', "警告", "JSON を入力してください")
+    
+    try:
+        # JSON をパース
+        data = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        return [], ('critical', "JSON エラー", f"JSON の解析に失敗しました:\n{str(e)}")
+    
+    # files フィールドをチェック
+    if 'files' not in data:
+        return [], ('warning', "警告", "JSON に 'files' フィールドが見つかりません")
+    
+    files = data['files']
+    if not files:
+        return [], ('warning', "警告", "ファイルリストが空です")
+    
+    return files, None
+
+
+def render_commands(shell_type: str, work_dir: str, files: List[Dict], archive: bool) -> str:
+    """1シェル分のコマンドを生成（ワーカースレッドで実行）"""
+    return "\n".join(CodeGenerator.iter_lines(shell_type, work_dir, files, archive=archive))
+
+
+def prepare_commands(json_text: str, work_dir: str, shell_type: str, manifest: Dict[str, str],
+                     changed_only: bool, with_patches: bool, archive: bool) -> Dict:
+    """JSON の解析・差分判定・表示中シェルのコマンド生成（ワーカースレッドで実行）"""
+    files, problem = load_payload_files(json_text)
+    result = {
+        'problem': problem,
+        'files': files,
+        'command_files': files,
+        'counts': None,
+        'shell': shell_type,
+        'archive': archive,
+        'commands': ''
+    }
+    if problem:
+        return result
+    
+    # 配置済みの内容ハッシュと比べ、新規・変更ファイルだけに絞る
+    if changed_only:
+        classified = DeploymentDiff.classify(files, manifest, work_dir, with_patches=with_patches)
+        result['command_files'] = DeploymentDiff.changed_files(classified)
+        result['counts'] = DeploymentDiff.summarize(classified)
+    
+    if result['command_files']:
+        result['commands'] = render_commands(shell_type, work_dir, result['command_files'], archive)
+    return result
+
+
+def write_script(shell_type: str, work_dir: str, files: List[Dict], filepath: str, archive: bool) -> int:
+    """コマンドをスクリプトファイルに逐次書き出し（ワーカースレッドで実行）"""
+    # PowerShell / CMD で日本語が化けないよう BOM 付き UTF-8 で保存
+    encoding = 'utf-8' if shell_type == 'terminal' else 'utf-8-sig'
+    with open(filepath, 'w', encoding=encoding, newline='') as f:
+        return CodeGenerator.write_commands(shell_type, work_dir, files, f, archive=archive)
 
 
 class CodeExecutionDialog(QDialog):
     """JSON から実行コマンドを生成するダイアログ"""
     
-    def __init__(self, work_dir: str, shell_type: str, parent=None):
+    def __init__(self, work_dir: str, shell_type: str, parent=None, project=None):
         super().__init__(parent)
         self.work_dir = work_dir
         self.shell_type = shell_type
+        self.project = project  # 直接書き込み時に配置記録を追加するプロジェクト
         self.code_generator = CodeGenerator()
         self.generated_commands = {}
         self.parsed_files = []  # パース済みファイル情報を保存
+        self.command_files = []  # コマンドを生成するファイル（変更のあったものだけの場合あり）
+        self.deployed_entries = []  # 直接書き込みで追加した配置記録
+        
+        # バックグラウンド生成の状態
+        self._workers = set()  # 実行中のワーカー（完了まで参照を保持）
+        self._generation = 0  # 「コマンド生成」のたびに増え、古い結果を捨てるのに使う
+        self._running_shells = set()
+        self._pending_callbacks = {}  # シェル -> 生成完了時に呼ぶ関数のリスト
+        self._render_tokens = {}  # シェル -> 分割表示の世代
         
         self.setWindowTitle("🚀 JSON実行 - ファイル作成コマンド生成")
         self.setMinimumSize(900, 700)
@@ -60,10 +150,10 @@ class CodeExecutionDialog(QDialog):
         # 生成ボタン群
         button_row = QHBoxLayout()
         
-        generate_btn = QPushButton("🔧 コマンド生成")
-        generate_btn.clicked.connect(self.generate_commands)
-        generate_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 8px; font-weight: bold;")
-        button_row.addWidget(generate_btn)
+        self.generate_btn = QPushButton(GENERATE_BUTTON_TEXT)
+        self.generate_btn.clicked.connect(self.generate_commands)
+        self.generate_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 8px; font-weight: bold;")
+        button_row.addWidget(self.generate_btn)
         
         ai_check_btn = QPushButton("✅ AI確認用プロンプト")
         ai_check_btn.setToolTip("生成したコマンドをAIに確認してもらうプロンプトを生成")
@@ -77,15 +167,52 @@ class CodeExecutionDialog(QDialog):
         single_file_btn.setStyleSheet("background-color: #FF5722; color: white; padding: 8px; font-weight: bold;")
         button_row.addWidget(single_file_btn)
         
+        save_script_btn = QPushButton("💾 スクリプト保存")
+        save_script_btn.setToolTip("表示中のシェルのコマンドをスクリプトファイルに書き出し")
+        save_script_btn.clicked.connect(self.save_script)
+        save_script_btn.setStyleSheet("background-color: #607D8B; color: white; padding: 8px; font-weight: bold;")
+        button_row.addWidget(save_script_btn)
+        
+        write_files_btn = QPushButton("📂 直接書き込み")
+        write_files_btn.setToolTip("コマンドを経由せず、作業ディレクトリにファイルを直接作成")
+        write_files_btn.clicked.connect(self.write_files)
+        write_files_btn.setStyleSheet("background-color: #795548; color: white; padding: 8px; font-weight: bold;")
+        button_row.addWidget(write_files_btn)
+        
         layout.addLayout(button_row)
         
+        # 差分生成オプション
+        option_row = QHBoxLayout()
+        
+        self.changed_only_check = QCheckBox("🔁 変更のあったファイルのみ")
+        self.changed_only_check.setToolTip("配置済みの内容と同じファイルはコマンドを生成しない")
+        self.changed_only_check.setChecked(True)
+        option_row.addWidget(self.changed_only_check)
+        
+        self.patch_check = QCheckBox("🩹 小さな変更は差分パッチで適用（git apply）")
+        self.patch_check.setToolTip("PowerShell / Terminal のみ。CMD は常にファイル全体を書き直します")
+        option_row.addWidget(self.patch_check)
+        
+        self.archive_check = QCheckBox("📦 アーカイブ形式（1つにまとめて展開）")
+        self.archive_check.setToolTip("全ファイルを zip / tar.gz にまとめ、base64 から展開する短いコマンドを生成")
+        self.archive_check.toggled.connect(self.on_archive_toggled)
+        option_row.addWidget(self.archive_check)
+        
+        option_row.addStretch()
+        
+        save_archive_btn = QPushButton("📦 アーカイブ保存")
+        save_archive_btn.setToolTip("対象ファイルを zip / tar.gz ファイルとして保存")
+        save_archive_btn.clicked.connect(self.save_archive)
+        option_row.addWidget(save_archive_btn)
+        layout.addLayout(option_row)
+        
         # タブウィジェット（各シェル用）
         self.tab_widget = QTabWidget()
         
         # PowerShell タブ
         self.powershell_tab = QWidget()
         powershell_layout = QVBoxLayout(self.powershell_tab)
-        self.powershell_output = QTextEdit()
+        self.powershell_output = QPlainTextEdit()
         self.powershell_output.setReadOnly(True)
         self.powershell_output.setStyleSheet("font-family: 'Courier New', monospace; background-color: #1e1e1e; color: #d4d4d4;")
         powershell_layout.addWidget(self.powershell_output)
@@ -99,7 +226,7 @@ class CodeExecutionDialog(QDialog):
         # Terminal タブ
         self.terminal_tab = QWidget()
         terminal_layout = QVBoxLayout(self.terminal_tab)
-        self.terminal_output = QTextEdit()
+        self.terminal_output = QPlainTextEdit()
         self.terminal_output.setReadOnly(True)
         self.terminal_output.setStyleSheet("font-family: 'Courier New', monospace; background-color: #1e1e1e; color: #d4d4d4;")
         terminal_layout.addWidget(self.terminal_output)
@@ -113,7 +240,7 @@ class CodeExecutionDialog(QDialog):
         # CMD タブ
         self.cmd_tab = QWidget()
         cmd_layout = QVBoxLayout(self.cmd_tab)
-        self.cmd_output = QTextEdit()
+        self.cmd_output = QPlainTextEdit()
         self.cmd_output.setReadOnly(True)
         self.cmd_output.setStyleSheet("font-family: 'Courier New', monospace; background-color: #1e1e1e; color: #d4d4d4;")
         cmd_layout.addWidget(self.cmd_output)
@@ -124,6 +251,12 @@ class CodeExecutionDialog(QDialog):
         
         self.tab_widget.addTab(self.cmd_tab, "CMD (Windows)")
         
+        self.outputs = {
+            'powershell': self.powershell_output,
+            'terminal': self.terminal_output,
+            'cmd': self.cmd_output
+        }
+        
         layout.addWidget(self.tab_widget)
         
         # 現在のシェルタイプに合わせてタブを選択
@@ -134,6 +267,9 @@ class CodeExecutionDialog(QDialog):
         elif self.shell_type == 'cmd':
             self.tab_widget.setCurrentIndex(2)
         
+        # 選択されたタブのコマンドだけを必要になった時点で生成
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        
         # 閉じるボタン
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -144,78 +280,275 @@ class CodeExecutionDialog(QDialog):
         
         layout.addLayout(button_layout)
     
+    def show_problem(self, problem: Tuple[str, str, str]):
+        """load_payload_files が返した問題をメッセージボックスで表示"""
+        level, title, message = problem
+        getattr(QMessageBox, level)(self, title, message)
+    
+    def parse_files(self) -> List[Dict]:
+        """JSON 入力から files を取り出す（問題があれば警告して空リストを返す）"""
+        files, problem = load_payload_files(self.json_input.toPlainText().strip())
+        if problem:
+            self.show_problem(problem)
+        return files
+    
+    def start_worker(self, fn, *args, on_finished=None, on_failed=None) -> FunctionWorker:
+        """関数をバックグラウンドで実行（完了までワーカーの参照を保持）"""
+        worker = FunctionWorker(fn, *args)
+        self._workers.add(worker)
+        if on_finished:
+            worker.signals.finished.connect(on_finished)
+        if on_failed:
+            worker.signals.failed.connect(on_failed)
+        # 結果を受け取るスロットより後に接続し、全スロットの実行後に参照を手放す
+        worker.signals.finished.connect(lambda _result: self._workers.discard(worker))
+        worker.signals.failed.connect(lambda _message: self._workers.discard(worker))
+        return worker.start()
+    
     def generate_commands(self):
-        """JSON からコマンドを生成"""
-        json_text = self.json_input.toPlainText().strip()
+        """JSON からコマンドを生成（解析と生成はバックグラウンドで実行）"""
+        changed_only = self.changed_only_check.isChecked()
+        manifest = self.project.get_deployed_hashes() if changed_only and self.project is not None else {}
+        archive = self.archive_check.isChecked()
+        
+        self._generation += 1
+        generation = self._generation
+        self.generate_btn.setEnabled(False)
+        self.generate_btn.setText("⏳ 生成中...")
+        
+        self.start_worker(
+            prepare_commands,
+            self.json_input.toPlainText().strip(), self.work_dir, self.current_shell(), manifest,
+            changed_only, self.patch_check.isChecked(), archive,
+            on_finished=lambda result: self.on_commands_prepared(generation, result),
+            on_failed=self.on_generation_failed
+        )
+    
+    def on_generation_failed(self, message: str):
+        """コマンド生成の失敗時"""
+        self.generate_btn.setEnabled(True)
+        self.generate_btn.setText(GENERATE_BUTTON_TEXT)
+        QMessageBox.critical(
+            self,
+            "エラー",
+            f"コマンド生成中にエラーが発生しました:\n{message}"
+        )
+    
+    def on_commands_prepared(self, generation: int, result: Dict):
+        """バックグラウンドでの解析・生成の完了時"""
+        if generation != self._generation:
+            return
+        self.generate_btn.setEnabled(True)
+        self.generate_btn.setText(GENERATE_BUTTON_TEXT)
         
-        if not json_text:
-            QMessageBox.warning(self, "警告", "JSON を入力してください")
+        if result['problem']:
+            self.show_problem(result['problem'])
             return
         
-        try:
-            # JSON をパース
-            data = json.loads(json_text)
-            
-            # files フィールドをチェック
-            if 'files' not in data:
-                QMessageBox.warning(
-                    self, 
-                    "警告", 
-                    "JSON に 'files' フィールドが見つかりません"
-                )
-                return
-            
-            files = data['files']
-            if not files:
-                QMessageBox.warning(self, "警告", "ファイルリストが空です")
-                return
-            
-            # ファイル情報を保存（AI確認や1ファイルずつ生成で使用）
-            self.parsed_files = files
-            
-            # 各シェル用のコマンドを生成
-            self.generated_commands['powershell'] = self.code_generator.generate_powershell_commands(
-                self.work_dir, files
-            )
-            self.generated_commands['terminal'] = self.code_generator.generate_terminal_commands(
-                self.work_dir, files
-            )
-            self.generated_commands['cmd'] = self.code_generator.generate_cmd_commands(
-                self.work_dir, files
-            )
-            
-            # 各タブに表示
-            self.powershell_output.setPlainText(self.generated_commands['powershell'])
-            self.terminal_output.setPlainText(self.generated_commands['terminal'])
-            self.cmd_output.setPlainText(self.generated_commands['cmd'])
-            
+        # ファイル情報を保存（AI確認や1ファイルずつ生成で使用）
+        self.parsed_files = result['files']
+        self.command_files = result['command_files']
+        summary = ""
+        counts = result['counts']
+        if counts:
+            summary = "（" + " / ".join(
+                f"{label}: {counts[change]}" for change, label in CHANGE_LABELS.items()
+            ) + (f" / 差分パッチ: {counts['patched']}" if counts['patched'] else "") + "）\n\n"
+        
+        # 表示中のタブのコマンドだけを生成済み（他のタブは選択時に生成）
+        self.generated_commands = {}
+        self._pending_callbacks = {}
+        self.clear_outputs()
+        
+        if not self.command_files:
             QMessageBox.information(
                 self,
-                "成功",
-                f"✅ {len(files)} 個のファイル作成コマンドを生成しました！\n\n"
-                f"各タブからコマンドをコピーして、シェルで実行してください。"
+                "変更なし",
+                f"✅ すべてのファイルが配置済みの内容と同じです。\n\n{summary.strip()}"
             )
-            
-        except json.JSONDecodeError as e:
-            QMessageBox.critical(
-                self,
-                "JSON エラー",
-                f"JSON の解析に失敗しました:\n{str(e)}"
+            return
+        
+        if result['archive'] == self.archive_check.isChecked():
+            self.store_commands(result['shell'], result['commands'])
+        if self.current_shell() not in self.generated_commands:
+            self.request_commands(self.current_shell())
+        
+        QMessageBox.information(
+            self,
+            "成功",
+            f"✅ {len(self.command_files)} 個のファイル作成コマンドを生成しました！\n\n{summary}"
+            f"各タブからコマンドをコピーして、シェルで実行してください。"
+        )
+    
+    def write_files(self):
+        """JSON のファイルを作業ディレクトリに直接書き込み、配置記録に追加"""
+        files = self.parse_files()
+        if not files:
+            return
+        
+        reply = QMessageBox.question(
+            self, "確認",
+            f"{len(files)} 個のファイルを作業ディレクトリに書き込みますか?\n"
+            f"📁 {self.work_dir}\n\n"
+            "内容が同じ既存ファイルはスキップし、異なる場合は上書きします。",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        results = FileMaterializer.materialize(self.work_dir, files)
+        if self.project is not None:
+            self.deployed_entries.extend(FileMaterializer.record_deployment(self.project, results))
+        
+        counts = FileMaterializer.summarize(results)
+        message = "\n".join(
+            f"{STATUS_LABELS[status]}: {count} 件" for status, count in counts.items() if count
+        )
+        errors = [r for r in results if r['status'] == STATUS_ERROR]
+        if errors:
+            details = "\n".join(f"・{r['filepath']}: {r['error']}" for r in errors[:10])
+            QMessageBox.warning(self, "一部失敗", f"{message}\n\n{details}")
+        else:
+            QMessageBox.information(self, "成功", f"✅ ファイルを書き込みました\n\n{message}")
+    
+    def current_shell(self) -> str:
+        """表示中のタブのシェルタイプ"""
+        return SHELL_TYPES[self.tab_widget.currentIndex()]
+    
+    def store_commands(self, shell_type: str, commands: str):
+        """生成したコマンドを保持し、タブに少しずつ表示"""
+        self.generated_commands[shell_type] = commands
+        self.show_commands(shell_type, commands)
+        for callback in self._pending_callbacks.pop(shell_type, []):
+            callback(commands)
+    
+    def clear_outputs(self):
+        """全タブの表示を消し、表示途中の分割追加も止める"""
+        for shell_type, output in self.outputs.items():
+            self._render_tokens[shell_type] = self._render_tokens.get(shell_type, 0) + 1
+            output.clear()
+    
+    def show_commands(self, shell_type: str, commands: str):
+        """OUTPUT_CHUNK_LINES 行ずつイベントループに戻りながら追加表示"""
+        output = self.outputs[shell_type]
+        output.clear()
+        lines = commands.split('\n')
+        token = self._render_tokens.get(shell_type, 0) + 1
+        self._render_tokens[shell_type] = token
+        
+        def append_chunk(start: int):
+            # 表示中に作り直された場合は古い内容の追加をやめる
+            if self._render_tokens.get(shell_type) != token:
+                return
+            end = start + OUTPUT_CHUNK_LINES
+            output.appendPlainText('\n'.join(lines[start:end]))
+            if end < len(lines):
+                QTimer.singleShot(0, lambda: append_chunk(end))
+        
+        append_chunk(0)
+    
+    def request_commands(self, shell_type: str, callback=None):
+        """指定シェルのコマンドを取得（未生成ならバックグラウンドで生成して callback を呼ぶ）"""
+        if shell_type in self.generated_commands:
+            if callback:
+                callback(self.generated_commands[shell_type])
+            return
+        
+        callbacks = self._pending_callbacks.setdefault(shell_type, [])
+        if callback:
+            callbacks.append(callback)
+        if shell_type in self._running_shells:
+            return
+        
+        self._running_shells.add(shell_type)
+        generation = self._generation
+        archive = self.archive_check.isChecked()
+        self.start_worker(
+            render_commands, shell_type, self.work_dir, self.command_files, archive,
+            on_finished=lambda commands: self.on_shell_commands_ready(shell_type, generation, archive, commands),
+            on_failed=lambda message: self.on_shell_commands_failed(shell_type, message)
+        )
+    
+    def on_shell_commands_ready(self, shell_type: str, generation: int, archive: bool, commands: str):
+        """シェル別のコマンド生成の完了時"""
+        self._running_shells.discard(shell_type)
+        if generation != self._generation:
+            return
+        if archive != self.archive_check.isChecked():
+            # 生成中に出力形式が切り替わった場合は作り直す
+            self.request_commands(shell_type)
+            return
+        self.store_commands(shell_type, commands)
+    
+    def on_shell_commands_failed(self, shell_type: str, message: str):
+        """シェル別のコマンド生成の失敗時"""
+        self._running_shells.discard(shell_type)
+        self._pending_callbacks.pop(shell_type, None)
+        QMessageBox.critical(self, "エラー", f"コマンド生成中にエラーが発生しました:\n{message}")
+    
+    def on_tab_changed(self, index: int):
+        """タブ切り替え時に、そのシェルのコマンドを生成"""
+        if self.command_files:
+            self.request_commands(SHELL_TYPES[index])
+    
+    def on_archive_toggled(self, _checked: bool):
+        """出力形式の切り替え時に生成済みのコマンドを作り直す"""
+        self.generated_commands = {}
+        self.clear_outputs()
+        if self.command_files:
+            self.request_commands(self.current_shell())
+    
+    def save_archive(self):
+        """コマンド生成対象のファイルをアーカイブファイルとして保存"""
+        if not self.command_files:
+            QMessageBox.warning(self, "警告", "先にコマンドを生成してください")
+            return
+        
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "アーカイブを保存", "deploy_bundle.zip",
+            "ZIP Archive (*.zip);;Gzip Tar Archive (*.tar.gz)"
+        )
+        if not filepath:
+            return
+        
+        try:
+            size = self.code_generator.write_archive(self.command_files, filepath)
+            QMessageBox.information(
+                self, "成功",
+                f"{len(self.command_files)} 個のファイルをアーカイブに保存しました（{size:,} バイト）:\n{filepath}\n\n"
+                "作業ディレクトリで展開してください。"
             )
         except Exception as e:
-            QMessageBox.critical(
-                self,
-                "エラー",
-                f"コマンド生成中にエラーが発生しました:\n{str(e)}"
-            )
+            QMessageBox.critical(self, "エラー", f"アーカイブの保存に失敗しました:\n{str(e)}")
+    
+    def save_script(self):
+        """表示中のシェルのコマンドをスクリプトファイルに逐次書き出し"""
+        if not self.command_files:
+            QMessageBox.warning(self, "警告", "先にコマンドを生成してください")
+            return
+        
+        shell_type = self.current_shell()
+        extension, file_filter = SCRIPT_FILE_TYPES[shell_type]
+        filepath, _ = QFileDialog.getSaveFileName(self, "スクリプトを保存", f"create_files.{extension}", file_filter)
+        if not filepath:
+            return
+        
+        self.start_worker(
+            write_script, shell_type, self.work_dir, self.command_files, filepath, self.archive_check.isChecked(),
+            on_finished=lambda _written: QMessageBox.information(self, "成功", f"スクリプトを保存しました:\n{filepath}"),
+            on_failed=lambda message: QMessageBox.critical(self, "エラー", f"スクリプトの保存に失敗しました:\n{message}")
+        )
     
     def copy_to_clipboard(self, shell_type: str):
         """指定されたシェルのコマンドをクリップボードにコピー"""
-        if shell_type not in self.generated_commands:
+        if not self.command_files:
             QMessageBox.warning(self, "警告", "先にコマンドを生成してください")
             return
         
-        commands = self.generated_commands[shell_type]
+        self.request_commands(shell_type, lambda commands: self.copy_commands(shell_type, commands))
+    
+    def copy_commands(self, shell_type: str, commands: str):
+        """生成済みのコマンドをクリップボードにコピー"""
         if not commands:
             QMessageBox.warning(self, "警告", "コマンドが空です")
             return
@@ -238,7 +571,7 @@ class CodeExecutionDialog(QDialog):
     
     def generate_ai_check_prompt(self):
         """AI確認用プロンプトを生成"""
-        if not self.generated_commands:
+        if not self.command_files:
             QMessageBox.warning(
                 self,
                 "警告",
@@ -247,18 +580,17 @@ class CodeExecutionDialog(QDialog):
             return
         
         # 現在のタブに応じたシェルタイプを取得
-        current_index = self.tab_widget.currentIndex()
-        shell_types = ['powershell', 'terminal', 'cmd']
-        current_shell = shell_types[current_index]
-        
+        current_shell = self.current_shell()
+        self.request_commands(current_shell, lambda commands: self.show_ai_check_prompt(current_shell, commands))
+    
+    def show_ai_check_prompt(self, current_shell: str, current_command: str):
+        """生成済みのコマンドから AI確認用プロンプトを作成して表示"""
         shell_names = {
             'powershell': 'PowerShell',
             'terminal': 'Terminal (Mac/Linux)',
             'cmd': 'Command Prompt (Windows)'
         }
         
-        current_command = self.generated_commands.get(current_shell, '')
-        
         if not current_command:
             QMessageBox.warning(self, "警告", "コマンドが空です")
             return
@@ -368,9 +700,7 @@ class CodeExecutionDialog(QDialog):
             return
         
         # 現在のタブに応じたシェルタイプを取得
-        current_index = self.tab_widget.currentIndex()
-        shell_types = ['powershell', 'terminal', 'cmd']
-        current_shell = shell_types[current_index]
+        current_shell = self.current_shell()
         
         shell_names = {
             'powershell': 'PowerShell',
@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                                QMessageBox)
 from PySide6.QtCore import Qt
 from ui.dialogs import DeployDialog
+from utils.perf import timed
 
 class DeployTab(QWidget):
     """コード配置記録タブ（編集機能追加版）"""
@@ -57,6 +58,7 @@ class DeployTab(QWidget):
         
         layout.addWidget(self.table)
     
+    @timed('tab.deploy_tab.refresh')
     def refresh(self):
         """テーブルをリフレッシュ"""
         self.table.setRowCount(0)
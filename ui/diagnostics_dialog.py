@@ -0,0 +1,119 @@
+"""
+診断ダイアログ - 処理時間の計測結果表示
+"""
+from datetime import datetime
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView,
+                               QLabel, QCheckBox, QFileDialog, QMessageBox)
+from PySide6.QtCore import Qt, Signal
+from utils.perf import PerfRecorder
+from utils.startup_trace import StartupTrace
+
+class DiagnosticsDialog(QDialog):
+    """処理ごとの p50 / p95 を表示し、Chrome トレースを書き出すダイアログ"""
+
+    # 計測の有効・無効を切り替えたとき
+    enabled_changed = Signal(bool)
+
+    def __init__(self, config_manager, parent=None):
+        super().__init__(parent)
+        self.config_manager = config_manager
+        self.setWindowTitle("🩺 診断 - 処理時間")
+        self.setMinimumSize(800, 500)
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.enable_check = QCheckBox("処理時間の計測を有効にする（次回起動時も有効）")
+        self.enable_check.setChecked(PerfRecorder.enabled)
+        self.enable_check.toggled.connect(self.toggle_enabled)
+        layout.addWidget(self.enable_check)
+
+        self.startup_label = QLabel()
+        self.startup_label.setWordWrap(True)
+        self.startup_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.startup_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels([
+            "処理", "件数", "p50 (ms)", "p95 (ms)", "最大 (ms)", "合計 (ms)"
+        ])
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, 6):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+
+        refresh_btn = QPushButton("更新")
+        refresh_btn.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_btn)
+
+        clear_btn = QPushButton("クリア")
+        clear_btn.clicked.connect(self.clear_samples)
+        button_layout.addWidget(clear_btn)
+
+        export_btn = QPushButton("Chrome トレース保存")
+        export_btn.setToolTip("chrome://tracing や Perfetto で開ける形式で保存")
+        export_btn.clicked.connect(self.export_trace)
+        button_layout.addWidget(export_btn)
+
+        button_layout.addStretch()
+
+        close_btn = QPushButton("閉じる")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        """計測結果を再表示"""
+        startup = StartupTrace.summary()
+        self.startup_label.setText(f"起動: {startup}" if startup else "起動トレース: なし")
+
+        summary = PerfRecorder.summary()
+        rows = sorted(summary.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+
+        self.table.setRowCount(len(rows))
+        for row, (name, stats) in enumerate(rows):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            values = [stats['count'], stats['p50_ms'], stats['p95_ms'], stats['max_ms'], stats['total_ms']]
+            for column, value in enumerate(values, 1):
+                item = QTableWidgetItem(f"{value:.2f}" if isinstance(value, float) else str(value))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def toggle_enabled(self, enabled: bool):
+        """計測の有効・無効を切り替え"""
+        PerfRecorder.enable(enabled)
+        self.config_manager.set_perf_instrumentation(enabled)
+        self.enabled_changed.emit(enabled)
+
+    def clear_samples(self):
+        """計測結果をクリア"""
+        PerfRecorder.clear()
+        self.refresh()
+
+    def export_trace(self):
+        """Chrome トレース形式で保存"""
+        default_name = f"logs/perf_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "Chrome トレースを保存",
+            default_name,
+            "JSON Files (*.json)"
+        )
+
+        if not filepath:
+            return
+
+        try:
+            count = PerfRecorder.export_chrome_trace(filepath)
+            QMessageBox.information(self, "成功", f"{count}件のサンプルを保存しました:\n{filepath}")
+        except Exception as e:
+            QMessageBox.critical(self, "エラー", f"トレースの保存に失敗しました:\n{str(e)}")
@@ -2,7 +2,7 @@
 JSON一括インポートダイアログ
 """
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTextEdit,
-                               QPushButton, QLabel, QMessageBox)
+                               QPushButton, QLabel, QMessageBox, QFileDialog)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from utils.json_bulk_importer import JSONBulkImporter
@@ -15,6 +15,7 @@ class ImportDialog(QDialog):
         self.setWindowTitle("JSON一括インポート")
         self.setMinimumSize(800, 600)
         self.validated_data = None
+        self.validated_batch = None
         self.init_ui()
     
     def init_ui(self):
@@ -23,7 +24,8 @@ class ImportDialog(QDialog):
         # 説明
         info_label = QLabel(
             "Claude から受け取ったJSON形式のデータを貼り付けてください。\n"
-            "検証ボタンで内容を確認後、インポートできます。"
+            "検証ボタンで内容を確認後、インポートできます。\n"
+            "保存済みの回答が複数ある場合は、フォルダ（*.json）またはJSONLファイルから一括で取り込めます。"
         )
         info_label.setWordWrap(True)
         layout.addWidget(info_label)
@@ -54,6 +56,16 @@ class ImportDialog(QDialog):
         clear_btn.clicked.connect(self.clear_all)
         button_layout.addWidget(clear_btn)
         
+        folder_btn = QPushButton("📂 フォルダから一括")
+        folder_btn.setToolTip("フォルダ内の *.json をファイル名順に一括検証")
+        folder_btn.clicked.connect(self.load_batch_folder)
+        button_layout.addWidget(folder_btn)
+        
+        jsonl_btn = QPushButton("📄 JSONLから一括")
+        jsonl_btn.setToolTip("1行1ペイロードのJSONLファイルを一括検証")
+        jsonl_btn.clicked.connect(self.load_batch_jsonl)
+        button_layout.addWidget(jsonl_btn)
+        
         button_layout.addStretch()
         
         self.import_btn = QPushButton("インポート")
@@ -80,6 +92,7 @@ class ImportDialog(QDialog):
         
         if is_valid:
             self.validated_data = data
+            self.validated_batch = None
             
             # プレビュー生成
             preview = JSONBulkImporter.generate_preview(data)
@@ -93,13 +106,67 @@ class ImportDialog(QDialog):
             self.preview_edit.clear()
             QMessageBox.critical(self, "検証エラー", message)
     
+    def load_batch_folder(self):
+        """フォルダからペイロードを一括読み込み"""
+        directory = QFileDialog.getExistingDirectory(self, "回答JSONのフォルダを選択")
+        if directory:
+            self.validate_batch(directory)
+    
+    def load_batch_jsonl(self):
+        """JSONLファイルからペイロードを一括読み込み"""
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "JSONLファイルを選択",
+            "",
+            "JSON Lines (*.jsonl);;All Files (*)"
+        )
+        if filepath:
+            self.validate_batch(filepath)
+    
+    def validate_batch(self, path: str):
+        """ペイロードを一括検証"""
+        try:
+            payloads = JSONBulkImporter.load_batch_payloads(path)
+        except Exception as e:
+            QMessageBox.critical(self, "読み込みエラー", f"ペイロードの読み込みに失敗しました:\n{str(e)}")
+            return
+        
+        if not payloads:
+            QMessageBox.warning(self, "警告", "取り込み対象のペイロードが見つかりません")
+            return
+        
+        validated = JSONBulkImporter.validate_batch(payloads)
+        valid_count = sum(1 for v in validated if v[1])
+        
+        self.json_edit.clear()
+        self.preview_edit.setPlainText(JSONBulkImporter.generate_batch_preview(validated))
+        self.validated_data = None
+        
+        if valid_count:
+            self.validated_batch = validated
+            self.import_btn.setEnabled(True)
+            QMessageBox.information(
+                self,
+                "検証完了",
+                f"{len(validated)}件中 {valid_count}件のペイロードが有効です"
+            )
+        else:
+            self.validated_batch = None
+            self.import_btn.setEnabled(False)
+            QMessageBox.critical(self, "検証エラー", "有効なペイロードがありません")
+    
     def clear_all(self):
         """全てクリア"""
         self.json_edit.clear()
         self.preview_edit.clear()
         self.validated_data = None
+        self.validated_batch = None
         self.import_btn.setEnabled(False)
     
     def get_data(self):
         """検証済みデータを取得"""
-        return self.validated_data
\ No newline at end of file
+        return self.validated_data
+    
+    def get_batch(self):
+        """検証済みの一括ペイロードを取得"""
+        return self.validated_batch
\ No newline at end of file
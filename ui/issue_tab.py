@@ -5,10 +5,69 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                                QTableWidget, QTableWidgetItem, QHeaderView,
                                QMessageBox, QLabel, QTextEdit, QDialog,
                                QSplitter, QGroupBox, QFormLayout, QComboBox,
-                               QLineEdit)
-from PySide6.QtCore import Qt
+                               QLineEdit, QListView)
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
 from PySide6.QtGui import QColor
 from ui.dialogs import IssueDialog
+from utils.perf import timed
+
+# 履歴タイムラインで一度に読み込む件数
+HISTORY_PAGE_SIZE = 50
+
+# サマリーに表示するステータスの順
+HISTORY_STATUSES = ['発見', '対応中', '解決', '再発']
+
+class IssueHistoryModel(QAbstractListModel):
+    """問題履歴を新しい順にページ単位で読み込むモデル
+    
+    ビューが末尾までスクロールされると canFetchMore / fetchMore で次のページを追加する。
+    表示用の文字列は行が表示されるときに作る。
+    """
+    
+    def __init__(self, issue, page_size: int = HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.issue = issue
+        self.page_size = page_size
+        self.loaded = 0
+    
+    def total(self) -> int:
+        return len(self.issue.history)
+    
+    def entry(self, row: int):
+        """行の履歴（新しい順）"""
+        return self.issue.history[self.total() - 1 - row]
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.loaded
+    
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self.loaded < self.total()
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.page_size, self.total() - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self.loaded:
+            return None
+        h = self.entry(index.row())
+        if role == Qt.DisplayRole:
+            date = h.timestamp[:16].replace('T', ' ')
+            text = f"● {date} [{h.status}]\n  {h.notes}\n"
+            if h.resolution:
+                text += f"  解決策: {h.resolution}\n"
+            text += f"  記録者: {h.user}"
+            return text
+        if role == Qt.ForegroundRole and h.status == '再発':
+            return QColor('red')
+        return None
+
 
 class IssueHistoryDialog(QDialog):
     """問題履歴詳細ダイアログ"""
@@ -45,24 +104,31 @@ class IssueHistoryDialog(QDialog):
         desc_group.setLayout(desc_layout)
         layout.addWidget(desc_group)
         
-        # 履歴タイムライン
-        history_group = QGroupBox("履歴タイムライン")
+        # 履歴タイムライン（新しい順、スクロールに合わせて読み込む）
+        history_group = QGroupBox("履歴タイムライン（新しい順）")
         history_layout = QVBoxLayout()
         
-        timeline_text = QTextEdit()
-        timeline_text.setReadOnly(True)
-        
-        timeline_content = ""
-        for h in self.issue.history:
-            date = h.timestamp[:16].replace('T', ' ')
-            timeline_content += f"● {date} [{h.status}]\n"
-            timeline_content += f"  {h.notes}\n"
-            if h.resolution:
-                timeline_content += f"  解決策: {h.resolution}\n"
-            timeline_content += f"  記録者: {h.user}\n\n"
+        self.summary_label = QLabel(self.history_summary())
+        self.summary_label.setWordWrap(True)
+        history_layout.addWidget(self.summary_label)
+        
+        self.history_model = IssueHistoryModel(self.issue, parent=self)
+        self.history_view = QListView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setWordWrap(True)
+        self.history_view.setSpacing(4)
+        self.history_view.setLayoutMode(QListView.Batched)
+        self.history_view.setBatchSize(HISTORY_PAGE_SIZE)
+        self.history_view.setEditTriggers(QListView.NoEditTriggers)
+        history_layout.addWidget(self.history_view)
+        
+        self.loaded_label = QLabel()
+        self.loaded_label.setStyleSheet("color: gray;")
+        history_layout.addWidget(self.loaded_label)
+        self.history_model.rowsInserted.connect(self.update_loaded_label)
+        self.history_model.fetchMore()
+        self.update_loaded_label()
         
-        timeline_text.setPlainText(timeline_content)
-        history_layout.addWidget(timeline_text)
         history_group.setLayout(history_layout)
         layout.addWidget(history_group)
         
@@ -70,6 +136,21 @@ class IssueHistoryDialog(QDialog):
         close_btn = QPushButton("閉じる")
         close_btn.clicked.connect(self.accept)
         layout.addWidget(close_btn)
+    
+    def history_summary(self) -> str:
+        """履歴の要約（件数・ステータス別件数・期間）"""
+        history = self.issue.history
+        if not history:
+            return "履歴なし"
+        counts = self.issue.get_status_counts()
+        statuses = HISTORY_STATUSES + [s for s in counts if s not in HISTORY_STATUSES]
+        breakdown = " / ".join(f"{s} {counts[s]}" for s in statuses if counts.get(s))
+        period = f"{history[0].timestamp[:10]} 〜 {history[-1].timestamp[:10]}"
+        return f"履歴 {len(history)}件（{breakdown}） | 期間: {period}"
+    
+    def update_loaded_label(self, *_):
+        """読み込み済みの件数を表示"""
+        self.loaded_label.setText(f"表示中: {self.history_model.loaded} / {self.history_model.total()}件")
 
 
 class IssueUpdateDialog(QDialog):
@@ -178,6 +259,7 @@ class IssueTab(QWidget):
         
         layout.addWidget(self.table)
     
+    @timed('tab.issue_tab.refresh')
     def refresh(self):
         """テーブルをリフレッシュ"""
         self.table.setRowCount(0)
@@ -244,6 +326,33 @@ class IssueTab(QWidget):
         dialog = IssueDialog(self)
         if dialog.exec():
             title, description, impact = dialog.get_data()
+            
+            # 既存の問題とほぼ同じ内容なら、新規作成の代わりに『再発』の記録を提案
+            matches = [m for m in self.main_window.find_duplicate_issues(title, description)
+                       if m['kind'] == 'issue']
+            if matches:
+                match = matches[0]
+                reply = QMessageBox.question(
+                    self, "重複の可能性",
+                    f"既存の問題と内容が似ています（類似度 {match['similarity']:.2f}）。\n\n"
+                    f"{match['ref']}「{match['title']}」（{match['status']}）\n\n"
+                    f"新規作成せず、{match['ref']} に『再発』として記録しますか?\n"
+                    "（「いいえ」で新しい問題として作成します）",
+                    QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+                )
+                if reply == QMessageBox.Cancel:
+                    return
+                if reply == QMessageBox.Yes:
+                    notes = f"重複して報告: {title}"
+                    if description:
+                        notes += f"\n{description}"
+                    self.main_window.current_project.update_issue_status(
+                        match['ref'], '再発', notes, '', 'manual'
+                    )
+                    self.main_window.save_current_project()
+                    self.refresh()
+                    return
+            
             self.main_window.current_project.add_issue(title, description, impact)
             self.main_window.save_current_project()
             self.refresh()
@@ -1,38 +1,116 @@
 ﻿"""
 Phase 3 メインウィンドウ v3.0（設定機能追加版）
 """
+import importlib
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QPushButton, QComboBox, QLabel, QTabWidget,
+                               QPushButton, QComboBox, QLabel, QTabWidget, QLineEdit,
                                QMessageBox, QFileDialog, QStatusBar, QApplication)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from models.implementation_manager import ImplementationManager
-from utils.importer import Importer
-from utils.exporter import Exporter
-from utils.prompt_generator import PromptGenerator
-from utils.json_bulk_importer import JSONBulkImporter
 from utils.config_manager import ConfigManager
-from ui.request_tab import RequestTab
-from ui.deploy_tab import DeployTab
-from ui.test_tab import TestTab
-from ui.issue_tab import IssueTab
-from ui.import_dialog import ImportDialog
-from ui.settings_dialog import SettingsDialog
+from utils.perf import PerfRecorder
+from utils.startup_trace import StartupTrace
+from ui.workers import FunctionWorker
+
+# タブ定義（属性名, モジュール, クラス名, 表示名）。各タブは初回表示時に読み込む
+TAB_SPECS = [
+    ('request_tab', 'ui.request_tab', 'RequestTab', "コード依頼管理"),
+    ('deploy_tab', 'ui.deploy_tab', 'DeployTab', "コード配置記録"),
+    ('test_tab', 'ui.test_tab', 'TestTab', "テスト・バグ管理"),
+    ('issue_tab', 'ui.issue_tab', 'IssueTab', "問題追跡（履歴型）"),
+    ('analytics_tab', 'ui.analytics_tab', 'AnalyticsTab', "分析ダッシュボード"),
+]
+
+# 検索結果の種別 -> (タブの属性名, 表の属性名)。表の1列目は ID
+SEARCH_RESULT_TABS = {
+    'issue': ('issue_tab', 'table'),
+    'history': ('issue_tab', 'table'),
+    'request': ('request_tab', 'table'),
+    'bug': ('test_tab', 'bug_table'),
+}
+
+LOADING_TEXT = "(読み込み中...)"
+NO_PROJECT_TEXT = "(プロジェクトなし)"
 
 class MainWindow(QMainWindow):
     """メインウィンドウクラス v3.0"""
     
     def __init__(self):
         super().__init__()
-        self.manager = ImplementationManager()
-        self.importer = Importer()
-        self.exporter = Exporter()
-        self.prompt_generator = PromptGenerator()
-        self.json_importer = JSONBulkImporter()
+        # プロジェクトデータはバックグラウンドで読み込む
+        self.manager = ImplementationManager(autoload=False)
         self.config_manager = ConfigManager()
         self.current_project = None
+        self.data_loaded = False
+        
+        # 処理時間計測（オプトイン）
+        if self.config_manager.get_perf_instrumentation():
+            PerfRecorder.enable(True)
+        self._importer = None
+        self._exporter = None
+        self._prompt_generator = None
+        self._json_importer = None
+        self._search_index = None
+        self._search_dialog = None
+        self._duplicate_detector = None
         
         self.init_ui()
-        self.load_projects()
+        StartupTrace.mark('window_created')
+        self.start_loading_projects()
+    
+    @property
+    def importer(self):
+        """Phase 2インポーター（初回使用時に生成）"""
+        if self._importer is None:
+            from utils.importer import Importer
+            self._importer = Importer()
+        return self._importer
+    
+    @property
+    def exporter(self):
+        """Phase 4エクスポーター（初回使用時に生成）"""
+        if self._exporter is None:
+            from utils.exporter import Exporter
+            self._exporter = Exporter(self.config_manager.get_export_format())
+        return self._exporter
+    
+    @property
+    def prompt_generator(self):
+        """プロンプト生成器（初回使用時に生成）"""
+        if self._prompt_generator is None:
+            from utils.prompt_generator import PromptGenerator
+            self._prompt_generator = PromptGenerator()
+        return self._prompt_generator
+    
+    @property
+    def json_importer(self):
+        """JSON一括インポーター（初回使用時に生成）"""
+        if self._json_importer is None:
+            from utils.json_bulk_importer import JSONBulkImporter
+            self._json_importer = JSONBulkImporter()
+        return self._json_importer
+    
+    @property
+    def search_index(self):
+        """全文検索インデックス（初回検索時に全プロジェクトから構築）"""
+        if self._search_index is None:
+            from utils.search_index import SearchIndex
+            self._search_index = SearchIndex()
+        return self._search_index
+    
+    @property
+    def duplicate_detector(self):
+        """問題・バグの重複検出索引（初回使用時に生成し、プロジェクトごとに必要時に構築）"""
+        if self._duplicate_detector is None:
+            from utils.duplicate_detector import DuplicateDetector
+            self._duplicate_detector = DuplicateDetector()
+        return self._duplicate_detector
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not StartupTrace.has_mark('first_paint'):
+            StartupTrace.mark('first_paint')
+            self.finish_startup_trace()
     
     def init_ui(self):
         """UIを初期化"""
@@ -50,19 +128,16 @@ class MainWindow(QMainWindow):
         header_layout = self.create_header()
         main_layout.addLayout(header_layout)
         
-        # タブウィジェット
+        # タブウィジェット（中身は初回表示時に構築するため、まずは空のページを置く）
         self.tab_widget = QTabWidget()
+        self.built_tabs = {}
         
-        # 各タブを作成
-        self.request_tab = RequestTab(self)
-        self.deploy_tab = DeployTab(self)
-        self.test_tab = TestTab(self)
-        self.issue_tab = IssueTab(self)
+        for _, _, _, label in TAB_SPECS:
+            placeholder = QLabel(LOADING_TEXT)
+            placeholder.setAlignment(Qt.AlignCenter)
+            self.tab_widget.addTab(placeholder, label)
         
-        self.tab_widget.addTab(self.request_tab, "コード依頼管理")
-        self.tab_widget.addTab(self.deploy_tab, "コード配置記録")
-        self.tab_widget.addTab(self.test_tab, "テスト・バグ管理")
-        self.tab_widget.addTab(self.issue_tab, "問題追跡（履歴型）")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         
         main_layout.addWidget(self.tab_widget)
         
@@ -70,6 +145,21 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.update_status_bar()
+        
+        # 計測結果の要約（計測有効時のみ表示）
+        self.perf_label = QLabel()
+        self.status_bar.addPermanentWidget(self.perf_label)
+        
+        diagnostics_btn = QPushButton("🩺 診断")
+        diagnostics_btn.setFlat(True)
+        diagnostics_btn.setToolTip("処理時間の計測結果（p50 / p95）を表示")
+        diagnostics_btn.clicked.connect(self.open_diagnostics)
+        self.status_bar.addPermanentWidget(diagnostics_btn)
+        
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(2000)
+        self.perf_timer.timeout.connect(self.update_perf_overlay)
+        self.set_perf_overlay_active(PerfRecorder.enabled)
     
     def create_header(self) -> QHBoxLayout:
         """ヘッダー部分を作成"""
@@ -82,12 +172,23 @@ class MainWindow(QMainWindow):
         self.project_combo.currentTextChanged.connect(self.on_project_changed)
         header_layout.addWidget(self.project_combo)
         
+        # 全文検索ボックス
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 全プロジェクトを検索（Enter）")
+        self.search_edit.setMinimumWidth(250)
+        self.search_edit.returnPressed.connect(self.open_search)
+        header_layout.addWidget(self.search_edit)
+        
         header_layout.addStretch()
         
+        # データ読み込み完了まで無効化するボタン
+        self.data_buttons = [self.search_edit]
+        
         # Phase 2インポートボタン
         import_phase2_btn = QPushButton("Phase 2からインポート")
         import_phase2_btn.clicked.connect(self.import_phase2_project)
         header_layout.addWidget(import_phase2_btn)
+        self.data_buttons.append(import_phase2_btn)
         
         # 設定ボタン（新機能）
         settings_btn = QPushButton("⚙️ 設定")
@@ -100,17 +201,30 @@ class MainWindow(QMainWindow):
         prompt_btn.setToolTip("Claude用のプロンプトを生成してクリップボードにコピー")
         prompt_btn.clicked.connect(self.generate_prompt)
         header_layout.addWidget(prompt_btn)
+        self.data_buttons.append(prompt_btn)
+        
+        # 差分プロンプト生成ボタン
+        delta_prompt_btn = QPushButton("📋 差分プロンプト")
+        delta_prompt_btn.setToolTip("前回のプロンプト生成以降の変更のみをクリップボードにコピー")
+        delta_prompt_btn.clicked.connect(self.generate_delta_prompt)
+        header_layout.addWidget(delta_prompt_btn)
+        self.data_buttons.append(delta_prompt_btn)
         
         # JSON取り込みボタン
         json_import_btn = QPushButton("📥 JSON取り込み")
         json_import_btn.setToolTip("Claudeからの回答JSONを一括インポート")
         json_import_btn.clicked.connect(self.import_json_bulk)
         header_layout.addWidget(json_import_btn)
+        self.data_buttons.append(json_import_btn)
         
         # Phase 4エクスポートボタン
         export_btn = QPushButton("Phase 4へエクスポート")
         export_btn.clicked.connect(self.export_to_phase4)
         header_layout.addWidget(export_btn)
+        self.data_buttons.append(export_btn)
+        
+        for button in self.data_buttons:
+            button.setEnabled(False)
         
         return header_layout
     
@@ -124,12 +238,52 @@ class MainWindow(QMainWindow):
             f"作業ディレクトリ: {work_dir} | シェル: {shell_type} | v3.0"
         )
     
+    def set_perf_overlay_active(self, enabled: bool):
+        """計測が有効な間だけステータスバーの計測結果を定期更新"""
+        if enabled:
+            self.perf_timer.start()
+        else:
+            self.perf_timer.stop()
+        self.update_perf_overlay()
+    
+    def update_perf_overlay(self):
+        """ステータスバーに最も遅い処理の p50 / p95 を表示"""
+        if not PerfRecorder.enabled:
+            self.perf_label.clear()
+            return
+        
+        summary = PerfRecorder.summary()
+        if not summary:
+            self.perf_label.setText("⏱ 計測中")
+            return
+        
+        ranked = sorted(summary.items(), key=lambda item: item[1]['p95_ms'], reverse=True)
+        name, stats = ranked[0]
+        self.perf_label.setText(f"⏱ {name} p50 {stats['p50_ms']:.0f}ms / p95 {stats['p95_ms']:.0f}ms")
+        self.perf_label.setToolTip("\n".join(
+            f"{n}: p50 {s['p50_ms']:.1f}ms / p95 {s['p95_ms']:.1f}ms (n={s['count']})"
+            for n, s in ranked[:10]
+        ))
+    
+    def open_diagnostics(self):
+        """診断ダイアログを開く"""
+        from ui.diagnostics_dialog import DiagnosticsDialog
+        
+        dialog = DiagnosticsDialog(self.config_manager, self)
+        dialog.enabled_changed.connect(self.set_perf_overlay_active)
+        dialog.exec()
+        self.update_perf_overlay()
+    
     def open_settings(self):
         """設定ダイアログを開く（新機能）"""
+        from ui.settings_dialog import SettingsDialog
+        
         dialog = SettingsDialog(self)
         if dialog.exec():
             # 設定を再読み込み（重要！）
             self.config_manager.config = self.config_manager.load_config()
+            # エクスポーターは出力形式を生成時に受け取るため、次回使用時に作り直す
+            self._exporter = None
             
             # RequestTabのconfig_managerも同じインスタンスなので自動で反映される
             # ステータスバーを更新
@@ -139,9 +293,49 @@ class MainWindow(QMainWindow):
                 self,
                 "設定保存完了",
                 "✅ 設定が保存されました。\n\n"
-                "作業ディレクトリとシェルタイプがすぐに使用可能です。"
+                "変更した設定はすぐに使用可能です。"
             )
     
+    def start_loading_projects(self):
+        """プロジェクトデータの読み込みをバックグラウンドで開始"""
+        self.project_combo.addItem(LOADING_TEXT)
+        self.status_bar.showMessage("プロジェクトデータを読み込み中...")
+        
+        self._load_worker = FunctionWorker(self.manager.load_projects)
+        self._load_worker.signals.finished.connect(self.on_projects_loaded)
+        self._load_worker.signals.failed.connect(self.on_projects_load_failed)
+        self._load_worker.start()
+    
+    def on_projects_loaded(self, _result=None):
+        """プロジェクトデータ読み込み完了時"""
+        StartupTrace.mark('data_loaded')
+        self.data_loaded = True
+        self._load_worker = None
+        
+        for button in self.data_buttons:
+            button.setEnabled(True)
+        
+        self.update_status_bar()
+        self.load_projects()
+        self.finish_startup_trace()
+    
+    def on_projects_load_failed(self, message: str):
+        """プロジェクトデータ読み込み失敗時"""
+        self._load_worker = None
+        self.project_combo.clear()
+        self.project_combo.addItem(NO_PROJECT_TEXT)
+        # 壊れたデータを空の状態で上書きしないよう、ボタンは無効のままにする
+        QMessageBox.critical(
+            self,
+            "読み込みエラー",
+            f"プロジェクトデータの読み込みに失敗しました:\n{message}"
+        )
+    
+    def finish_startup_trace(self):
+        """起動トレースが揃ったらログに記録"""
+        if StartupTrace.has_mark('first_paint') and StartupTrace.has_mark('data_loaded'):
+            StartupTrace.write()
+    
     def load_projects(self):
         """プロジェクトリストを読み込み"""
         self.project_combo.clear()
@@ -150,11 +344,11 @@ class MainWindow(QMainWindow):
         if project_names:
             self.project_combo.addItems(project_names)
         else:
-            self.project_combo.addItem("(プロジェクトなし)")
+            self.project_combo.addItem(NO_PROJECT_TEXT)
     
     def on_project_changed(self, project_name: str):
         """プロジェクト選択変更時"""
-        if project_name and project_name != "(プロジェクトなし)":
+        if project_name and project_name not in (NO_PROJECT_TEXT, LOADING_TEXT):
             for project in self.manager.projects:
                 if project.project_name == project_name:
                     self.current_project = project
@@ -165,12 +359,43 @@ class MainWindow(QMainWindow):
             self.current_project = None
             self.refresh_all_tabs()
     
+    def on_tab_changed(self, index: int):
+        """タブ切り替え時（未構築のタブはここで構築）"""
+        if self.data_loaded:
+            self.ensure_tab(index)
+    
+    def ensure_tab(self, index: int):
+        """タブを必要に応じて読み込み・構築して返す"""
+        attr, module_name, class_name, label = TAB_SPECS[index]
+        if attr in self.built_tabs:
+            return self.built_tabs[attr]
+        
+        with PerfRecorder.span(f"tab.{attr}.build"):
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+            tab = tab_class(self)
+        self.built_tabs[attr] = tab
+        setattr(self, attr, tab)
+        
+        # プレースホルダーを差し替え（選択中のタブは維持）
+        current = self.tab_widget.currentIndex()
+        self.tab_widget.blockSignals(True)
+        placeholder = self.tab_widget.widget(index)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, tab, label)
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+        
+        tab.refresh()
+        return tab
+    
     def refresh_all_tabs(self):
-        """全タブをリフレッシュ"""
-        self.request_tab.refresh()
-        self.deploy_tab.refresh()
-        self.test_tab.refresh()
-        self.issue_tab.refresh()
+        """全タブをリフレッシュ（未構築のタブは表示時に構築・更新される）"""
+        for tab in list(self.built_tabs.values()):
+            tab.refresh()
+        
+        if self.data_loaded:
+            self.ensure_tab(self.tab_widget.currentIndex())
     
     def import_phase2_project(self):
         """Phase 2プロジェクトをインポート"""
@@ -178,7 +403,7 @@ class MainWindow(QMainWindow):
             self,
             "Phase 2エクスポートファイルを選択",
             "",
-            "JSON Files (*.json)"
+            "JSON Files (*.json *.json.gz *.json.xz *.json.zst);;All Files (*)"
         )
         
         if not filepath:
@@ -214,30 +439,81 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            prompt = self.prompt_generator.generate_full_prompt(self.current_project)
+            token_budget = self.config_manager.get_prompt_token_budget()
+            prompt, stats = self.prompt_generator.generate_budgeted_prompt(self.current_project, token_budget)
             
             clipboard = QApplication.clipboard()
             clipboard.setText(prompt)
             
-            QMessageBox.information(
-                self,
-                "成功",
-                "プロンプトをクリップボードにコピーしました。\n\n"
-                "Claude に貼り付けて質問してください。"
-            )
-            self.status_bar.showMessage("プロンプトをクリップボードにコピーしました", 5000)
+            budget_text = f" / 予算 {token_budget:,}" if token_budget else ""
+            message = f"プロンプトをクリップボードにコピーしました（推定 {stats['tokens']:,} トークン{budget_text}）。\n\n"
+            if stats['issues_summarized'] or stats['issues_elided']:
+                message += (
+                    f"予算に合わせて解決済みの問題を要約 {len(stats['issues_summarized'])}件・"
+                    f"省略 {len(stats['issues_elided'])}件にしました。\n\n"
+                )
+            if not stats['within_budget']:
+                message += "⚠️ 未解決・再発中の問題だけで予算を超えています。\n\n"
+            message += "Claude に貼り付けて質問してください。"
+            
+            self.record_prompt_watermark('full', stats['tokens'])
+            QMessageBox.information(self, "成功", message)
+            self.status_bar.showMessage(f"プロンプトをクリップボードにコピーしました（推定 {stats['tokens']:,} トークン）", 5000)
             
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"プロンプト生成エラー:\n{str(e)}")
     
+    def generate_delta_prompt(self):
+        """前回のプロンプト以降の差分プロンプトを生成してクリップボードにコピー"""
+        if not self.current_project:
+            QMessageBox.warning(self, "警告", "プロジェクトが選択されていません")
+            return
+        
+        try:
+            prompt, stats = self.prompt_generator.generate_delta_prompt(self.current_project)
+            
+            clipboard = QApplication.clipboard()
+            clipboard.setText(prompt)
+            
+            if stats['mode'] == 'full':
+                message = (
+                    "前回のプロンプト記録がないため、完全なプロンプトをコピーしました"
+                    f"（推定 {stats['tokens']:,} トークン）。\n\n"
+                )
+            else:
+                message = (
+                    f"前回（{stats['since'][:16].replace('T', ' ')}）以降の差分をコピーしました"
+                    f"（変更 {stats['changed']}件・推定 {stats['tokens']:,} トークン）。\n\n"
+                )
+            message += "Claude に貼り付けて質問してください。"
+            
+            self.record_prompt_watermark(stats['mode'], stats['tokens'])
+            QMessageBox.information(self, "成功", message)
+            self.status_bar.showMessage(f"差分プロンプトをクリップボードにコピーしました（推定 {stats['tokens']:,} トークン）", 5000)
+            
+        except Exception as e:
+            QMessageBox.critical(self, "エラー", f"プロンプト生成エラー:\n{str(e)}")
+    
+    def record_prompt_watermark(self, mode: str, tokens: int):
+        """プロンプトを送った時点を記録（内容は変わらないためリビジョンは進めない）"""
+        self.prompt_generator.record_watermark(self.current_project, mode, tokens)
+        self.manager.save_projects()
+    
     def import_json_bulk(self):
         """JSON一括インポート"""
         if not self.current_project:
             QMessageBox.warning(self, "警告", "プロジェクトが選択されていません")
             return
         
+        from ui.import_dialog import ImportDialog
+        
         dialog = ImportDialog(self)
         if dialog.exec():
+            batch = dialog.get_batch()
+            if batch:
+                self.import_json_batch(batch)
+                return
+            
             data = dialog.get_data()
             
             if not data:
@@ -245,7 +521,7 @@ class MainWindow(QMainWindow):
                 return
             
             success, message, stats = self.json_importer.import_to_project(
-                self.current_project, data
+                self.current_project, data, detector=self.duplicate_detector
             )
             
             if success:
@@ -253,10 +529,31 @@ class MainWindow(QMainWindow):
                 self.refresh_all_tabs()
                 
                 QMessageBox.information(self, "成功", message)
+                if self.merge_duplicate_issues(stats['duplicates']):
+                    self.save_current_project()
+                    self.refresh_all_tabs()
                 self.status_bar.showMessage("JSON一括インポート完了", 5000)
             else:
                 QMessageBox.critical(self, "エラー", message)
     
+    def import_json_batch(self, validated):
+        """検証済みペイロードを一括インポート（保存は最後に1回のみ）"""
+        success, message, stats = self.json_importer.import_batch(
+            self.manager.projects, validated, self.current_project, self.duplicate_detector
+        )
+        
+        if success:
+            self.manager.save_projects()
+            self.refresh_all_tabs()
+            
+            QMessageBox.information(self, "成功", message)
+            if self.merge_duplicate_issues(stats['duplicates']):
+                self.manager.save_projects()
+                self.refresh_all_tabs()
+            self.status_bar.showMessage(f"JSON一括インポート完了（{stats['applied']}件）", 5000)
+        else:
+            QMessageBox.critical(self, "エラー", message)
+    
     def export_to_phase4(self):
         """Phase 4へエクスポート"""
         if not self.current_project:
@@ -277,8 +574,83 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "エクスポート不可", message)
     
+    def find_duplicate_issues(self, title: str, description: str = ''):
+        """現在のプロジェクトでタイトル・説明が似ている既存の問題・バグ"""
+        if not self.current_project:
+            return []
+        self.duplicate_detector.ensure_project(self.current_project)
+        return self.duplicate_detector.find_similar(
+            title, description, project_id=self.current_project.project_id
+        )
+    
+    def merge_duplicate_issues(self, duplicates) -> int:
+        """インポートで作成された重複の可能性がある問題を、確認のうえ既存の問題の『再発』にまとめる"""
+        pairs = [d for d in duplicates if d['kind'] == 'issue' and d['existing_kind'] == 'issue']
+        if not pairs:
+            return 0
+        
+        lines = "\n".join(f"- {self.json_importer.format_duplicate(d)}" for d in pairs[:10])
+        more = f"\n... 他 {len(pairs) - 10}件" if len(pairs) > 10 else ""
+        reply = QMessageBox.question(
+            self, "重複の可能性",
+            f"既存の問題と重複している可能性がある問題を {len(pairs)}件 作成しました。\n\n"
+            f"{lines}{more}\n\n"
+            "新規作成した問題を取り除き、既存の問題に『再発』として記録しますか?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return 0
+        
+        merged = 0
+        for d in pairs:
+            project = self.manager.get_project_by_id(d['project_id'])
+            if project and project.merge_issue_as_recurrence(d['ref'], d['existing_ref'], 'json_import'):
+                merged += 1
+        return merged
+    
+    def search(self, query: str, **options):
+        """変更のあったプロジェクトだけ索引を更新してから全文検索"""
+        self.search_index.sync(self.manager.projects)
+        return self.search_index.search(query, **options)
+    
+    def open_search(self):
+        """検索ダイアログを開く（開いていれば検索語を引き継いで前面に出す）"""
+        from ui.search_dialog import SearchDialog
+        
+        query = self.search_edit.text().strip()
+        if self._search_dialog is None:
+            self._search_dialog = SearchDialog(self, query)
+        else:
+            self._search_dialog.set_query(query)
+        self._search_dialog.show()
+        self._search_dialog.raise_()
+        self._search_dialog.activateWindow()
+    
+    def show_search_result(self, result):
+        """検索結果のプロジェクトを選択し、該当タブの該当行を選択"""
+        project = self.manager.get_project_by_id(result['project_id'])
+        if project is None:
+            return
+        if project is not self.current_project:
+            self.project_combo.setCurrentText(project.project_name)
+        
+        attr, table_attr = SEARCH_RESULT_TABS[result['kind']]
+        index = next(i for i, spec in enumerate(TAB_SPECS) if spec[0] == attr)
+        self.tab_widget.setCurrentIndex(index)
+        table = getattr(self.ensure_tab(index), table_attr)
+        for row in range(table.rowCount()):
+            item = table.item(row, 0)
+            if item and item.text() == str(result['ref']):
+                table.selectRow(row)
+                table.scrollToItem(item)
+                break
+        self.activateWindow()
+    
     def save_current_project(self):
         """現在のプロジェクトを保存"""
         if self.current_project:
             self.manager.update_project(self.current_project)
+            # 索引を構築済みなら変更された文書だけを更新しておく
+            if self._search_index is not None:
+                self._search_index.update_project(self.current_project)
             self.status_bar.showMessage("保存しました", 3000)
@@ -4,14 +4,14 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                                QTableWidget, QTableWidgetItem, QHeaderView,
                                QMessageBox, QApplication, QTextEdit, QDialog,
-                               QLabel)
+                               QLabel, QFileDialog)
 from PySide6.QtCore import Qt
 from datetime import datetime
+from pathlib import Path
 from typing import Dict
 from ui.dialogs import RequestDialog
-from ui.code_execution_dialog import CodeExecutionDialog
 from utils.implementation_prompt_generator import ImplementationPromptGenerator
-from utils.code_generator import CodeGenerator
+from utils.perf import timed
 
 class PromptDisplayDialog(QDialog):
     """生成されたプロンプトを表示するダイアログ"""
@@ -62,7 +62,6 @@ class RequestTab(QWidget):
         super().__init__()
         self.main_window = main_window
         self.prompt_gen = ImplementationPromptGenerator()
-        self.code_gen = CodeGenerator()
         # MainWindowのConfigManagerを共有
         self.config_manager = main_window.config_manager
         self.init_ui()
@@ -106,6 +105,13 @@ class RequestTab(QWidget):
         next_btn.clicked.connect(self.generate_next_prompt)
         button_layout.addWidget(next_btn)
         
+        # 🗂️ 一括生成ボタン
+        batch_btn = QPushButton("🗂️ 一括生成")
+        batch_btn.setToolTip("未完了の全依頼の実装・チェックプロンプトをフォルダまたはZIPに書き出し")
+        batch_btn.setStyleSheet("background-color: #009688; color: white; font-weight: bold; padding: 5px 15px;")
+        batch_btn.clicked.connect(self.generate_batch_prompts)
+        button_layout.addWidget(batch_btn)
+        
         # 🚀 JSON実行ボタン
         json_exec_btn = QPushButton("🚀 JSON実行")
         json_exec_btn.setToolTip("Claude から受け取った JSON からファイル作成コマンドを生成")
@@ -140,6 +146,7 @@ class RequestTab(QWidget):
         
         layout.addWidget(self.table)
     
+    @timed('tab.request_tab.refresh')
     def refresh(self):
         """テーブルをリフレッシュ"""
         self.table.setRowCount(0)
@@ -229,12 +236,12 @@ class RequestTab(QWidget):
         # シェルタイプ取得
         shell_type = self.config_manager.get_shell_type()
         
-        # Phase 2データ取得
-        phase2_data = self.main_window.current_project.import_info.get('original_data', {})
+        # Phase 2設計情報（プロジェクトのリビジョンごとにキャッシュ）
+        context = self.prompt_gen.get_project_context(self.main_window.current_project)
         
         # プロンプト生成
         prompt = self.prompt_gen.generate_implementation_prompt(
-            request, phase2_data, shell_type
+            request, None, shell_type, context=context
         )
         
         # クリップボードにコピー
@@ -379,9 +386,16 @@ class RequestTab(QWidget):
         # シェルタイプ取得
         shell_type = self.config_manager.get_shell_type()
         
-        # ダイアログを開く
-        dialog = CodeExecutionDialog(work_dir, shell_type, self)
+        # ダイアログを開く（初回使用時に読み込む）
+        from ui.code_execution_dialog import CodeExecutionDialog
+        
+        dialog = CodeExecutionDialog(work_dir, shell_type, self, project=self.main_window.current_project)
         dialog.exec()
+        
+        # 直接書き込みで配置記録が増えた場合は保存
+        if dialog.deployed_entries:
+            self.main_window.save_current_project()
+            self.main_window.refresh_all_tabs()
     
     def generate_mvp_prompt(self):
         """最小構成（MVP）用プロンプトを生成"""
@@ -403,15 +417,16 @@ class RequestTab(QWidget):
         # シェルタイプ取得
         shell_type = self.config_manager.get_shell_type()
         
-        # Phase 2データ取得
-        phase2_data = self.main_window.current_project.import_info.get('original_data', {}).get('project', {})
+        # Phase 2設計情報（プロジェクトのリビジョンごとにキャッシュ）
+        context = self.prompt_gen.get_project_context(self.main_window.current_project)
         
         # MVPプロンプト生成
         prompt = self.prompt_gen.generate_mvp_prompt(
             self.main_window.current_project.project_name,
-            phase2_data,
+            None,
             work_dir,
-            shell_type
+            shell_type,
+            context=context
         )
         
         # クリップボードにコピー
@@ -441,20 +456,9 @@ class RequestTab(QWidget):
         # シェルタイプ取得
         shell_type = self.config_manager.get_shell_type()
         
-        # 全依頼を取得
-        all_requests = self.main_window.current_project.code_requests
-        
-        # 完了済みIDを取得（status が '完了' または '受領済み' のID）
-        completed_ids = [r['id'] for r in all_requests if r.get('status') in ['完了', '受領済み']]
-        
-        # Phase 2データ取得
-        phase2_data = self.main_window.current_project.import_info.get('original_data', {}).get('project', {})
-        
-        # 次の依頼プロンプト生成
-        prompt = self.prompt_gen.generate_next_request_prompt(
-            all_requests,
-            completed_ids,
-            phase2_data,
+        # 次の依頼プロンプト生成（依頼キュー・設計情報はリビジョンごとにキャッシュ）
+        prompt = self.prompt_gen.generate_next_prompt_for_project(
+            self.main_window.current_project,
             shell_type
         )
         
@@ -474,6 +478,58 @@ class RequestTab(QWidget):
         dialog = PromptDisplayDialog(prompt, "📦 次の依頼プロンプト", self)
         dialog.exec()
     
+    def generate_batch_prompts(self):
+        """未完了の全依頼のプロンプトを一括生成して書き出し"""
+        project = self.main_window.current_project
+        if not project:
+            QMessageBox.warning(self, "警告", "プロジェクトが選択されていません")
+            return
+        
+        work_dir = self.config_manager.get_work_directory()
+        if not work_dir:
+            QMessageBox.warning(
+                self,
+                "警告",
+                "作業ディレクトリが設定されていません。"
+            )
+            return
+        
+        if not self.prompt_gen.get_request_queue(project)['pending']:
+            QMessageBox.information(self, "完了", "✅ 全ての依頼が完了しています！")
+            return
+        
+        # 書き出し先（ZIP またはフォルダ）
+        default_name = f"prompts_{project.project_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        use_zip = QMessageBox.question(
+            self,
+            "書き出し形式",
+            "ZIPファイルにまとめますか？\n\n「いいえ」を選ぶとフォルダに書き出します。"
+        ) == QMessageBox.Yes
+        
+        if use_zip:
+            output_path, _ = QFileDialog.getSaveFileName(
+                self, "プロンプトの保存先", f"{default_name}.zip", "ZIP Files (*.zip)"
+            )
+            if output_path and not output_path.lower().endswith('.zip'):
+                output_path += '.zip'
+        else:
+            parent_dir = QFileDialog.getExistingDirectory(self, "プロンプトの保存先フォルダ")
+            output_path = str(Path(parent_dir) / default_name) if parent_dir else ''
+        
+        if not output_path:
+            return
+        
+        from utils.batch_prompt_generator import BatchPromptGenerator
+        
+        shell_type = self.config_manager.get_shell_type()
+        prompts = BatchPromptGenerator.generate(project, work_dir, shell_type)
+        success, message, _ = BatchPromptGenerator.write(project, prompts, output_path, work_dir, shell_type)
+        
+        if success:
+            QMessageBox.information(self, "成功", f"{message}\n\n{output_path}")
+        else:
+            QMessageBox.critical(self, "エラー", message)
+    
     def toggle_completion(self, request: Dict):
         """依頼の完了ステータスを切り替え"""
         if request.get('status') == '完了':
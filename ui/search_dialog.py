@@ -0,0 +1,132 @@
+"""
+全文検索ダイアログ - 全プロジェクトの問題・履歴・コード依頼・バグを検索
+"""
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView,
+                               QLabel, QLineEdit, QComboBox)
+from PySide6.QtCore import QTimer
+from utils.search_index import DOC_LABELS
+
+# 入力が止まってから検索するまでの待ち時間
+SEARCH_DELAY_MS = 150
+
+# 表示する検索結果の最大件数
+SEARCH_LIMIT = 200
+
+class SearchDialog(QDialog):
+    """検索語の入力に合わせて結果を更新し、ダブルクリックで該当タブへ移動するダイアログ"""
+
+    def __init__(self, main_window, query: str = ''):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.results = []
+        self.setWindowTitle("🔍 全文検索")
+        self.setMinimumSize(900, 500)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        self.init_ui()
+        self.set_query(query)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        query_layout = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("問題・履歴・コード依頼・バグを検索（スペース区切りで AND 検索）")
+        self.query_edit.textChanged.connect(lambda _: self.search_timer.start())
+        self.query_edit.returnPressed.connect(self.run_search)
+        query_layout.addWidget(self.query_edit)
+
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItem("すべて", None)
+        for kind, label in DOC_LABELS.items():
+            self.kind_combo.addItem(label, kind)
+        self.kind_combo.currentIndexChanged.connect(self.run_search)
+        query_layout.addWidget(self.kind_combo)
+
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItems(["全プロジェクト", "選択中のプロジェクト"])
+        self.scope_combo.currentIndexChanged.connect(self.run_search)
+        query_layout.addWidget(self.scope_combo)
+        layout.addLayout(query_layout)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["プロジェクト", "種別", "ID", "タイトル", "抜粋"])
+        header = self.table.horizontalHeader()
+        for column in range(3):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.Interactive)
+        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        self.table.setColumnWidth(3, 250)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.cellDoubleClicked.connect(self.open_result)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        open_btn = QPushButton("開く")
+        open_btn.clicked.connect(lambda: self.open_result(self.table.currentRow()))
+        button_layout.addWidget(open_btn)
+
+        close_btn = QPushButton("閉じる")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def set_query(self, query: str):
+        """検索語を設定してすぐに検索"""
+        self.query_edit.blockSignals(True)
+        self.query_edit.setText(query)
+        self.query_edit.blockSignals(False)
+        self.run_search()
+
+    def run_search(self):
+        """検索して結果を表示"""
+        self.search_timer.stop()
+        query = self.query_edit.text().strip()
+        if not query:
+            self.results = []
+            self.show_results()
+            self.summary_label.setText("")
+            return
+
+        kind = self.kind_combo.currentData()
+        project = self.main_window.current_project if self.scope_combo.currentIndex() else None
+        self.results = self.main_window.search(
+            query,
+            limit=SEARCH_LIMIT,
+            kinds=[kind] if kind else None,
+            project_id=project.project_id if project else None
+        )
+        self.show_results()
+        more = "以上" if len(self.results) >= SEARCH_LIMIT else ""
+        self.summary_label.setText(f"{len(self.results)}件{more}ヒット（ダブルクリックで該当タブを開く）")
+
+    def show_results(self):
+        """検索結果をテーブルに表示"""
+        names = {p.project_id: p.project_name for p in self.main_window.manager.projects}
+        self.table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            self.table.setItem(row, 0, QTableWidgetItem(names.get(result['project_id'], result['project_id'])))
+            self.table.setItem(row, 1, QTableWidgetItem(DOC_LABELS.get(result['kind'], result['kind'])))
+            self.table.setItem(row, 2, QTableWidgetItem(str(result['ref'])))
+            self.table.setItem(row, 3, QTableWidgetItem(result['title']))
+            snippet_item = QTableWidgetItem(result['snippet'])
+            snippet_item.setToolTip(result['snippet'])
+            self.table.setItem(row, 4, snippet_item)
+
+    def open_result(self, row: int, _column: int = 0):
+        """検索結果のプロジェクトとタブを開く"""
+        if 0 <= row < len(self.results):
+            self.main_window.show_search_result(self.results[row])
@@ -3,9 +3,10 @@
 """
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QLineEdit, QPushButton, QComboBox, QFileDialog,
-                               QFormLayout, QGroupBox)
+                               QFormLayout, QGroupBox, QSpinBox)
 from PySide6.QtCore import Qt
 from utils.config_manager import ConfigManager
+from utils.exporter import EXPORT_FORMATS, EXPORT_FORMAT_LABELS
 
 class SettingsDialog(QDialog):
     """設定ダイアログ"""
@@ -47,10 +48,38 @@ class SettingsDialog(QDialog):
         shell_group.setLayout(shell_layout)
         layout.addWidget(shell_group)
         
+        # プロンプト設定
+        prompt_group = QGroupBox("プロンプト")
+        prompt_layout = QFormLayout()
+        
+        self.token_budget_spin = QSpinBox()
+        self.token_budget_spin.setRange(0, 1000000)
+        self.token_budget_spin.setSingleStep(1000)
+        self.token_budget_spin.setSuffix(" トークン")
+        self.token_budget_spin.setSpecialValueText("無制限")
+        prompt_layout.addRow("トークン予算:", self.token_budget_spin)
+        
+        prompt_group.setLayout(prompt_layout)
+        layout.addWidget(prompt_group)
+        
+        # エクスポート設定
+        export_group = QGroupBox("Phase 4エクスポート")
+        export_layout = QFormLayout()
+        
+        self.export_format_combo = QComboBox()
+        for export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(EXPORT_FORMAT_LABELS[export_format], export_format)
+        export_layout.addRow("出力形式:", self.export_format_combo)
+        
+        export_group.setLayout(export_layout)
+        layout.addWidget(export_group)
+        
         # 説明
         info_label = QLabel(
             "作業ディレクトリ: コード生成時の出力先ディレクトリ\n"
-            "シェルタイプ: コマンド生成時に使用するシェル形式"
+            "シェルタイプ: コマンド生成時に使用するシェル形式\n"
+            "トークン予算: 超える場合は再発のない解決済みの問題を古い順に要約・省略する（0 は無制限）\n"
+            "出力形式: 1行 JSON・圧縮形式はファイルが小さく、読み込み時に自動で展開される"
         )
         info_label.setWordWrap(True)
         info_label.setStyleSheet("color: gray; font-size: 10pt;")
@@ -91,6 +120,11 @@ class SettingsDialog(QDialog):
         
         index = shell_mapping.get(shell_type, 0)
         self.shell_combo.setCurrentIndex(index)
+        
+        self.token_budget_spin.setValue(self.config_manager.get_prompt_token_budget())
+        
+        index = self.export_format_combo.findData(self.config_manager.get_export_format())
+        self.export_format_combo.setCurrentIndex(max(index, 0))
     
     def browse_directory(self):
         """ディレクトリを選択"""
@@ -125,5 +159,7 @@ class SettingsDialog(QDialog):
             'work_directory': work_dir,
             'shell_type': shell_type
         })
+        self.config_manager.set_prompt_token_budget(self.token_budget_spin.value())
+        self.config_manager.set_export_format(self.export_format_combo.currentData())
         
         self.accept()
@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                                QMessageBox, QLabel, QSplitter)
 from PySide6.QtCore import Qt
 from ui.dialogs import TestDialog, BugDialog
+from utils.perf import timed
 
 class TestTab(QWidget):
     """テスト・バグ管理タブ（編集機能追加版）"""
@@ -135,6 +136,7 @@ class TestTab(QWidget):
         
         return widget
     
+    @timed('tab.test_tab.refresh')
     def refresh(self):
         """テーブルをリフレッシュ"""
         self.refresh_tests()
@@ -0,0 +1,45 @@
+"""
+バックグラウンド処理用ワーカー
+"""
+import logging
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+class WorkerSignals(QObject):
+    """ワーカーの結果を GUI スレッドへ通知するシグナル"""
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class FunctionWorker(QRunnable):
+    """任意の関数をスレッドプール上で実行するワーカー
+
+    結果は finished、例外は failed シグナルで通知される。シグナルは
+    生成したスレッド（通常は GUI スレッド）の QObject に属するため、
+    接続先のスロットは GUI スレッドで実行される。
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        # 呼び出し側が参照を保持し、シグナル配送前に破棄されないようにする
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            logger.exception("バックグラウンド処理に失敗しました: %r", self.fn)
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+    def start(self) -> 'FunctionWorker':
+        """グローバルスレッドプールで実行を開始"""
+        QThreadPool.globalInstance().start(self)
+        return self
@@ -0,0 +1,114 @@
+"""
+未完了のコード依頼のプロンプト一括生成ユーティリティ
+"""
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from utils.implementation_prompt_generator import ImplementationPromptGenerator
+from utils.perf import timed
+from utils.prompt_builder import estimate_tokens
+
+# 一括生成するプロンプトの種類（種類, ファイル名の接尾辞）
+BATCH_PROMPT_KINDS = [
+    ('implementation', 'impl'),
+    ('check', 'check'),
+]
+
+MANIFEST_NAME = 'manifest.json'
+
+class BatchPromptGenerator:
+    """未完了の全依頼について実装・チェックプロンプトをまとめて生成するクラス"""
+
+    @staticmethod
+    def _render(request: Dict, kind: str, suffix: str, context: Dict,
+                work_dir: str, shell_type: str) -> Dict:
+        """1件分のプロンプトを生成（スレッドプールから呼ばれる）"""
+        if kind == 'implementation':
+            prompt = ImplementationPromptGenerator.generate_implementation_prompt(
+                request, None, shell_type, context=context
+            )
+        else:
+            prompt = ImplementationPromptGenerator.generate_check_prompt(request, work_dir)
+
+        return {
+            'request_id': request['id'],
+            'function_name': request.get('function_name', ''),
+            'kind': kind,
+            'filename': f"ID{request['id']:03d}_{suffix}.md",
+            'prompt': prompt
+        }
+
+    @staticmethod
+    @timed('batch_prompt.generate')
+    def generate(project, work_dir: str, shell_type: str = 'powershell',
+                 max_workers: Optional[int] = None) -> List[Dict]:
+        """未完了の全依頼のプロンプトを依頼ID順に生成
+
+        設計情報の文脈はプロジェクトごとに1回だけ作り、全スレッドで共有する。
+        """
+        context = ImplementationPromptGenerator.get_project_context(project)
+        pending = ImplementationPromptGenerator.get_request_queue(project)['pending']
+        jobs = [(request, kind, suffix) for request in pending for kind, suffix in BATCH_PROMPT_KINDS]
+        if not jobs:
+            return []
+
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(BatchPromptGenerator._render, request, kind, suffix, context, work_dir, shell_type)
+                for request, kind, suffix in jobs
+            ]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def build_manifest(project, prompts: List[Dict], work_dir: str, shell_type: str) -> Dict:
+        """一括生成結果のマニフェストを作成"""
+        return {
+            'project_id': project.project_id,
+            'project_name': project.project_name,
+            'generated_at': datetime.now().isoformat(),
+            'work_dir': work_dir,
+            'shell_type': shell_type,
+            'prompts': [
+                {
+                    'request_id': p['request_id'],
+                    'function_name': p['function_name'],
+                    'kind': p['kind'],
+                    'file': p['filename'],
+                    'length': len(p['prompt']),
+                    'tokens': estimate_tokens(p['prompt'])
+                } for p in prompts
+            ]
+        }
+
+    @staticmethod
+    @timed('batch_prompt.write')
+    def write(project, prompts: List[Dict], output_path: str, work_dir: str,
+              shell_type: str) -> Tuple[bool, str, Optional[Dict]]:
+        """プロンプトをフォルダまたは ZIP（拡張子 .zip）に書き出し、マニフェストを添える"""
+        try:
+            manifest = BatchPromptGenerator.build_manifest(project, prompts, work_dir, shell_type)
+            manifest_text = json.dumps(manifest, ensure_ascii=False, indent=2)
+            path = Path(output_path)
+
+            if path.suffix.lower() == '.zip':
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                    for p in prompts:
+                        archive.writestr(p['filename'], p['prompt'])
+                    archive.writestr(MANIFEST_NAME, manifest_text)
+            else:
+                path.mkdir(parents=True, exist_ok=True)
+                for p in prompts:
+                    (path / p['filename']).write_text(p['prompt'], encoding='utf-8')
+                (path / MANIFEST_NAME).write_text(manifest_text, encoding='utf-8')
+
+            request_count = len({p['request_id'] for p in prompts})
+            return True, f"{request_count}件の依頼のプロンプト（{len(prompts)}ファイル）を書き出しました", manifest
+
+        except Exception as e:
+            return False, f"プロンプトの書き出しに失敗しました: {str(e)}", None
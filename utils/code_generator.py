@@ -1,122 +1,381 @@
 ﻿"""
 シェルコマンド生成ユーティリティ
 """
-from pathlib import Path
-from typing import Dict, List
+import base64
+import io
+import tarfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, TextIO
+from models.implementation_project import normalize_deploy_path
+from utils.perf import timed
+
+# 逐次出力時に1回の書き込みにまとめる行数
+STREAM_BATCH_LINES = 1000
+
+# アーカイブモードでシェルごとに使う形式（Windows は標準で展開できる zip）
+ARCHIVE_FORMATS = {
+    'powershell': 'zip',
+    'terminal': 'tar.gz',
+    'cmd': 'zip'
+}
+
+# アーカイブを展開するときの一時ファイル名
+ARCHIVE_TEMP_NAME = 'deploy_bundle'
+
+# base64 の1行の文字数（CMD は echo の回数を減らすため長めにする）
+ARCHIVE_LINE_WIDTH = 76
+CMD_ARCHIVE_LINE_WIDTH = 4000
 
 class CodeGenerator:
-    """シェルコマンドを生成するクラス"""
+    """シェルコマンドを生成するクラス
+    
+    iter_*_lines はコマンドを1行ずつ返すジェネレーターで、全ファイル分の行リストを
+    作らずに iter_commands / write_commands でファイルやバッファへ逐次書き出せる。
+    generate_*_commands はそれらを結合した文字列を返す。
+    """
     
     @staticmethod
-    def generate_powershell_commands(work_dir: str, files: List[Dict]) -> str:
-        """PowerShellコマンドを生成"""
-        commands = []
+    def _powershell_patch_lines(file_info: Dict) -> List[str]:
+        """1ファイル分の差分適用 PowerShell コマンド行
         
-        # 作業ディレクトリへ移動
-        commands.append(f"# 作業ディレクトリへ移動")
-        commands.append(f"cd '{work_dir}'")
-        commands.append("")
+        パイプで渡すと $OutputEncoding（5.1 では ASCII）で変換されて日本語が壊れるため、
+        BOM なし UTF-8 の一時ファイルに書いてから適用する。上位ディレクトリの git
+        リポジトリを基準にしないよう GIT_CEILING_DIRECTORIES で作業ディレクトリに限定する。
+        """
+        filename = file_info['filename']
+        var_name = filename.replace('.', '_').replace('-', '_') + '_patch'
+        return [
+            f"# {filename} に差分を適用",
+            f"${var_name} = @'",
+            file_info['patch'][:-1],
+            "'@",
+            "",
+            "$patchFile = [System.IO.Path]::GetTempFileName()",
+            f"[System.IO.File]::WriteAllText($patchFile, ${var_name}.Replace(\"`r`n\", \"`n\") + \"`n\", "
+            "(New-Object System.Text.UTF8Encoding $false))",
+            "$env:GIT_CEILING_DIRECTORIES = Split-Path -Parent (Get-Location).Path",
+            "git apply --whitespace=nowarn $patchFile",
+            f"if ($LASTEXITCODE -ne 0) {{ Write-Host \"❌ {filename} の差分を適用できませんでした\" -ForegroundColor Red }}",
+            "Remove-Item Env:GIT_CEILING_DIRECTORIES",
+            "Remove-Item $patchFile",
+            "",
+            "# " + "-" * 50,
+            ""
+        ]
+    
+    @staticmethod
+    def _powershell_file_lines(file_info: Dict) -> List[str]:
+        """1ファイル分の PowerShell コマンド行（file_info に patch があれば差分適用）"""
+        if file_info.get('patch'):
+            return CodeGenerator._powershell_patch_lines(file_info)
         
-        for file_info in files:
-            filename = file_info['filename']
-            filepath = file_info['filepath']
-            content = file_info['content']
-            
-            # ディレクトリ作成
-            dir_path = str(Path(filepath).parent).replace('\\', '/')
-            if dir_path and dir_path != '.':
-                commands.append(f"# {filename} 用ディレクトリ作成")
-                commands.append(f"New-Item -ItemType Directory -Force -Path '{dir_path}' | Out-Null")
-                commands.append("")
-            
-            # ファイル作成
-            var_name = filename.replace('.', '_').replace('-', '_')
-            commands.append(f"# {filename} を作成")
-            commands.append(f"${var_name} = @'")
-            commands.append(content)
-            commands.append("'@")
-            commands.append("")
-            commands.append(f"${var_name} | Out-File -FilePath '{filepath}' -Encoding UTF8")
-            commands.append("")
-            commands.append(f"# 確認")
-            commands.append(f"Get-Content '{filepath}' | Select-Object -First 10")
-            commands.append("")
-            commands.append("# " + "-" * 50)
+        commands = []
+        filename = file_info['filename']
+        filepath = file_info['filepath']
+        content = file_info['content']
+        
+        # ディレクトリ作成
+        dir_path = str(Path(filepath).parent).replace('\\', '/')
+        if dir_path and dir_path != '.':
+            commands.append(f"# {filename} 用ディレクトリ作成")
+            commands.append(f"New-Item -ItemType Directory -Force -Path '{dir_path}' | Out-Null")
             commands.append("")
         
-        return "\n".join(commands)
+        # ファイル作成
+        var_name = filename.replace('.', '_').replace('-', '_')
+        commands.append(f"# {filename} を作成")
+        commands.append(f"${var_name} = @'")
+        commands.append(content)
+        commands.append("'@")
+        commands.append("")
+        commands.append(f"${var_name} | Out-File -FilePath '{filepath}' -Encoding UTF8")
+        commands.append("")
+        commands.append(f"# 確認")
+        commands.append(f"Get-Content '{filepath}' | Select-Object -First 10")
+        commands.append("")
+        commands.append("# " + "-" * 50)
+        commands.append("")
+        return commands
     
     @staticmethod
-    def generate_terminal_commands(work_dir: str, files: List[Dict]) -> str:
-        """Terminal (Mac/Linux) コマンドを生成"""
-        commands = []
+    def _terminal_patch_lines(file_info: Dict) -> List[str]:
+        """1ファイル分の差分適用 Terminal コマンド行
         
-        # 作業ディレクトリへ移動
-        commands.append(f"# 作業ディレクトリへ移動")
-        commands.append(f"cd '{work_dir}'")
-        commands.append("")
+        上位ディレクトリの git リポジトリを基準にしないよう GIT_CEILING_DIRECTORIES で
+        作業ディレクトリに限定し、適用に失敗したらメッセージを出す。
+        """
+        filename = file_info['filename']
+        return [
+            f"# {filename} に差分を適用",
+            "patch_file=$(mktemp)",
+            "cat > \"$patch_file\" << 'EOF'",
+            file_info['patch'][:-1],
+            "EOF",
+            "if ! GIT_CEILING_DIRECTORIES=\"$(dirname \"$PWD\")\" git apply --whitespace=nowarn \"$patch_file\"; then",
+            f"  echo \"❌ {filename} の差分を適用できませんでした\" >&2",
+            "fi",
+            "rm -f \"$patch_file\"",
+            "",
+            "# " + "-" * 50,
+            ""
+        ]
+    
+    @staticmethod
+    def _terminal_file_lines(file_info: Dict) -> List[str]:
+        """1ファイル分の Terminal コマンド行（file_info に patch があれば差分適用）"""
+        if file_info.get('patch'):
+            return CodeGenerator._terminal_patch_lines(file_info)
         
-        for file_info in files:
-            filename = file_info['filename']
-            filepath = file_info['filepath']
-            content = file_info['content']
-            
-            # ディレクトリ作成
-            dir_path = str(Path(filepath).parent)
-            if dir_path and dir_path != '.':
-                commands.append(f"# {filename} 用ディレクトリ作成")
-                commands.append(f"mkdir -p '{dir_path}'")
-                commands.append("")
-            
-            # ファイル作成
-            commands.append(f"# {filename} を作成")
-            commands.append(f"cat > '{filepath}' << 'EOF'")
-            commands.append(content)
-            commands.append("EOF")
-            commands.append("")
-            commands.append(f"# 確認")
-            commands.append(f"head -n 10 '{filepath}'")
-            commands.append("")
-            commands.append("# " + "-" * 50)
+        commands = []
+        filename = file_info['filename']
+        filepath = file_info['filepath']
+        content = file_info['content']
+        
+        # ディレクトリ作成
+        dir_path = str(Path(filepath).parent)
+        if dir_path and dir_path != '.':
+            commands.append(f"# {filename} 用ディレクトリ作成")
+            commands.append(f"mkdir -p '{dir_path}'")
             commands.append("")
         
-        return "\n".join(commands)
+        # ファイル作成
+        commands.append(f"# {filename} を作成")
+        commands.append(f"cat > '{filepath}' << 'EOF'")
+        commands.append(content)
+        commands.append("EOF")
+        commands.append("")
+        commands.append(f"# 確認")
+        commands.append(f"head -n 10 '{filepath}'")
+        commands.append("")
+        commands.append("# " + "-" * 50)
+        commands.append("")
+        return commands
     
     @staticmethod
-    def generate_cmd_commands(work_dir: str, files: List[Dict]) -> str:
-        """CMD (Windows) コマンドを生成"""
+    def _cmd_file_lines(file_info: Dict) -> List[str]:
+        """1ファイル分の CMD コマンド行（CMD には差分適用の手段がないため常に全文）"""
         commands = []
+        filename = file_info['filename']
+        filepath = file_info['filepath'].replace('/', '\\')
+        content = file_info['content']
         
-        # 作業ディレクトリへ移動
-        commands.append(f"REM 作業ディレクトリへ移動")
-        commands.append(f"cd /d \"{work_dir}\"")
-        commands.append("")
+        # ディレクトリ作成
+        dir_path = str(Path(filepath).parent)
+        if dir_path and dir_path != '.':
+            commands.append(f"REM {filename} 用ディレクトリ作成")
+            commands.append(f"if not exist \"{dir_path}\" mkdir \"{dir_path}\"")
+            commands.append("")
         
+        # ファイル作成（echoコマンドで行ごとに書き込み）
+        commands.append(f"REM {filename} を作成")
+        lines = content.split('\n')
+        commands.append(f"echo {lines[0]}> \"{filepath}\"")
+        commands.extend(f"echo {line}>> \"{filepath}\"" for line in lines[1:])
+        commands.append("")
+        commands.append(f"REM 確認")
+        commands.append(f"type \"{filepath}\"")
+        commands.append("")
+        commands.append("REM " + "-" * 50)
+        commands.append("")
+        return commands
+    
+    @staticmethod
+    def iter_powershell_lines(work_dir: str, files: Iterable[Dict]) -> Iterator[str]:
+        """PowerShellコマンドを1行ずつ生成"""
+        # 作業ディレクトリへ移動
+        yield f"# 作業ディレクトリへ移動"
+        yield f"cd '{work_dir}'"
+        yield ""
         for file_info in files:
-            filename = file_info['filename']
-            filepath = file_info['filepath'].replace('/', '\\')
-            content = file_info['content']
-            
-            # ディレクトリ作成
-            dir_path = str(Path(filepath).parent)
-            if dir_path and dir_path != '.':
-                commands.append(f"REM {filename} 用ディレクトリ作成")
-                commands.append(f"if not exist \"{dir_path}\" mkdir \"{dir_path}\"")
-                commands.append("")
-            
-            # ファイル作成（echoコマンドで行ごとに書き込み）
-            commands.append(f"REM {filename} を作成")
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if i == 0:
-                    commands.append(f"echo {line}> \"{filepath}\"")
-                else:
-                    commands.append(f"echo {line}>> \"{filepath}\"")
-            commands.append("")
-            commands.append(f"REM 確認")
-            commands.append(f"type \"{filepath}\"")
-            commands.append("")
-            commands.append("REM " + "-" * 50)
-            commands.append("")
+            yield from CodeGenerator._powershell_file_lines(file_info)
+    
+    @staticmethod
+    def iter_terminal_lines(work_dir: str, files: Iterable[Dict]) -> Iterator[str]:
+        """Terminal (Mac/Linux) コマンドを1行ずつ生成"""
+        # 作業ディレクトリへ移動
+        yield f"# 作業ディレクトリへ移動"
+        yield f"cd '{work_dir}'"
+        yield ""
+        for file_info in files:
+            yield from CodeGenerator._terminal_file_lines(file_info)
+    
+    @staticmethod
+    def iter_cmd_lines(work_dir: str, files: Iterable[Dict]) -> Iterator[str]:
+        """CMD (Windows) コマンドを1行ずつ生成"""
+        # 作業ディレクトリへ移動
+        yield f"REM 作業ディレクトリへ移動"
+        yield f"cd /d \"{work_dir}\""
+        yield ""
+        for file_info in files:
+            yield from CodeGenerator._cmd_file_lines(file_info)
+    
+    @staticmethod
+    def _archive_name(filepath: str) -> str:
+        """アーカイブ内のパス（作業ディレクトリの外を指すパスは拒否）"""
+        name = normalize_deploy_path(filepath)
+        if not name or PurePosixPath(name).is_absolute() or '..' in PurePosixPath(name).parts or ':' in name:
+            raise ValueError(f"アーカイブに含められないパスです: {filepath}")
+        return name
+    
+    @staticmethod
+    @timed('code_generator.build_archive')
+    def build_archive(files: Iterable[Dict], archive_format: str = 'zip') -> bytes:
+        """全ファイルを zip または tar.gz にまとめたバイト列を返す"""
+        buffer = io.BytesIO()
+        now = time.time()
         
-        return "\n".join(commands)
+        if archive_format == 'zip':
+            date_time = time.localtime(now)[:6]
+            with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for file_info in files:
+                    info = zipfile.ZipInfo(CodeGenerator._archive_name(file_info['filepath']), date_time)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    archive.writestr(info, file_info['content'].encode('utf-8'))
+        elif archive_format == 'tar.gz':
+            with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+                for file_info in files:
+                    data = file_info['content'].encode('utf-8')
+                    info = tarfile.TarInfo(CodeGenerator._archive_name(file_info['filepath']))
+                    info.size = len(data)
+                    info.mtime = int(now)
+                    info.mode = 0o644
+                    archive.addfile(info, io.BytesIO(data))
+        else:
+            raise ValueError(f"未対応のアーカイブ形式です: {archive_format}")
+        
+        return buffer.getvalue()
+    
+    @staticmethod
+    def write_archive(files: Iterable[Dict], output_path: str) -> int:
+        """アーカイブをファイルに保存（拡張子 .tar.gz / .tgz なら tar.gz、それ以外は zip）し、サイズを返す"""
+        name = output_path.lower()
+        archive_format = 'tar.gz' if name.endswith(('.tar.gz', '.tgz')) else 'zip'
+        data = CodeGenerator.build_archive(files, archive_format)
+        Path(output_path).write_bytes(data)
+        return len(data)
+    
+    @staticmethod
+    def _base64_lines(data: bytes, width: int) -> Iterator[str]:
+        encoded = base64.b64encode(data).decode('ascii')
+        for i in range(0, len(encoded), width):
+            yield encoded[i:i + width]
+    
+    @staticmethod
+    def iter_archive_lines(shell_type: str, work_dir: str, files: Iterable[Dict]) -> Iterator[str]:
+        """全ファイルを1つのアーカイブにまとめ、base64 から展開するコマンドを1行ずつ生成
+        
+        差分パッチ（file_info['patch']）は使わず、常にファイル全体を展開する。
+        """
+        if shell_type not in ARCHIVE_FORMATS:
+            raise ValueError(f"未対応のシェルタイプです: {shell_type}")
+        files = list(files)
+        archive_format = ARCHIVE_FORMATS[shell_type]
+        data = CodeGenerator.build_archive(files, archive_format)
+        width = CMD_ARCHIVE_LINE_WIDTH if shell_type == 'cmd' else ARCHIVE_LINE_WIDTH
+        temp_file = f"{ARCHIVE_TEMP_NAME}.{archive_format}"
+        
+        if shell_type == 'powershell':
+            yield f"# 作業ディレクトリへ移動"
+            yield f"cd '{work_dir}'"
+            yield ""
+            yield f"# {len(files)} ファイルをまとめたアーカイブ（{len(data):,} バイト）を展開"
+            yield "$bundle = @'"
+            yield from CodeGenerator._base64_lines(data, width)
+            yield "'@"
+            yield f"$bundlePath = Join-Path $env:TEMP '{temp_file}'"
+            yield "[IO.File]::WriteAllBytes($bundlePath, [Convert]::FromBase64String(($bundle -replace '\\s', '')))"
+            yield "Expand-Archive -Path $bundlePath -DestinationPath . -Force"
+            yield "Remove-Item $bundlePath"
+            yield ""
+            yield f"# 確認"
+            yield "Get-ChildItem -Recurse -File | Select-Object -First 20 FullName"
+        elif shell_type == 'terminal':
+            yield f"# 作業ディレクトリへ移動"
+            yield f"cd '{work_dir}'"
+            yield ""
+            yield f"# {len(files)} ファイルをまとめたアーカイブ（{len(data):,} バイト）を展開"
+            yield "base64 --decode << 'EOF' | tar -xzf -"
+            yield from CodeGenerator._base64_lines(data, width)
+            yield "EOF"
+            yield ""
+            yield f"# 確認"
+            yield "find . -type f | head -n 20"
+        else:
+            temp_path = f"%TEMP%\\{temp_file}"
+            yield f"REM 作業ディレクトリへ移動"
+            yield f"cd /d \"{work_dir}\""
+            yield ""
+            yield f"REM {len(files)} ファイルをまとめたアーカイブ（{len(data):,} バイト）を展開"
+            yield f"if exist \"{temp_path}.b64\" del \"{temp_path}.b64\""
+            # 行末の数字がハンドル番号と解釈されないよう、リダイレクトを先頭に置く
+            for line in CodeGenerator._base64_lines(data, width):
+                yield f">> \"{temp_path}.b64\" echo {line}"
+            yield f"certutil -f -decode \"{temp_path}.b64\" \"{temp_path}\" >nul"
+            yield f"tar -xf \"{temp_path}\""
+            yield f"del \"{temp_path}.b64\" \"{temp_path}\""
+            yield ""
+            yield f"REM 確認"
+            yield "dir /s /b"
+    
+    @staticmethod
+    def iter_lines(shell_type: str, work_dir: str, files: Iterable[Dict],
+                   archive: bool = False) -> Iterator[str]:
+        """シェルタイプに応じたコマンドを1行ずつ生成（archive=True ならアーカイブ展開形式）"""
+        if archive:
+            return CodeGenerator.iter_archive_lines(shell_type, work_dir, files)
+        emitters = {
+            'powershell': CodeGenerator.iter_powershell_lines,
+            'terminal': CodeGenerator.iter_terminal_lines,
+            'cmd': CodeGenerator.iter_cmd_lines
+        }
+        if shell_type not in emitters:
+            raise ValueError(f"未対応のシェルタイプです: {shell_type}")
+        return emitters[shell_type](work_dir, files)
+    
+    @staticmethod
+    def iter_commands(shell_type: str, work_dir: str, files: Iterable[Dict],
+                      batch_lines: int = STREAM_BATCH_LINES, archive: bool = False) -> Iterator[str]:
+        """コマンドを batch_lines 行ずつの文字列片で生成（連結すると generate_* と同じ）"""
+        batch = []
+        separator = ""
+        for line in CodeGenerator.iter_lines(shell_type, work_dir, files, archive):
+            batch.append(line)
+            if len(batch) >= batch_lines:
+                yield separator
+                yield "\n".join(batch)
+                separator = "\n"
+                batch = []
+        if batch:
+            yield separator
+            yield "\n".join(batch)
+    
+    @staticmethod
+    @timed('code_generator.write_commands')
+    def write_commands(shell_type: str, work_dir: str, files: Iterable[Dict], output: TextIO,
+                       archive: bool = False) -> int:
+        """コマンドをファイルやバッファに逐次書き込み、書き込んだ文字数を返す"""
+        written = 0
+        for chunk in CodeGenerator.iter_commands(shell_type, work_dir, files, archive=archive):
+            written += output.write(chunk)
+        return written
+    
+    @staticmethod
+    @timed('code_generator.powershell')
+    def generate_powershell_commands(work_dir: str, files: List[Dict]) -> str:
+        """PowerShellコマンドを生成"""
+        return "\n".join(CodeGenerator.iter_powershell_lines(work_dir, files))
+    
+    @staticmethod
+    @timed('code_generator.terminal')
+    def generate_terminal_commands(work_dir: str, files: List[Dict]) -> str:
+        """Terminal (Mac/Linux) コマンドを生成"""
+        return "\n".join(CodeGenerator.iter_terminal_lines(work_dir, files))
+    
+    @staticmethod
+    @timed('code_generator.cmd')
+    def generate_cmd_commands(work_dir: str, files: List[Dict]) -> str:
+        """CMD (Windows) コマンドを生成"""
+        return "\n".join(CodeGenerator.iter_cmd_lines(work_dir, files))
\ No newline at end of file
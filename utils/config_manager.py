@@ -34,7 +34,10 @@ class ConfigManager:
             'shell_type': 'powershell',  # powershell, terminal, cmd
             'last_project_id': '',
             'window_geometry': {},
-            'recent_projects': []
+            'recent_projects': [],
+            'perf_instrumentation': False,
+            'prompt_token_budget': 0,  # 0 = 無制限
+            'export_format': 'pretty'  # pretty, compact, gzip, xz, zstd
         }
     
     def get_work_directory(self) -> str:
@@ -65,6 +68,36 @@ class ConfigManager:
         self.config['last_project_id'] = project_id
         self.save_config()
     
+    def get_perf_instrumentation(self) -> bool:
+        """処理時間計測の有効・無効を取得"""
+        return bool(self.config.get('perf_instrumentation', False))
+    
+    def set_perf_instrumentation(self, enabled: bool):
+        """処理時間計測の有効・無効を設定"""
+        self.config['perf_instrumentation'] = enabled
+        self.save_config()
+    
+    def get_prompt_token_budget(self) -> int:
+        """プロンプトのトークン予算を取得（0 は無制限）"""
+        return int(self.config.get('prompt_token_budget', 0) or 0)
+    
+    def set_prompt_token_budget(self, budget: int):
+        """プロンプトのトークン予算を設定（0 は無制限）"""
+        self.config['prompt_token_budget'] = max(0, int(budget))
+        self.save_config()
+    
+    def get_export_format(self) -> str:
+        """Phase 4エクスポートの出力形式を取得"""
+        return self.config.get('export_format', 'pretty')
+    
+    def set_export_format(self, export_format: str):
+        """Phase 4エクスポートの出力形式を設定"""
+        # エクスポーターは起動時に読み込まないため、ここで形式の一覧だけ参照する
+        from utils.exporter import EXPORT_FORMATS
+        if export_format in EXPORT_FORMATS:
+            self.config['export_format'] = export_format
+            self.save_config()
+    
     def get_config(self) -> Dict:
         """現在の設定を取得"""
         return self.config
@@ -0,0 +1,122 @@
+"""
+配置済みファイルとの差分判定ユーティリティ（内容ハッシュで未変更ファイルを除外）
+"""
+import difflib
+from typing import Dict, List, Optional
+from models.implementation_project import normalize_deploy_path
+from utils.file_materializer import FileMaterializer, content_hash
+from utils.perf import timed
+
+# 差分判定の結果
+CHANGE_NEW = 'new'
+CHANGE_MODIFIED = 'modified'
+CHANGE_UNCHANGED = 'unchanged'
+
+CHANGE_LABELS = {
+    CHANGE_NEW: '新規',
+    CHANGE_MODIFIED: '変更',
+    CHANGE_UNCHANGED: '変更なし'
+}
+
+# パッチが全文の何割以下ならパッチを使うか
+PATCH_MAX_RATIO = 0.5
+
+
+def _normalize_text(text: str) -> str:
+    """シェル経由の配置で付く BOM・CRLF・末尾改行の差を無視するための正規化"""
+    return text.lstrip('\ufeff').replace('\r\n', '\n').rstrip('\n')
+
+
+class DeploymentDiff:
+    """生成ファイルを配置済みの内容と比べ、新規・変更・変更なしに分類するクラス
+
+    比較の基準はプロジェクトの配置記録に残した内容ハッシュ（マニフェスト）。
+    作業ディレクトリが分かる場合は実ファイルも確認し、配置後に削除・手で編集された
+    ファイルは記録のハッシュと一致していても配置し直す。作業ディレクトリが
+    分からない場合はマニフェストのハッシュだけで判定する。
+    """
+
+    @staticmethod
+    def _read_deployed(work_dir: Optional[str], filepath: str) -> Optional[str]:
+        """作業ディレクトリ上の配置済みファイルを読む（読めなければ None）"""
+        if not work_dir:
+            return None
+        try:
+            path = FileMaterializer.resolve_path(work_dir, filepath)
+            if not path.is_file():
+                return None
+            return path.read_bytes().decode('utf-8')
+        except (OSError, ValueError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def make_patch(filepath: str, old_text: str, new_text: str) -> str:
+        """git apply で適用できる unified diff（作れない・大きすぎる場合は空文字）"""
+        path = normalize_deploy_path(filepath)
+        # 改行コードや末尾改行の扱いが異なるとパッチが当たらないため全文置き換えにする
+        if (' ' in path or '\r' in old_text or old_text.startswith('\ufeff')
+                or not old_text.endswith('\n') or not new_text.endswith('\n')):
+            return ''
+        diff = difflib.unified_diff(
+            old_text.splitlines(keepends=True),
+            new_text.splitlines(keepends=True),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}"
+        )
+        patch = ''.join(diff)
+        if not patch or len(patch) > len(new_text) * PATCH_MAX_RATIO:
+            return ''
+        return patch
+
+    @staticmethod
+    @timed('deployment_diff.classify')
+    def classify(files: List[Dict], manifest: Dict[str, str], work_dir: Optional[str] = None,
+                 with_patches: bool = False) -> List[Dict]:
+        """各ファイルの変更種別を判定し、file_info に change（とパッチ）を付けた複製を返す
+
+        with_patches が True の場合、変更ファイルの旧内容が作業ディレクトリから読めれば
+        file_info['patch'] に差分を入れる（CodeGenerator はパッチ適用コマンドを出力する）。
+        """
+        classified = []
+        for file_info in files:
+            content = file_info['content']
+            new_hash = content_hash(content.encode('utf-8'))
+            known_hash = manifest.get(normalize_deploy_path(file_info['filepath']))
+            entry = dict(file_info, content_hash=new_hash)
+
+            if known_hash == new_hash and not work_dir:
+                entry['change'] = CHANGE_UNCHANGED
+                classified.append(entry)
+                continue
+
+            # 記録と異なる場合も、シェル経由で配置済みなら実ファイルは新しい内容になっている
+            deployed = DeploymentDiff._read_deployed(work_dir, file_info['filepath'])
+            if deployed is not None and _normalize_text(deployed) == _normalize_text(content):
+                entry['change'] = CHANGE_UNCHANGED
+            elif deployed is None and (known_hash is None or work_dir):
+                # 未配置、または配置後に削除されたファイル
+                entry['change'] = CHANGE_NEW
+            else:
+                entry['change'] = CHANGE_MODIFIED
+                # 配置記録と実ファイルが食い違う場合（手で編集された等）はパッチを作らない
+                if with_patches and deployed is not None and (
+                        known_hash is None or content_hash(deployed.encode('utf-8')) == known_hash):
+                    patch = DeploymentDiff.make_patch(file_info['filepath'], deployed, content)
+                    if patch:
+                        entry['patch'] = patch
+            classified.append(entry)
+        return classified
+
+    @staticmethod
+    def changed_files(classified: List[Dict]) -> List[Dict]:
+        """新規・変更ファイルだけを取り出す"""
+        return [f for f in classified if f['change'] != CHANGE_UNCHANGED]
+
+    @staticmethod
+    def summarize(classified: List[Dict]) -> Dict[str, int]:
+        """変更種別ごとの件数"""
+        counts = {change: 0 for change in CHANGE_LABELS}
+        for file_info in classified:
+            counts[file_info['change']] += 1
+        counts['patched'] = sum(1 for f in classified if f.get('patch'))
+        return counts
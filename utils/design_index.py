@@ -0,0 +1,138 @@
+"""
+Phase 2 設計情報の関連度検索インデックス（BM25）
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+from utils.text_tokenizer import tokenize
+
+
+def _flatten_text(value) -> str:
+    """dict / list を含む値から文字列だけを連結"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(_flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_flatten_text(v) for v in value)
+    return ''
+
+
+class DesignIndex:
+    """設計要素（データモデル・画面・機能・制約）の BM25 インデックス
+
+    インポートごとに1回構築し、依頼の機能名・詳細から関連する要素を上位 k 件取り出す。
+    転置インデックスを使うため、検索コストはクエリ語を含む要素数に比例する。
+    """
+
+    def __init__(self, entries: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.entries = entries
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+
+        for doc_id, entry in enumerate(entries):
+            tokens = tokenize(entry['text'])
+            self.doc_lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                self.postings.setdefault(token, []).append((doc_id, count))
+
+        total = len(entries)
+        self.avg_length = (sum(self.doc_lengths) / total) if total else 0.0
+        self.idf = {
+            token: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+        # 文書長による正規化項 k1 * (1 - b + b * dl / avgdl) は構築時に計算しておく
+        self.length_norms = [
+            k1 * (1 - b + b * length / (self.avg_length or 1)) for length in self.doc_lengths
+        ]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_phase2(cls, phase2_data: Optional[Dict]) -> 'DesignIndex':
+        """Phase 2データ（phase1_data / design_data）から構築"""
+        phase2_data = phase2_data or {}
+        phase1_data = phase2_data.get('phase1_data', {})
+        design_data = phase2_data.get('design_data', {})
+        entries = []
+
+        for model in design_data.get('data_models', []):
+            name = model.get('model_name', '')
+            entries.append({
+                'kind': 'model',
+                'name': name,
+                'description': model.get('description', ''),
+                'text': ' '.join([name, model.get('description', ''), _flatten_text(model.get('fields', []))])
+            })
+
+        for screen in design_data.get('screens', []):
+            name = screen.get('screen_name', '')
+            entries.append({
+                'kind': 'screen',
+                'name': name,
+                'description': screen.get('description', ''),
+                'text': ' '.join([name, screen.get('description', ''), _flatten_text(screen.get('ui_elements', []))])
+            })
+
+        detailed = set()
+        for function in design_data.get('function_details', []):
+            name = function.get('function_name', '')
+            detailed.add(name)
+            entries.append({
+                'kind': 'feature',
+                'name': name,
+                'description': function.get('description', ''),
+                'text': ' '.join([name, function.get('description', ''), _flatten_text(function.get('process_flow', []))])
+            })
+        for feature in phase1_data.get('main_features', []):
+            if feature not in detailed:
+                entries.append({'kind': 'feature', 'name': feature, 'description': '', 'text': feature})
+
+        for constraint in phase1_data.get('constraints', []):
+            entries.append({'kind': 'constraint', 'name': constraint, 'description': '', 'text': constraint})
+
+        return cls(entries)
+
+    def _score(self, query: str) -> Dict[int, float]:
+        """クエリ語を含む要素ごとの BM25 スコアを計算"""
+        scores: Dict[int, float] = {}
+        weight = self.k1 + 1
+        norms = self.length_norms
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[token]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * weight / (tf + norms[doc_id])
+        return scores
+
+    def _top(self, scores: Dict[int, float], k: int) -> List[Tuple[float, Dict]]:
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, self.entries[doc_id]) for doc_id, score in top]
+
+    def search(self, query: str, k: int = 3, kind: Optional[str] = None) -> List[Tuple[float, Dict]]:
+        """クエリとの関連度が高い順に最大 k 件を (スコア, 要素) で返す（スコア0は除外）"""
+        scores = self._score(query)
+        if kind:
+            scores = {doc_id: score for doc_id, score in scores.items() if self.entries[doc_id]['kind'] == kind}
+        return self._top(scores, k)
+
+    def search_by_kind(self, query: str, limits: Dict[str, int]) -> Dict[str, List[Tuple[float, Dict]]]:
+        """スコア計算を1回で済ませ、種別ごとに上位 limits[種別] 件を返す"""
+        grouped: Dict[str, Dict[int, float]] = {kind: {} for kind in limits}
+        for doc_id, score in self._score(query).items():
+            bucket = grouped.get(self.entries[doc_id]['kind'])
+            if bucket is not None:
+                bucket[doc_id] = score
+        return {kind: self._top(grouped[kind], limit) for kind, limit in limits.items()}
+
+    def first(self, kind: str, k: int = 3) -> List[Dict]:
+        """指定種別の要素を先頭から k 件返す（関連する要素がない場合の既定値）"""
+        return [entry for entry in self.entries if entry['kind'] == kind][:k]
@@ -0,0 +1,278 @@
+"""
+問題・バグの重複検出（MinHash シグネチャと LSH による類似文書の検索）
+"""
+import operator
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.perf import timed
+from utils.text_tokenizer import normalize
+
+# 文書の種別
+DUP_ISSUE = 'issue'
+DUP_BUG = 'bug'
+
+# 文字 n-gram シングルの長さ
+SHINGLE_SIZE = 3
+
+# LSH のバンド数 × 1バンドの行数 = シグネチャ長。類似度 s の組が候補になる確率は
+# 1 - (1 - s ** 行数) ** バンド数（s = 0.6 で約 0.8、0.7 で約 0.97、0.3 で約 0.05）
+LSH_BANDS = 20
+LSH_ROWS = 5
+SIGNATURE_SIZE = LSH_BANDS * LSH_ROWS
+
+# この推定類似度（Jaccard 係数）以上を重複の候補とする
+DUPLICATE_THRESHOLD = 0.6
+
+_HASH_MASK = (1 << 64) - 1
+# 空のビンを埋めるときに、借りたビンからの距離ごとに足す値
+_ROTATION_OFFSET = (1 << 64) // SIGNATURE_SIZE + 1
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """空白を除いて正規化したテキストの文字 n-gram の集合"""
+    compact = ''.join(normalize(text).split())
+    if len(compact) <= size:
+        return {compact} if compact else set()
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+
+def minhash_signature(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash シグネチャ（シングルがなければ None）
+
+    シングルを1回だけハッシュし、ハッシュ値の上位ビットで SIGNATURE_SIZE 個のビンに
+    振り分けて各ビンの最小値を取る（one permutation hashing）。k 個のハッシュ関数を
+    使う通常の MinHash と同じ性質のシグネチャを、シングル数に比例するコストで作れる。
+    空のビンは右隣の空でないビンの値を距離に応じてずらして埋める（rotation densification）。
+    ハッシュには組み込みの hash() を使うため、シグネチャはプロセス内でのみ比較できる。
+    """
+    values = shingles(text)
+    if not values:
+        return None
+
+    bins: List[Optional[int]] = [None] * SIGNATURE_SIZE
+    for shingle in values:
+        h = hash(shingle) & _HASH_MASK
+        index = (h * SIGNATURE_SIZE) >> 64
+        current = bins[index]
+        if current is None or h < current:
+            bins[index] = h
+
+    if None in bins:
+        filled = list(bins)
+        for index in range(SIGNATURE_SIZE):
+            if bins[index] is None:
+                distance = 1
+                while bins[(index + distance) % SIGNATURE_SIZE] is None:
+                    distance += 1
+                filled[index] = (bins[(index + distance) % SIGNATURE_SIZE] + distance * _ROTATION_OFFSET) & _HASH_MASK
+        bins = filled
+    return tuple(bins)
+
+
+def estimate_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """2つのシグネチャから Jaccard 係数を推定"""
+    return sum(map(operator.eq, a, b)) / SIGNATURE_SIZE
+
+
+class DuplicateDetector:
+    """全プロジェクトの問題・バグの MinHash シグネチャを LSH で索引するクラス
+
+    シグネチャを LSH_BANDS 個のバンドに分け、いずれかのバンドが一致する文書だけを
+    候補として類似度を推定するため、検索コストは文書の総数ではなく候補数に比例する。
+    update_project / sync はタイトル・説明が変わった文書だけシグネチャを作り直す。
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        # 文書キー (プロジェクトID, 種別, ID) -> 文書
+        self.docs: Dict[Tuple, Dict] = {}
+        # (バンド番号, バンドの値) -> 文書キーの集合
+        self.buckets: Dict[Tuple, set] = {}
+        # プロジェクトID -> 文書キーの集合
+        self.project_keys: Dict[str, set] = {}
+        # プロジェクトID -> (プロジェクトへの弱参照, 索引済みのリビジョン)
+        self.revisions: Dict[str, Tuple[weakref.ref, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+
+    @staticmethod
+    def issue_text(title: str, description: str) -> str:
+        return f"{title}\n{description}"
+
+    @staticmethod
+    def issue_document(project_id: str, issue) -> Tuple[Tuple, Dict]:
+        """問題の (キー, 文書)"""
+        return (project_id, DUP_ISSUE, issue.issue_id), {
+            'project_id': project_id,
+            'kind': DUP_ISSUE,
+            'ref': issue.issue_id,
+            'title': issue.title,
+            'status': issue.current_status,
+            'text': DuplicateDetector.issue_text(issue.title, issue.description)
+        }
+
+    @staticmethod
+    def bug_document(project_id: str, bug: Dict) -> Tuple[Tuple, Dict]:
+        """バグの (キー, 文書)"""
+        return (project_id, DUP_BUG, bug.get('id')), {
+            'project_id': project_id,
+            'kind': DUP_BUG,
+            'ref': bug.get('id'),
+            'title': bug.get('title', ''),
+            'status': bug.get('status', ''),
+            'text': DuplicateDetector.issue_text(bug.get('title', ''), bug.get('description', ''))
+        }
+
+    @staticmethod
+    def project_documents(project) -> Dict[Tuple, Dict]:
+        """プロジェクトの問題・バグ（キー -> 文書）"""
+        pid = project.project_id
+        documents = dict(DuplicateDetector.issue_document(pid, issue) for issue in project.issues)
+        documents.update(DuplicateDetector.bug_document(pid, bug) for bug in project.bugs)
+        return documents
+
+    def add(self, key: Tuple, document: Dict):
+        """文書を追加（同じキーがあれば置き換え）"""
+        if key in self.docs:
+            self.remove(key)
+        signature = minhash_signature(document['text'])
+        self.docs[key] = dict(document, signature=signature)
+        self.project_keys.setdefault(key[0], set()).add(key)
+        if signature is not None:
+            for band in self._bands(signature):
+                self.buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key: Tuple):
+        """文書を削除"""
+        document = self.docs.pop(key)
+        self.project_keys[key[0]].discard(key)
+        if document['signature'] is not None:
+            for band in self._bands(document['signature']):
+                bucket = self.buckets[band]
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band]
+
+    @timed('duplicate_detector.update_project')
+    def update_project(self, project) -> int:
+        """プロジェクトの文書を差分更新し、シグネチャを作り直した文書数を返す"""
+        documents = self.project_documents(project)
+        stale = self.project_keys.get(project.project_id, set()) - documents.keys()
+        for key in stale:
+            self.remove(key)
+
+        rebuilt = 0
+        for key, document in documents.items():
+            existing = self.docs.get(key)
+            if existing is not None and existing['text'] == document['text']:
+                existing['title'] = document['title']
+                existing['status'] = document['status']
+            else:
+                self.add(key, document)
+                rebuilt += 1
+        self.revisions[project.project_id] = (weakref.ref(project), project.revision)
+        return rebuilt
+
+    def ensure_project(self, project) -> bool:
+        """前回から変更された（リビジョンが進んだ・差し替えられた）プロジェクトなら更新"""
+        indexed = self.revisions.get(project.project_id)
+        if indexed is None or indexed[0]() is not project or indexed[1] != project.revision:
+            self.update_project(project)
+            return True
+        return False
+
+    @timed('duplicate_detector.sync')
+    def sync(self, projects: Iterable) -> int:
+        """変更されたプロジェクトだけを更新し、なくなったプロジェクトの文書を削除"""
+        projects = list(projects)
+        updated = sum(1 for project in projects if self.ensure_project(project))
+        current = {p.project_id for p in projects}
+        for project_id in [pid for pid in self.revisions if pid not in current]:
+            for key in list(self.project_keys.get(project_id, ())):
+                self.remove(key)
+            self.project_keys.pop(project_id, None)
+            del self.revisions[project_id]
+        return updated
+
+    def _candidates(self, signature: Tuple[int, ...]) -> set:
+        candidates = set()
+        for band in self._bands(signature):
+            bucket = self.buckets.get(band)
+            if bucket:
+                candidates |= bucket
+        return candidates
+
+    def find_similar(self, title: str, description: str = '', kinds: Optional[Iterable[str]] = None,
+                     project_id: Optional[str] = None, exclude: Iterable[Tuple] = (),
+                     threshold: Optional[float] = None, limit: int = 5) -> List[Dict]:
+        """タイトル・説明が似ている既存の問題・バグを類似度の高い順に返す"""
+        return self.find_similar_text(self.issue_text(title, description), kinds, project_id,
+                                      exclude, threshold, limit)
+
+    @timed('duplicate_detector.find_similar')
+    def find_similar_text(self, text: str, kinds: Optional[Iterable[str]] = None,
+                          project_id: Optional[str] = None, exclude: Iterable[Tuple] = (),
+                          threshold: Optional[float] = None, limit: int = 5) -> List[Dict]:
+        """issue_text で組み立て済みの文書テキストに似ている既存の問題・バグを返す"""
+        signature = minhash_signature(text)
+        if signature is None:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        kinds = set(kinds) if kinds is not None else None
+        excluded = set(exclude)
+
+        matches = []
+        for key in self._candidates(signature) - excluded:
+            document = self.docs[key]
+            if kinds is not None and document['kind'] not in kinds:
+                continue
+            if project_id is not None and document['project_id'] != project_id:
+                continue
+            similarity = estimate_similarity(signature, document['signature'])
+            if similarity >= threshold:
+                matches.append(self._result(document, similarity))
+        matches.sort(key=lambda m: (-m['similarity'], str(m['ref'])))
+        return matches[:limit]
+
+    @timed('duplicate_detector.find_duplicate_pairs')
+    def find_duplicate_pairs(self, threshold: Optional[float] = None,
+                             project_id: Optional[str] = None) -> List[Dict]:
+        """索引内の類似した文書の組をすべて返す（同じバケットに入った組だけを比べる）"""
+        threshold = self.threshold if threshold is None else threshold
+        keys = self.project_keys.get(project_id, set()) if project_id is not None else self.docs.keys()
+        pairs = []
+        done = set()
+        for left in list(keys):
+            done.add(left)
+            a = self.docs[left]
+            if a['signature'] is None:
+                continue
+            # 組は1回だけ比べる（プロジェクト指定時は相手が他のプロジェクトの文書でも比べる）
+            for right in self._candidates(a['signature']) - done:
+                b = self.docs[right]
+                similarity = estimate_similarity(a['signature'], b['signature'])
+                if similarity >= threshold:
+                    pairs.append({
+                        'similarity': round(similarity, 3),
+                        'left': self._result(a, similarity),
+                        'right': self._result(b, similarity)
+                    })
+        pairs.sort(key=lambda p: -p['similarity'])
+        return pairs
+
+    @staticmethod
+    def _result(document: Dict, similarity: float) -> Dict:
+        return {
+            'project_id': document['project_id'],
+            'kind': document['kind'],
+            'ref': document['ref'],
+            'title': document['title'],
+            'status': document['status'],
+            'similarity': round(similarity, 3)
+        }
@@ -1,21 +1,73 @@
 """
 Phase 4へのエクスポート処理（修正版）
 """
-import json
+import hashlib
+import os
+import threading
+import weakref
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, List, Tuple
 from models.implementation_project import ImplementationProject
 from utils.validators import Validators
-from utils.file_handler import FileHandler
+from utils.file_handler import FileHandler, COMPRESSION_EXTENSIONS
+from utils.merkle import ExportMerkle, HEADER_SECTION
+from utils.perf import timed
+
+# Merkle ツリーで要素ごとにハッシュするエクスポートデータの項目
+EXPORT_SECTIONS = (
+    'code_requests',
+    'deployed_files',
+    'test_results',
+    'bugs',
+    'ui_ux_notes',
+    'issues',
+    'import_info'
+)
+
+# Merkle ツリーの header に含めない項目（チェックサム自身）
+MERKLE_EXCLUDE = ('checksum', 'merkle')
+
+# 出力形式（pretty: 従来どおり indent=2 / compact: 1行の正規化 JSON / gzip・xz・zstd: compact を圧縮）
+EXPORT_FORMATS = ('pretty', 'compact', 'gzip', 'xz', 'zstd')
+
+EXPORT_FORMAT_LABELS = {
+    'pretty': '整形 JSON（従来どおり）',
+    'compact': '1行 JSON',
+    'gzip': 'gzip 圧縮',
+    'xz': 'xz 圧縮',
+    'zstd': 'zstd 圧縮（zstandard が必要）'
+}
+
+# import_info のうち、エクスポートに埋め込まず別ファイルとして参照する大きな項目
+BLOB_FIELDS = ('original_data',)
+BLOB_DIR_NAME = 'blobs'
+BLOB_REF_KEY = '$ref'
 
 class Exporter:
-    """Phase 4へのデータエクスポートを管理するクラス"""
+    """Phase 4へのデータエクスポートを管理するクラス
+    
+    前回のエクスポートで作ったセクションごとの正規化 JSON と葉ハッシュをプロジェクトごとに
+    保持し、内容が同じセクションは要素ごとのハッシュ計算を省略する。Phase 2 の元データのような
+    大きな項目は内容ハッシュ名の別ファイルに1回だけ書き出し、エクスポートからは参照だけを持つ。
+    """
     
-    def __init__(self):
+    # プロジェクト -> {'revision', 'reference_blobs', 'sections': {セクション: (正規化 JSON, 葉ハッシュ)}}
+    _section_cache = weakref.WeakKeyDictionary()
+    # プロジェクト -> ((インポート日時, 出力先), {項目: 参照})
+    _blob_cache = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+    
+    def __init__(self, output_format: str = 'pretty', reference_blobs: bool = True,
+                 export_dir: str = 'data/exports'):
         self.file_handler = FileHandler()
         self.validators = Validators()
+        self.output_format = output_format if output_format in EXPORT_FORMATS else 'pretty'
+        self.reference_blobs = reference_blobs
+        self.export_dir = Path(export_dir)
+        self.last_stats: Dict = {}
     
+    @timed('exporter.export_to_phase4')
     def export_to_phase4(self, project: ImplementationProject) -> Tuple[bool, str, str]:
         """Phase 4用にエクスポート"""
         try:
@@ -24,6 +76,9 @@ class Exporter:
             if not is_ready:
                 return False, "エクスポート準備が完了していません:\n" + "\n".join(errors), ""
             
+            export_dir = self.export_dir
+            export_dir.mkdir(parents=True, exist_ok=True)
+            
             # エクスポートデータ作成（Issueオブジェクトを辞書に変換）
             export_data = {
                 'project_id': project.project_id,
@@ -36,22 +91,22 @@ class Exporter:
                 'bugs': project.bugs,
                 'ui_ux_notes': project.ui_ux_notes,
                 'issues': [issue.to_dict() for issue in project.issues],
-                'import_info': project.import_info
+                'import_info': self.prepare_import_info(project, export_dir)
             }
             
-            # チェックサム計算
-            data_str = json.dumps(export_data, sort_keys=True, ensure_ascii=False)
-            checksum = self.validators.calculate_checksum(data_str)
+            # Merkle ツリー（要素ごとのハッシュ）を埋め込み、そのルートをチェックサムにする
+            fragments, leaves = self.get_sections(project, export_data)
+            header = ExportMerkle.header(export_data, EXPORT_SECTIONS, MERKLE_EXCLUDE)
+            merkle = ExportMerkle.build({HEADER_SECTION: ExportMerkle.section_leaves(header), **leaves})
+            checksum = merkle['root']
+            export_data['merkle'] = merkle
             export_data['checksum'] = checksum
             
             # エクスポートファイル保存
-            export_dir = Path('data/exports')
-            export_dir.mkdir(parents=True, exist_ok=True)
-            
-            filename = f"export_{project.project_id}_Phase3.json"
+            suffix = '.json' + COMPRESSION_EXTENSIONS.get(self.output_format, '')
+            filename = f"export_{project.project_id}_Phase3{suffix}"
             filepath = export_dir / filename
-            
-            self.file_handler.save_json(export_data, str(filepath))
+            self.write_export(export_data, fragments, filepath)
             
             # エクスポート履歴を記録
             project.export_history.append({
@@ -64,3 +119,129 @@ class Exporter:
             
         except Exception as e:
             return False, f"エクスポートエラー: {str(e)}", ""
+    
+    def get_sections(self, project: ImplementationProject, export_data: Dict) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        """セクションごとの正規化 JSON と葉ハッシュ（前回と同じ内容のセクションは葉ハッシュを再利用）"""
+        with self._lock:
+            cached = self._section_cache.get(project)
+        previous = cached['sections'] if cached and cached['reference_blobs'] == self.reference_blobs else {}
+        
+        if cached and previous and cached['revision'] == project.revision:
+            # 前回のエクスポートから変更のないプロジェクトはエンコードも省略する
+            sections = previous
+            rehashed = []
+        else:
+            sections = {}
+            rehashed = []
+            for name in EXPORT_SECTIONS:
+                value = export_data[name]
+                fragment = Validators.canonical_json(value)
+                if name in previous and previous[name][0] == fragment:
+                    sections[name] = previous[name]
+                else:
+                    sections[name] = (fragment, ExportMerkle.section_leaves(value))
+                    rehashed.append(name)
+            with self._lock:
+                self._section_cache[project] = {
+                    'revision': project.revision,
+                    'reference_blobs': self.reference_blobs,
+                    'sections': sections
+                }
+        
+        self.last_stats = {
+            'rehashed_sections': rehashed,
+            'reused_sections': [name for name in EXPORT_SECTIONS if name not in rehashed]
+        }
+        fragments = {name: fragment for name, (fragment, _) in sections.items()}
+        leaves = {name: section_leaves for name, (_, section_leaves) in sections.items()}
+        return fragments, leaves
+    
+    def prepare_import_info(self, project: ImplementationProject, export_dir: Path) -> Dict:
+        """import_info の大きな項目を別ファイルに書き出し、参照に置き換える"""
+        import_info = project.import_info
+        if not self.reference_blobs or not any(field in import_info for field in BLOB_FIELDS):
+            return import_info
+        
+        key = (import_info.get('import_date'), str(export_dir.resolve()))
+        with self._lock:
+            cached = self._blob_cache.get(project)
+        if cached and cached[0] == key and all(
+                (export_dir / ref[BLOB_REF_KEY]).exists() for ref in cached[1].values()):
+            refs = cached[1]
+        else:
+            refs = {}
+            for field in BLOB_FIELDS:
+                if field in import_info:
+                    refs[field] = self.write_blob(import_info[field], export_dir)
+            with self._lock:
+                self._blob_cache[project] = (key, refs)
+        
+        return {**{k: v for k, v in import_info.items() if k not in BLOB_FIELDS}, **refs}
+    
+    @staticmethod
+    def write_blob(value, export_dir: Path) -> Dict:
+        """値を内容ハッシュ名のファイルに書き出し（同じ内容のファイルがあれば書かない）、参照を返す"""
+        data = Validators.canonical_json(value).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        relative = f"{BLOB_DIR_NAME}/{digest}.json"
+        path = export_dir / relative
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return {BLOB_REF_KEY: relative, 'sha256': digest, 'size': len(data)}
+    
+    def write_export(self, export_data: Dict, fragments: Dict[str, str], filepath: Path):
+        """出力形式に応じてエクスポートファイルを書き出す"""
+        if self.output_format == 'pretty':
+            self.file_handler.save_json(export_data, str(filepath))
+            return
+        
+        # compact と圧縮形式は作成済みのセクションの正規化 JSON をつなげて文書全体を組み立てる
+        parts = []
+        for key in sorted(export_data):
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = Validators.canonical_json(export_data[key])
+            parts.append(f"{Validators.canonical_json(key)}: {fragment}")
+        data = ('{' + ', '.join(parts) + '}').encode('utf-8')
+        filepath.write_bytes(self.file_handler.compress_bytes(data, FileHandler.compression_of(str(filepath))))
+    
+    @staticmethod
+    def load_export(filepath: str) -> Dict:
+        """エクスポートファイルを読み込む（圧縮ファイルは展開して読む）"""
+        return FileHandler.load_json(filepath)
+    
+    @staticmethod
+    def verify_blobs(export_data: Dict, export_dir: Path) -> Dict[str, str]:
+        """参照している別ファイルの内容ハッシュを検証（参照 -> ok / missing / mismatch）"""
+        results = {}
+        import_info = export_data.get('import_info')
+        if not isinstance(import_info, dict):
+            return results
+        for value in import_info.values():
+            if isinstance(value, dict) and BLOB_REF_KEY in value:
+                path = export_dir / value[BLOB_REF_KEY]
+                if not path.exists():
+                    results[value[BLOB_REF_KEY]] = 'missing'
+                elif hashlib.sha256(path.read_bytes()).hexdigest() != value.get('sha256'):
+                    results[value[BLOB_REF_KEY]] = 'mismatch'
+                else:
+                    results[value[BLOB_REF_KEY]] = 'ok'
+        return results
+    
+    @staticmethod
+    @timed('exporter.verify_export')
+    def verify_export(filepath: str) -> Dict:
+        """エクスポートファイルを検証し、改ざんされた要素を特定"""
+        data = Exporter.load_export(filepath)
+        if 'merkle' not in data:
+            # Merkle 情報のない旧形式は文書全体のチェックサムだけを検証
+            valid = Validators.verify_data_checksum(data, data.get('checksum', ''))
+            return {'valid': valid, 'root_matches': valid, 'tampered': {}, 'added': {}, 'removed': {}, 'blobs': {}}
+        
+        result = ExportMerkle.verify(data, EXPORT_SECTIONS, MERKLE_EXCLUDE)
+        result['blobs'] = Exporter.verify_blobs(data, Path(filepath).parent)
+        result['valid'] = result['valid'] and all(status == 'ok' for status in result['blobs'].values())
+        return result
@@ -1,33 +1,98 @@
 """
 ファイル操作ユーティリティ
 """
+import gzip
+import io
 import json
+import lzma
 import shutil
 from pathlib import Path
-from typing import Dict, Any
+from typing import BinaryIO, Dict, Any, Optional
+from utils.perf import timed
+
+# 拡張子 -> 圧縮形式（zstd は zstandard パッケージがある場合のみ使える）
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.xz': 'xz',
+    '.zst': 'zstd'
+}
+
+# 圧縮形式 -> 拡張子
+COMPRESSION_EXTENSIONS = {compression: suffix for suffix, compression in COMPRESSION_SUFFIXES.items()}
+
+# gzip の圧縮レベル（ヘッダーの更新日時は同じ内容で同じ出力になるよう 0 に固定する）
+GZIP_COMPRESS_LEVEL = 6
+
+def _zstandard():
+    """zstandard パッケージを読み込む（未インストールならエラー）"""
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception("zstd 圧縮を扱うには zstandard パッケージが必要です")
+    return zstandard
 
 class FileHandler:
-    """ファイル操作を管理するクラス"""
+    """ファイル操作を管理するクラス
+    
+    JSON の読み書きは拡張子（.gz / .xz / .zst）に応じて透過的に圧縮・展開する。
+    """
+    
+    @staticmethod
+    def compression_of(filepath: str) -> Optional[str]:
+        """拡張子から圧縮形式を判定（非圧縮なら None）"""
+        return COMPRESSION_SUFFIXES.get(Path(filepath).suffix.lower())
+    
+    @staticmethod
+    def open_binary(filepath: str, mode: str = 'rb') -> BinaryIO:
+        """拡張子に応じて展開・圧縮しながら読み書きするバイナリストリームを開く"""
+        compression = FileHandler.compression_of(filepath)
+        if compression == 'gzip':
+            return gzip.GzipFile(filepath, mode, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+        if compression == 'xz':
+            return lzma.open(filepath, mode)
+        if compression == 'zstd':
+            zstandard = _zstandard()
+            raw = open(filepath, mode)
+            if 'r' in mode:
+                return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return open(filepath, mode)
+    
+    @staticmethod
+    def compress_bytes(data: bytes, compression: Optional[str]) -> bytes:
+        """バイト列を指定の形式で圧縮（None ならそのまま）"""
+        if compression == 'gzip':
+            return gzip.compress(data, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+        if compression == 'xz':
+            return lzma.compress(data)
+        if compression == 'zstd':
+            return _zstandard().ZstdCompressor().compress(data)
+        return data
     
     @staticmethod
+    @timed('file_handler.load_json')
     def load_json(filepath: str) -> Dict[str, Any]:
-        """JSONファイルを読み込み"""
+        """JSONファイルを読み込み（圧縮ファイルは展開しながら読む）"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with FileHandler.open_binary(filepath, 'rb') as raw:
+                with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                    return json.load(f)
         except Exception as e:
             raise Exception(f"JSONファイルの読み込みに失敗しました: {str(e)}")
     
     @staticmethod
+    @timed('file_handler.save_json')
     def save_json(data: Dict[str, Any], filepath: str):
-        """JSONファイルに保存"""
+        """JSONファイルに保存（拡張子が圧縮形式なら圧縮しながら書く）"""
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with FileHandler.open_binary(filepath, 'wb') as raw:
+                with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
         except Exception as e:
             raise Exception(f"JSONファイルの保存に失敗しました: {str(e)}")
     
     @staticmethod
+    @timed('file_handler.copy_file')
     def copy_file(src: str, dst: str):
         """ファイルをコピー"""
         try:
@@ -35,6 +100,19 @@ class FileHandler:
         except Exception as e:
             raise Exception(f"ファイルのコピーに失敗しました: {str(e)}")
     
+    @staticmethod
+    @timed('file_handler.copy_compressed')
+    def copy_compressed(src: str, dst: str):
+        """コピー先の拡張子の形式に圧縮し直してコピー（形式が同じなら通常のコピー）"""
+        if FileHandler.compression_of(src) == FileHandler.compression_of(dst):
+            FileHandler.copy_file(src, dst)
+            return
+        try:
+            with FileHandler.open_binary(src, 'rb') as source, FileHandler.open_binary(dst, 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+        except Exception as e:
+            raise Exception(f"ファイルのコピーに失敗しました: {str(e)}")
+    
     @staticmethod
     def file_exists(filepath: str) -> bool:
         """ファイルの存在確認"""
@@ -0,0 +1,152 @@
+"""
+ファイル直接書き込みユーティリティ（シェルコマンドを経由せずに作業ディレクトリへ配置）
+"""
+import hashlib
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from utils.perf import timed
+
+# 書き込み結果の状態
+STATUS_CREATED = 'created'
+STATUS_UPDATED = 'updated'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_ERROR = 'error'
+
+# 配置記録に残す状態
+RECORDED_STATUSES = (STATUS_CREATED, STATUS_UPDATED)
+
+STATUS_LABELS = {
+    STATUS_CREATED: '新規作成',
+    STATUS_UPDATED: '更新',
+    STATUS_UNCHANGED: '変更なし',
+    STATUS_ERROR: 'エラー'
+}
+
+
+def content_hash(data: bytes) -> str:
+    """ファイル内容の SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_umask() -> int:
+    # umask は設定しないと読めないため、書き込みスレッドが動く前（読み込み時）に1回だけ読む
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 新規ファイルのパーミッション（通常の open で作った場合と同じ）
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+class FileMaterializer:
+    """{"files": [...]} のファイルを作業ディレクトリへ直接書き込むクラス
+
+    書き込みはスレッドプールで並列に行い、各ファイルは同じディレクトリの一時ファイルに
+    書いてから os.replace で置き換えるため、途中で失敗しても中途半端な内容は残らない。
+    既存ファイルと内容のハッシュが同じ場合は書き込まない。
+    """
+
+    @staticmethod
+    def resolve_path(work_dir: str, filepath: str) -> Path:
+        """作業ディレクトリ基準の書き込み先（作業ディレクトリの外は拒否）"""
+        root = Path(work_dir).resolve()
+        target = (root / filepath).resolve()
+        if target != root and root not in target.parents:
+            raise ValueError(f"作業ディレクトリの外には書き込めません: {filepath}")
+        return target
+
+    @staticmethod
+    def _write_atomic(target: Path, data: bytes):
+        """一時ファイルに書いてから置き換える
+
+        mkstemp の一時ファイルは 0600 で作られるため、置き換える前に既存ファイルの
+        パーミッション（新規なら umask を適用した 0666）に合わせる。
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            mode = stat.S_IMODE(target.stat().st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _materialize_one(work_dir: str, file_info: Dict) -> Dict:
+        """1ファイル分を書き込む（スレッドプールから呼ばれる）"""
+        result = {
+            'filename': file_info.get('filename', ''),
+            'filepath': file_info.get('filepath', ''),
+            'path': '',
+            'status': STATUS_ERROR,
+            'hash': '',
+            'error': ''
+        }
+        try:
+            target = FileMaterializer.resolve_path(work_dir, file_info['filepath'])
+            data = file_info['content'].encode('utf-8')
+            result['path'] = str(target)
+            result['hash'] = content_hash(data)
+
+            if target.is_file():
+                if content_hash(target.read_bytes()) == result['hash']:
+                    result['status'] = STATUS_UNCHANGED
+                    return result
+                status = STATUS_UPDATED
+            else:
+                status = STATUS_CREATED
+
+            FileMaterializer._write_atomic(target, data)
+            result['status'] = status
+        except Exception as e:
+            result['error'] = str(e)
+        return result
+
+    @staticmethod
+    @timed('file_materializer.materialize')
+    def materialize(work_dir: str, files: Iterable[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """全ファイルを並列に書き込み、入力順の結果リストを返す"""
+        files = list(files)
+        if not files:
+            return []
+
+        workers = max_workers or min(len(files), (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda f: FileMaterializer._materialize_one(work_dir, f), files))
+
+    @staticmethod
+    def record_deployment(project, results: List[Dict], status: str = '未確認') -> List[Dict]:
+        """新規作成・更新したファイルをプロジェクトの配置記録に追加"""
+        entries = []
+        for result in results:
+            if result['status'] in RECORDED_STATUSES:
+                entries.append(project.add_deployed_file(
+                    result['filename'],
+                    result['filepath'],
+                    status,
+                    f"直接書き込み（{STATUS_LABELS[result['status']]}）",
+                    content_hash=result['hash']
+                ))
+        return entries
+
+    @staticmethod
+    def summarize(results: List[Dict]) -> Dict[str, int]:
+        """状態ごとの件数"""
+        counts = {status: 0 for status in STATUS_LABELS}
+        for result in results:
+            counts[result['status']] += 1
+        return counts
@@ -1,375 +1,205 @@
 ﻿"""
 実装用プロンプト生成ユーティリティ
 """
-from typing import Dict
+import threading
+import weakref
+from typing import Dict, Optional
+from utils.design_index import DesignIndex
+from utils.perf import timed
+from utils.template_engine import TemplateEngine
+
+SHELL_NAMES = {
+    'powershell': 'PowerShell (Windows)',
+    'terminal': 'Terminal (Mac/Linux)',
+    'cmd': 'コマンドプロンプト (Windows)'
+}
+
+# 「次の依頼」の対象外とする依頼ステータス
+COMPLETED_REQUEST_STATUSES = ('完了', '受領済み')
+
+# 実装依頼プロンプトに載せる設計要素（種別, 見出し, 最大件数）
+DESIGN_SECTIONS = [
+    ('model', 'データモデル', 3),
+    ('screen', '関連画面', 3),
+    ('feature', '関連する機能', 3),
+    ('constraint', '関連する制約', 3),
+]
 
 class ImplementationPromptGenerator:
-    """実装依頼用プロンプトを生成するクラス"""
+    """実装依頼用プロンプトを生成するクラス
+    
+    プロンプト本文は templates/implementation/ のテンプレートにあり、
+    Phase 2 設計情報から作る文脈はプロジェクトのリビジョンごとに、
+    設計要素の検索インデックスはインポートごとに1回だけ構築する。
+    """
+    
+    _context_cache = weakref.WeakKeyDictionary()  # project -> (revision, context)
+    _index_cache = weakref.WeakKeyDictionary()  # project -> (import_date, DesignIndex)
+    _queue_cache = weakref.WeakKeyDictionary()  # project -> (revision, queue)
+    _lock = threading.Lock()
     
     @staticmethod
-    def generate_mvp_prompt(project_name: str, phase2_data: Dict, work_dir: str, shell_type: str = 'powershell') -> str:
-        """最小構成（MVP）用プロンプトを生成"""
-        
-        # Phase 2の設計情報を抽出
+    def build_design_context(phase2_data: Optional[Dict]) -> Dict:
+        """Phase 2データからテンプレート用の文脈を抽出"""
+        phase2_data = phase2_data or {}
         phase1_data = phase2_data.get('phase1_data', {})
         design_data = phase2_data.get('design_data', {})
         tech_stack = design_data.get('tech_stack', {})
         
-        purpose = phase1_data.get('purpose', '')
         main_features = phase1_data.get('main_features', [])
         constraints = phase1_data.get('constraints', [])
+        data_models = design_data.get('data_models', [])
+        screens = design_data.get('screens', [])
         
-        prompt = f"""# 🎯 最小構成（MVP）実装依頼
-
-## プロジェクト概要
-**プロジェクト名:** {project_name}
-
-**目的:** {purpose}
-
-**主要機能:** {', '.join(main_features[:3]) if main_features else '未定義'}
-
----
-
-## 🚀 Phase 3 の段階的実装戦略
-
-### Phase 3 の強み
-✅ **ID順に進捗確認** - 各ステップで動作確認できる
-✅ **早期問題発見** - 小さく作って確実に動かす
-✅ **リスク最小化** - 全体を作ってから動かないリスクを回避
-
-### 実装方針
-**「最小構成から徐々に機能追加」**
-
-1️⃣ **まず起動させる（MVP）**
-2️⃣ **次に基本機能を追加（ID002）**
-3️⃣ **段階的に高度な機能を追加（ID003以降）**
-
----
-
-## 📋 今回の依頼：最小構成（MVP）
-
-### 目標
-**「とりあえず起動して画面が表示される」**
-
-### 実装内容
-以下の**最小限のファイル**のみ作成してください：
-
-1. **main.py** - アプリケーション起動
-   - ウィンドウを表示
-   - タイトルとメニューバー
-   - 空の画面でOK
-   - データ保存機能は不要
-
-2. **基本画面1つ** - メイン画面またはログイン画面
-   - シンプルなUI
-   - ボタンは動作しなくてOK
-   - 後で機能追加予定
-
-**これだけです！** データベース、複雑な機能、全画面は不要です。
-
----
-
-## 技術スタック
-- **GUIフレームワーク:** {tech_stack.get('gui_framework', 'PySide6 6.10.0')}
-- **データ保存:** 今回は不要（後で追加）
-- **使用ライブラリ:** 標準ライブラリのみ
-
-**制約条件:**
-"""
+        design_info = []
+        if data_models:
+            design_info.append("**データモデル:**\n")
+            for model in data_models[:3]:  # 最初の3つのみ
+                design_info.append(f"- {model.get('model_name', '')}: {model.get('description', '')}\n")
+            design_info.append("\n")
+        if screens:
+            design_info.append("**関連画面:**\n")
+            for screen in screens[:3]:  # 最初の3つのみ
+                design_info.append(f"- {screen.get('screen_name', '')}: {screen.get('description', '')}\n")
+            design_info.append("\n")
         
-        if constraints:
-            for constraint in constraints:
-                prompt += f"- {constraint}\n"
-        else:
-            prompt += "- WinPython標準環境で動作すること\n"
+        return {
+            'purpose': phase1_data.get('purpose', ''),
+            'main_features': ', '.join(main_features[:3]) if main_features else '未定義',
+            'constraints': "".join(f"- {c}\n" for c in constraints) if constraints else "- WinPython標準環境で動作すること\n",
+            'gui_framework': tech_stack.get('gui_framework', 'PySide6 6.10.0'),
+            'data_storage': tech_stack.get('data_storage', 'JSON'),
+            'design_info': "".join(design_info),
+            'design_index': None
+        }
+    
+    @staticmethod
+    def get_project_context(project) -> Dict:
+        """プロジェクトのテンプレート用文脈を取得（リビジョンが変わらない限り再利用）"""
+        with ImplementationPromptGenerator._lock:
+            cached = ImplementationPromptGenerator._context_cache.get(project)
+        if cached and cached[0] == project.revision:
+            return cached[1]
         
-        prompt += f"""
----
-
-## 🏗️ ファイル構成（最小）
-
-```
-{work_dir}/
-├── main.py              # 起動ファイル（今回作成）
-└── ui/
-    └── main_window.py   # メイン画面（今回作成）
-```
-
-**これだけ！** models/, utils/ などは後で追加します。
-
----
-
-## 💡 重要な設計指針
-
-### 1. main.py の役割
-```python
-# main.py は「起動するだけ」
-# 複雑なロジックは書かない
-# 後で変更しないように設計
-
-import sys
-from PySide6.QtWidgets import QApplication
-from ui.main_window import MainWindow
-
-def main():
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec())
-
-if __name__ == '__main__':
-    main()
-```
-
-### 2. モジュール分離の原則
-- **main.py は極力変更しない**
-- 新機能は**別ファイル**に作る
-- 既存ファイルへの追加は**import文のみ**
-
-### 3. 段階的拡張の設計
-- 最初はシンプルに
-- 後で機能を追加しやすく
-- 拡張ポイントを明確に
-
----
-
-## 📤 出力形式
-
-以下のJSON形式で回答してください：
-
-```json
-{{
-  "files": [
-    {{
-      "filename": "main.py",
-      "filepath": "./main.py",
-      "description": "アプリケーション起動ファイル",
-      "content": "完全なPythonコード"
-    }},
-    {{
-      "filename": "main_window.py",
-      "filepath": "./ui/main_window.py",
-      "description": "メインウィンドウ（最小構成）",
-      "content": "完全なPythonコード"
-    }}
-  ],
-  "dependencies": [
-    "必要なインポート文"
-  ],
-  "installation_notes": "セットアップ手順",
-  "test_instructions": "python main.py で起動確認"
-}}
-```
-
----
-
-## ⚠️ 注意事項
-
-**今回は最小構成です。以下は実装しないでください：**
-- ❌ データベース保存機能
-- ❌ 複雑なビジネスロジック
-- ❌ 全ての画面
-- ❌ 認証機能
-- ❌ 詳細なエラーハンドリング
-
-**これらは後のID（ID002, ID003...）で段階的に追加します。**
-
----
-
-## 🎯 成功条件
-
-✅ `python main.py` で起動する
-✅ ウィンドウが表示される
-✅ クラッシュしない
-✅ シンプルで読みやすいコード
-
-**これだけクリアすればOK！**
-
----
-
-それでは、上記の最小構成（MVP）を実装してください。
-シンプルで確実に動くコードをお願いします。
-"""
+        import_info = project.import_info
+        phase2_data = import_info.get('original_data', {}).get('project', {})
+        if not phase2_data:
+            phase2_data = {
+                'phase1_data': import_info.get('phase1_data', {}),
+                'design_data': import_info.get('design_data', {})
+            }
         
-        return prompt
+        context = ImplementationPromptGenerator.build_design_context(phase2_data)
+        context['design_index'] = ImplementationPromptGenerator.get_design_index(project, phase2_data)
+        with ImplementationPromptGenerator._lock:
+            ImplementationPromptGenerator._context_cache[project] = (project.revision, context)
+        return context
     
     @staticmethod
-    def generate_implementation_prompt(request: Dict, phase2_data: Dict, shell_type: str = 'powershell') -> str:
-        """実装依頼用プロンプトを生成"""
+    def get_design_index(project, phase2_data: Dict) -> DesignIndex:
+        """設計要素の検索インデックスを取得（同じインポートの間は再利用）"""
+        import_date = project.import_info.get('import_date', '')
+        with ImplementationPromptGenerator._lock:
+            cached = ImplementationPromptGenerator._index_cache.get(project)
+        if cached and cached[0] == import_date:
+            return cached[1]
         
-        # Phase 2の設計情報を抽出
-        design_data = phase2_data.get('design_data', {})
-        tech_stack = design_data.get('tech_stack', {})
-        data_models = design_data.get('data_models', [])
-        screens = design_data.get('screens', [])
+        index = DesignIndex.from_phase2(phase2_data)
+        with ImplementationPromptGenerator._lock:
+            ImplementationPromptGenerator._index_cache[project] = (import_date, index)
+        return index
+    
+    @staticmethod
+    def get_request_queue(project) -> Dict:
+        """依頼を完了済み・未完了に振り分けて取得（リビジョンが変わらない限り再利用）
         
-        prompt = f"""# コード実装依頼
-
-## 依頼内容
-**機能名:** {request.get('function_name', '')}
-
-**詳細:**
-{request.get('details', '')}
-
----
-
-## プロジェクト情報
-
-**技術スタック:**
-- GUIフレームワーク: {tech_stack.get('gui_framework', 'PySide6 6.10.0')}
-- データ保存形式: {tech_stack.get('data_storage', 'JSON')}
-- 使用可能ライブラリ: WinPython標準ライブラリのみ
-
-**重要な制約:**
-1. 外部ライブラリの追加インストール不可
-2. データベースはJSON形式のみ使用
-3. ファイル操作は標準ライブラリ（os, pathlib, shutil）のみ
-
----
-
-## 設計情報（参考）
-
-"""
+        pending の先頭が「次の依頼」になる。
+        """
+        with ImplementationPromptGenerator._lock:
+            cached = ImplementationPromptGenerator._queue_cache.get(project)
+        if cached and cached[0] == project.revision:
+            return cached[1]
         
-        # データモデル情報を追加
-        if data_models:
-            prompt += "**データモデル:**\n"
-            for model in data_models[:3]:  # 最初の3つのみ
-                prompt += f"- {model.get('model_name', '')}: {model.get('description', '')}\n"
-            prompt += "\n"
+        queue = {'completed': [], 'pending': []}
+        for request in project.code_requests:
+            done = request.get('status') in COMPLETED_REQUEST_STATUSES
+            queue['completed' if done else 'pending'].append(request)
         
-        # 画面情報を追加
-        if screens:
-            prompt += "**関連画面:**\n"
-            for screen in screens[:3]:  # 最初の3つのみ
-                prompt += f"- {screen.get('screen_name', '')}: {screen.get('description', '')}\n"
-            prompt += "\n"
+        with ImplementationPromptGenerator._lock:
+            ImplementationPromptGenerator._queue_cache[project] = (project.revision, queue)
+        return queue
+    
+    @staticmethod
+    def select_design_info(request: Dict, context: Dict) -> str:
+        """依頼内容に関連する設計要素を選んで「設計情報」欄を生成
         
-        prompt += """---
-
-## 出力形式の指定
-
-以下のJSON形式で回答してください：
-
-```json
-{
-  "files": [
-    {
-      "filename": "ファイル名（例: user_manager.py）",
-      "filepath": "相対パス（例: ./models/user_manager.py）",
-      "description": "ファイルの説明",
-      "content": "ファイルの完全なコード内容"
-    }
-  ],
-  "dependencies": [
-    "必要なインポート文のリスト"
-  ],
-  "installation_notes": "セットアップ手順や注意事項",
-  "test_instructions": "動作確認方法"
-}
-```
-
-**重要:**
-- `content` フィールドには完全なコードを含めてください
-- コメントは日本語で記述してください
-- エラーハンドリングを含めてください
-- 型ヒント（typing）を使用してください
-
-**シェル環境:**
-"""
+        インデックスがない場合は従来どおり先頭のデータモデル・画面を載せる。
+        データモデル・画面に関連するものがない場合も先頭から補う。
+        """
+        index = context.get('design_index')
+        if not index:
+            return context['design_info']
         
-        shell_names = {
-            'powershell': 'PowerShell (Windows)',
-            'terminal': 'Terminal (Mac/Linux)',
-            'cmd': 'コマンドプロンプト (Windows)'
-        }
+        query = f"{request.get('function_name', '')} {request.get('details', '')}"
+        results = index.search_by_kind(query, {kind: limit for kind, _, limit in DESIGN_SECTIONS})
+        parts = []
+        for kind, label, limit in DESIGN_SECTIONS:
+            entries = [entry for _, entry in results[kind]]
+            if not entries and kind in ('model', 'screen'):
+                entries = index.first(kind, limit)
+            if not entries:
+                continue
+            
+            parts.append(f"**{label}:**\n")
+            for entry in entries:
+                description = f": {entry['description']}" if kind in ('model', 'screen') or entry['description'] else ""
+                parts.append(f"- {entry['name']}{description}\n")
+            parts.append("\n")
         
-        prompt += f"使用シェル: {shell_names.get(shell_type, 'PowerShell')}\n\n"
+        return "".join(parts)
+    
+    @staticmethod
+    @timed('implementation_prompt.generate_mvp_prompt')
+    def generate_mvp_prompt(project_name: str, phase2_data: Dict, work_dir: str, shell_type: str = 'powershell',
+                            context: Dict = None) -> str:
+        """最小構成（MVP）用プロンプトを生成（context 指定時は phase2_data を解析しない）"""
+        if context is None:
+            context = ImplementationPromptGenerator.build_design_context(phase2_data)
         
-        # 段階的実装の指示を追加
-        prompt += """---
-
-## 🏗️ 段階的実装の原則
-
-### Phase 3 は「小さく作って確実に動かす」
-
-**このIDを実装する際の注意点：**
-
-1. **main.py の変更は最小限に**
-   - 新機能は別ファイル・別モジュールに作成
-   - main.py には import 追加程度に留める
-   - 既存の動作を壊さない
-
-2. **モジュール分離**
-   - 新機能は ui/, models/, utils/ などに分離
-   - 1ファイル1責任の原則
-   - 後で拡張しやすい設計
-
-3. **既存ファイルへの追加**
-   - 既存ファイルを修正する場合は差分を明確に
-   - 「〇〇の後に以下を追加」のように指示
-   - 全体を書き直さない
-
-4. **依存関係を意識**
-   - 前のID（ID001, ID002...）で作ったファイルを活用
-   - 重複した実装を避ける
-   - 既存の機能を呼び出す
-
----
-
-## ⚠️ 重要: 回答の分割について
-
-**プロンプトが長い場合、以下のルールで回答を分割してください：**
-
-1. **1回の回答は10,000文字以内**に収めてください
-2. 複数ファイルがある場合は、**1～2ファイルずつ**分けて回答してください
-3. 分割する場合は以下の形式で：
-
-**【パート 1/3】**
-```json
-{
-  "files": [
-    {
-      "filename": "file1.py",
-      "filepath": "./models/file1.py",
-      "content": "..."
-    }
-  ]
-}
-```
-
-**【パート 2/3】**
-```json
-{
-  "files": [
-    {
-      "filename": "file2.py",
-      "filepath": "./models/file2.py",
-      "content": "..."
-    }
-  ]
-}
-```
-
-4. **最後のパート**に `dependencies`、`installation_notes`、`test_instructions` を含めてください
-5. 各パートは**独立して実行可能な完全なJSON**として提供してください
-
----
-
-それでは、上記の依頼内容に基づいてコードを生成してください。
-必要に応じて複数パートに分割してください。
-"""
+        return TemplateEngine.render('implementation/mvp.md', {
+            **context,
+            'project_name': project_name,
+            'work_dir': work_dir
+        })
+    
+    @staticmethod
+    @timed('implementation_prompt.generate_implementation_prompt')
+    def generate_implementation_prompt(request: Dict, phase2_data: Dict, shell_type: str = 'powershell',
+                                       context: Dict = None, preamble: str = '') -> str:
+        """実装依頼用プロンプトを生成（context 指定時は phase2_data を解析しない）"""
+        if context is None:
+            context = ImplementationPromptGenerator.build_design_context(phase2_data)
         
-        return prompt
+        return TemplateEngine.render('implementation/implementation.md', {
+            **context,
+            'design_info': ImplementationPromptGenerator.select_design_info(request, context),
+            'function_name': request.get('function_name', ''),
+            'details': request.get('details', ''),
+            'shell_name': SHELL_NAMES.get(shell_type, 'PowerShell'),
+            'preamble': preamble
+        })
     
     @staticmethod
-    def generate_next_request_prompt(all_requests: list, completed_ids: list, phase2_data: Dict, shell_type: str = 'powershell') -> str:
+    @timed('implementation_prompt.generate_next_request_prompt')
+    def generate_next_request_prompt(all_requests: list, completed_ids: list, phase2_data: Dict, shell_type: str = 'powershell',
+                                     context: Dict = None) -> str:
         """次の未完了依頼のプロンプトを生成"""
+        completed = set(completed_ids)
         
         # 完了していない最初の依頼を見つける
         next_request = None
         for req in all_requests:
-            if req['id'] not in completed_ids and req.get('status') != '完了':
+            if req['id'] not in completed and req.get('status') != '完了':
                 next_request = req
                 break
         
@@ -377,207 +207,54 @@ if __name__ == '__main__':
             return "✅ 全ての依頼が完了しています！"
         
         # 完了済みの依頼リスト
-        completed_requests = [r for r in all_requests if r['id'] in completed_ids or r.get('status') == '完了']
+        completed_requests = [r for r in all_requests if r['id'] in completed or r.get('status') == '完了']
         
-        # 通常のプロンプトを生成
-        base_prompt = ImplementationPromptGenerator.generate_implementation_prompt(
-            next_request, phase2_data, shell_type
+        return ImplementationPromptGenerator._render_next_request_prompt(
+            next_request, completed_requests, phase2_data, shell_type, context
         )
-        
-        # 前提情報を追加
-        context = f"""
----
-
-## 📚 これまでの実装状況
-
-**完了済みの依頼: {len(completed_requests)} 件**
-
-"""
-        
+    
+    @staticmethod
+    def _render_next_request_prompt(next_request: Dict, completed_requests: list, phase2_data: Dict,
+                                    shell_type: str, context: Dict = None) -> str:
+        """次の依頼と完了済みの依頼からプロンプトを生成"""
+        completed_list = ""
         if completed_requests:
-            context += "**既に実装済みの機能:**\n"
-            for req in completed_requests[-3:]:  # 直近3件のみ表示
-                context += f"- ID{req['id']:03d}: {req['function_name']}\n"
-            context += "\n"
+            completed_list = "**既に実装済みの機能:**\n" + "".join(
+                f"- ID{req['id']:03d}: {req['function_name']}\n" for req in completed_requests[-3:]  # 直近3件のみ表示
+            ) + "\n"
         
-        context += f"""**今回の依頼: ID{next_request['id']:03d}**
-
----
-
-## 🔧 既存ファイルの活用
-
-**以下のファイルは既に作成済みです（前のIDで作成）:**
-- main.py
-- ui/ 配下のファイル
-- models/ 配下のファイル（あれば）
-- utils/ 配下のファイル（あれば）
-
-**これらを活用して、今回の機能を追加してください。**
-
-**重要:**
-- 既存ファイルを全て書き直さない
-- 必要な部分だけ追加・修正
-- main.py の変更は最小限に
-
----
-
-"""
+        # 前提情報を「依頼内容」の前に差し込む
+        preamble = TemplateEngine.render('implementation/next_request_context.md', {
+            'completed_count': len(completed_requests),
+            'completed_list': completed_list,
+            'next_request_id': f"{next_request['id']:03d}"
+        })
         
-        # プロンプトに挿入
-        return base_prompt.replace("## 依頼内容", context + "## 依頼内容")
-
+        return ImplementationPromptGenerator.generate_implementation_prompt(
+            next_request, phase2_data, shell_type, context=context, preamble=preamble
+        )
+    
     @staticmethod
+    def generate_next_prompt_for_project(project, shell_type: str = 'powershell') -> str:
+        """プロジェクトの次の未完了依頼のプロンプトを生成（キャッシュ済みの依頼キュー・文脈を使用）"""
+        queue = ImplementationPromptGenerator.get_request_queue(project)
+        if not queue['pending']:
+            return "✅ 全ての依頼が完了しています！"
+        
+        return ImplementationPromptGenerator._render_next_request_prompt(
+            queue['pending'][0],
+            queue['completed'],
+            None,
+            shell_type,
+            ImplementationPromptGenerator.get_project_context(project)
+        )
+    
+    @staticmethod
+    @timed('implementation_prompt.generate_check_prompt')
     def generate_check_prompt(request: Dict, work_dir: str) -> str:
         """チェック用プロンプトを生成"""
-        
-        prompt = f"""# 実装完了チェック
-
-## チェック対象
-**機能名:** {request.get('function_name', '')}
-
-**依頼内容:** {request.get('details', '')}
-
-**作業ディレクトリ:** {work_dir}
-
----
-
-## 📋 追加情報の提供方法
-
-**以下の情報があれば、チェック時に一緒に提供してください：**
-
-1. **ターミナル出力:** コマンド実行結果やエラーメッセージ
-2. **エラースクリーンショット:** エラー画面や問題箇所の画像
-3. **作成したファイル:** 確認が必要なコードファイルの内容
-4. **実行ログ:** アプリケーションの実行ログやデバッグ情報
-
-これらの情報により、より正確な確認が可能になります。
-
----
-
-## ✅ チェック項目（簡潔に）
-
-### 1. 実装確認
-- ファイルが作成されたか
-- コードに明らかなエラーがないか
-
-### 2. 動作確認
-- 基本動作が正常か
-- エラーハンドリングは適切か
-
-### 3. 問題検出
-- 新たなバグや問題はないか
-- 追加で必要な機能はあるか
-
----
-
-## 📤 出力形式（最小限）
-
-**重要: 変更があった項目のみ記載してください。変更がない項目は省略可能です。**
-
-```json
-{{
-  "deployed_files": [
-    {{
-      "filename": "user_model.py",
-      "filepath": "./models/user_model.py",
-      "status": "OK",
-      "notes": "正常動作確認"
-    }}
-  ],
-  "test_results": [
-    {{
-      "function_name": "ユーザー登録機能",
-      "result": "OK",
-      "notes": "正常系・異常系ともにOK"
-    }}
-  ],
-  "bugs": [],
-  "issue_updates": [],
-  "code_requests": []
-}}
-```
-
-**フィールドの説明:**
-- `deployed_files`: 配置したファイルの状態（OK/NG/未確認）
-- `test_results`: テスト結果（OK/NG）
-- `bugs`: 発見されたバグ（なければ空配列）
-- `issue_updates`: 問題の更新（なければ空配列）
-- `code_requests`: 新しい依頼（なければ空配列）
-
----
-
-## 💡 詳細フォーマット（必要時のみ）
-
-**新しい依頼が必要な場合:**
-```json
-{{
-  "code_requests": [
-    {{
-      "function_name": "パスワードリセット機能",
-      "details": "詳細な依頼内容",
-      "status": "依頼中"
-    }}
-  ]
-}}
-```
-
-**バグが見つかった場合:**
-```json
-{{
-  "bugs": [
-    {{
-      "title": "バグのタイトル",
-      "description": "詳細",
-      "severity": "低/中/高/致命的",
-      "status": "未対応"
-    }}
-  ]
-}}
-```
-
-**問題がある場合:**
-```json
-{{
-  "issue_updates": [
-    {{
-      "issue_id": null,
-      "action": "create",
-      "title": "問題タイトル",
-      "description": "詳細",
-      "impact": "低/中/高",
-      "new_status": "発見",
-      "notes": "状況説明"
-    }}
-  ]
-}}
-```
-
----
-
-## ⚠️ 分割ルール
-
-**回答が10,000文字を超える場合のみ分割してください：**
-
-**【パート 1/2】**
-```json
-{{
-  "deployed_files": [...],
-  "test_results": [...]
-}}
-```
-
-**【パート 2/2】**
-```json
-{{
-  "bugs": [...],
-  "code_requests": [...]
-}}
-```
-
----
-
-それでは、上記の項目に基づいて**簡潔に**確認結果を報告してください。
-**変更があった項目のみ記載**し、冗長な情報は省略してください。
-"""
-        
-        return prompt
+        return TemplateEngine.render('implementation/check.md', {
+            'function_name': request.get('function_name', ''),
+            'details': request.get('details', ''),
+            'work_dir': work_dir
+        })
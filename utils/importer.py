@@ -1,14 +1,17 @@
 """
 Phase 2データインポート処理
 """
-import json
 import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Tuple
 from models.implementation_project import ImplementationProject
 from utils.validators import Validators
-from utils.file_handler import FileHandler
+from utils.file_handler import FileHandler, COMPRESSION_EXTENSIONS
+from utils.perf import timed
+
+# data/imports に保存するコピーの圧縮形式（圧縮済みのファイルはその形式のまま保存）
+IMPORT_COPY_COMPRESSION = 'gzip'
 
 class Importer:
     """Phase 2からのデータインポートを管理するクラス"""
@@ -17,8 +20,12 @@ class Importer:
         self.file_handler = FileHandler()
         self.validators = Validators()
     
+    @timed('importer.import_phase2_project')
     def import_phase2_project(self, filepath: str) -> Tuple[bool, str, ImplementationProject]:
-        """Phase 2プロジェクトをインポート"""
+        """Phase 2プロジェクトをインポート（.json.gz / .json.xz / .json.zst は展開しながら読む）
+        
+        チェックサムは圧縮の有無にかかわらず、展開後のデータの正規化 JSON で照合する。
+        """
         try:
             # ファイル存在確認
             if not self.file_handler.file_exists(filepath):
@@ -32,11 +39,9 @@ class Importer:
             if not is_valid:
                 return False, "\n".join(errors), None
             
-            # チェックサム検証
+            # チェックサム検証（チェックサム欄を除いた正規化 JSON を逐次ハッシュに流し込む）
             if 'checksum' in data:
-                data_without_checksum = {k: v for k, v in data.items() if k != 'checksum'}
-                data_str = json.dumps(data_without_checksum, sort_keys=True, ensure_ascii=False)
-                if not self.validators.verify_checksum(data_str, data['checksum']):
+                if not self.validators.verify_data_checksum(data, data['checksum']):
                     return False, "チェックサムが一致しません。ファイルが改ざんされている可能性があります", None
             
             # Phase 2の実際の構造に対応してプロジェクトオブジェクト作成
@@ -55,11 +60,13 @@ class Importer:
                 'original_data': data
             }
             
-            # インポートファイルをコピー
+            # インポートファイルを圧縮してコピー
             import_dir = Path('data/imports')
             import_dir.mkdir(parents=True, exist_ok=True)
             dest_file = import_dir / Path(filepath).name
-            self.file_handler.copy_file(filepath, str(dest_file))
+            if self.file_handler.compression_of(filepath) is None:
+                dest_file = dest_file.with_name(dest_file.name + COMPRESSION_EXTENSIONS[IMPORT_COPY_COMPRESSION])
+            self.file_handler.copy_compressed(filepath, str(dest_file))
             
             return True, "インポートが完了しました", project
             
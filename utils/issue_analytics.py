@@ -0,0 +1,199 @@
+"""
+全プロジェクト横断の問題ライフサイクル集計（平均解決時間・再発率・未解決問題の経過日数・バグ重要度分布）
+"""
+import math
+import statistics
+import threading
+import weakref
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from utils.perf import timed
+
+# 履歴ステータスのコード
+STATUS_CODES = {'発見': 0, '対応中': 1, '解決': 2, '再発': 3}
+STATUS_UNKNOWN = -1
+STATUS_RESOLVED = STATUS_CODES['解決']
+
+# バグの重要度（BugDialog と同じ値、それ以外は「その他」に数える）
+BUG_SEVERITIES = ['致命的', '高', '中', '低']
+BUG_SEVERITY_OTHER = 'その他'
+BUG_RESOLVED = '解決済み'
+
+# 未解決問題の経過日数の区分（この日数未満, ラベル）。最後の区分は上限なし
+AGING_BUCKETS = [
+    (1, '1日未満'),
+    (7, '1週間未満'),
+    (30, '1か月未満'),
+    (None, '1か月以上')
+]
+
+SECONDS_PER_DAY = 86400
+
+
+def _epoch(timestamp: Optional[str]) -> float:
+    """ISO 形式の日時を UNIX 秒に変換（読めなければ NaN）"""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _days(seconds: float) -> float:
+    return round(seconds / SECONDS_PER_DAY, 2)
+
+
+class ProjectTable:
+    """1プロジェクトの問題・バグを列ごとの配列にまとめた表
+
+    問題の履歴は構築時に1回だけたどり、解決までの所要時間（未解決→解決の区間ごと）と
+    未解決問題の起点日時を配列に入れる。集計は配列に対する一括計算だけで行う。
+    """
+
+    def __init__(self, project):
+        self.revision = project.revision
+        # 問題ごとの列
+        self.issue_status = array('b')
+        self.issue_recurrences = array('l')
+        # 未解決問題ごとの列（現在の未解決区間が始まった日時）
+        self.open_since = array('d')
+        # 解決区間ごとの列（未解決になってから解決するまでの秒数）
+        self.resolution_seconds = array('d')
+        # 重要度ごとの件数（BUG_SEVERITIES + その他の順）
+        self.bug_totals = array('l', [0] * (len(BUG_SEVERITIES) + 1))
+        self.bug_unresolved = array('l', [0] * (len(BUG_SEVERITIES) + 1))
+
+        for issue in project.issues:
+            self._add_issue(issue)
+        for bug in project.bugs:
+            severity = bug.get('severity', '中')
+            index = BUG_SEVERITIES.index(severity) if severity in BUG_SEVERITIES else len(BUG_SEVERITIES)
+            self.bug_totals[index] += 1
+            if bug.get('status') != BUG_RESOLVED:
+                self.bug_unresolved[index] += 1
+
+    def _add_issue(self, issue):
+        opened = None
+        for history in issue.history:
+            code = STATUS_CODES.get(history.status, STATUS_UNKNOWN)
+            timestamp = _epoch(history.timestamp)
+            if code == STATUS_RESOLVED:
+                if opened is not None and not math.isnan(opened) and not math.isnan(timestamp):
+                    self.resolution_seconds.append(max(timestamp - opened, 0.0))
+                opened = None
+            elif code != STATUS_UNKNOWN and opened is None:
+                opened = timestamp
+
+        self.issue_status.append(STATUS_CODES.get(issue.current_status, STATUS_UNKNOWN))
+        self.issue_recurrences.append(issue.recurrence_count)
+        if issue.is_unresolved():
+            start = opened if opened is not None else _epoch(issue.created_at)
+            if not math.isnan(start):
+                self.open_since.append(start)
+
+    @property
+    def issues(self) -> int:
+        return len(self.issue_status)
+
+    def metrics(self, now: float) -> Dict:
+        """集計値（経過日数は now 時点）"""
+        return IssueAnalytics.compute([self], now)
+
+
+class IssueAnalytics:
+    """プロジェクトごとの表をリビジョン単位でキャッシュし、横断集計するクラス
+
+    キーは弱参照のため、破棄されたプロジェクトのエントリは自動で消える。
+    編集後の再集計では、リビジョンが進んだプロジェクトの表だけを作り直す。
+    """
+
+    _tables = weakref.WeakKeyDictionary()  # project -> ProjectTable
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def table(cls, project) -> ProjectTable:
+        """プロジェクトの表（リビジョンが変わっていなければキャッシュ）"""
+        with cls._lock:
+            cached = cls._tables.get(project)
+        if cached is not None and cached.revision == project.revision:
+            cls.hits += 1
+            return cached
+
+        cls.misses += 1
+        table = ProjectTable(project)
+        with cls._lock:
+            cls._tables[project] = table
+        return table
+
+    @classmethod
+    def clear(cls):
+        """キャッシュを破棄"""
+        with cls._lock:
+            cls._tables.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @staticmethod
+    def compute(tables: List[ProjectTable], now: float) -> Dict:
+        """複数の表をまとめて集計"""
+        issues = sum(t.issues for t in tables)
+        durations = array('d')
+        open_since = array('d')
+        recurrent = 0
+        recurrences = 0
+        bug_totals = [0] * (len(BUG_SEVERITIES) + 1)
+        bug_unresolved = [0] * (len(BUG_SEVERITIES) + 1)
+        for t in tables:
+            durations.extend(t.resolution_seconds)
+            open_since.extend(t.open_since)
+            recurrent += sum(1 for count in t.issue_recurrences if count > 0)
+            recurrences += sum(t.issue_recurrences)
+            bug_totals = [a + b for a, b in zip(bug_totals, t.bug_totals)]
+            bug_unresolved = [a + b for a, b in zip(bug_unresolved, t.bug_unresolved)]
+
+        ages = [now - start for start in open_since]
+        aging = {label: 0 for _, label in AGING_BUCKETS}
+        for age in ages:
+            days = age / SECONDS_PER_DAY
+            for limit, label in AGING_BUCKETS:
+                if limit is None or days < limit:
+                    aging[label] += 1
+                    break
+
+        severities = BUG_SEVERITIES + [BUG_SEVERITY_OTHER]
+        return {
+            'issues': issues,
+            'unresolved': len(open_since),
+            'resolutions': len(durations),
+            'mttr_days': _days(sum(durations) / len(durations)) if durations else None,
+            'median_resolution_days': _days(statistics.median(durations)) if durations else None,
+            'recurrent_issues': recurrent,
+            'recurrences': recurrences,
+            'recurrence_rate': round(recurrent / issues, 3) if issues else 0.0,
+            'reopen_rate': round(recurrences / len(durations), 3) if durations else 0.0,
+            'aging': aging,
+            'oldest_open_days': _days(max(ages)) if ages else None,
+            'bugs': {
+                severity: {'total': total, 'unresolved': unresolved}
+                for severity, total, unresolved in zip(severities, bug_totals, bug_unresolved)
+            }
+        }
+
+    @classmethod
+    @timed('issue_analytics.summarize')
+    def summarize(cls, projects: Iterable, now: Optional[float] = None) -> Dict:
+        """プロジェクトごとの集計と全体の集計
+
+        戻り値は {'projects': [{'project_id', 'project_name', ...集計値}], 'total': 集計値}。
+        """
+        now = datetime.now().timestamp() if now is None else now
+        rows = []
+        tables = []
+        for project in projects:
+            table = cls.table(project)
+            tables.append(table)
+            rows.append(dict(table.metrics(now), project_id=project.project_id,
+                             project_name=project.project_name))
+        return {'projects': rows, 'total': cls.compute(tables, now)}
@@ -2,14 +2,32 @@
 JSON一括インポートユーティリティ
 """
 import json
+import os
 from datetime import datetime
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from models.implementation_project import ImplementationProject
+from utils.duplicate_detector import DuplicateDetector, DUP_ISSUE, DUP_BUG
+from utils.perf import timed
+
+# 集計対象のカウンタ項目
+STAT_KEYS = [
+    'issue_updates',
+    'issue_creates',
+    'code_requests',
+    'deployed_files',
+    'test_results',
+    'bugs'
+]
+
+# この件数未満のバッチはプロセス起動コストの方が大きいため直列で検証する
+PARALLEL_VALIDATION_THRESHOLD = 8
 
 class JSONBulkImporter:
     """JSON一括インポートを管理するクラス"""
     
     @staticmethod
+    @timed('json_bulk_importer.validate_json')
     def validate_json(json_text: str) -> Tuple[bool, str, Dict]:
         """JSONの形式を検証"""
         try:
@@ -41,8 +59,16 @@ class JSONBulkImporter:
             return False, f"検証エラー: {str(e)}", None
     
     @staticmethod
-    def import_to_project(project: ImplementationProject, data: Dict) -> Tuple[bool, str, Dict]:
-        """プロジェクトにデータをインポート"""
+    @timed('json_bulk_importer.import_to_project')
+    def import_to_project(project: ImplementationProject, data: Dict,
+                          source: str = 'json_bulk_import',
+                          detector: DuplicateDetector = None) -> Tuple[bool, str, Dict]:
+        """プロジェクトにデータをインポート
+        
+        新規作成した問題・バグは同じプロジェクトの既存の問題・バグと類似度を比べ、
+        重複の可能性があるものを stats['duplicates'] に記録する（作成はそのまま行う）。
+        detector を渡すとその索引を使い回す（省略時はこのプロジェクト分だけ作る）。
+        """
         try:
             stats = {
                 'issue_updates': 0,
@@ -51,13 +77,18 @@ class JSONBulkImporter:
                 'deployed_files': 0,
                 'test_results': 0,
                 'bugs': 0,
+                'duplicates': [],
                 'errors': []
             }
+            if detector is None:
+                detector = DuplicateDetector()
+            detector.ensure_project(project)
             
             # 問題の更新・作成
             if 'issue_updates' in data:
                 for issue_data in data['issue_updates']:
                     try:
+                        issue_count = len(project.issues)
                         success = JSONBulkImporter._process_issue_update(
                             project, issue_data
                         )
@@ -66,6 +97,12 @@ class JSONBulkImporter:
                                 stats['issue_creates'] += 1
                             else:
                                 stats['issue_updates'] += 1
+                            if len(project.issues) > issue_count:
+                                JSONBulkImporter._check_duplicate(
+                                    detector, project, *DuplicateDetector.issue_document(
+                                        project.project_id, project.issues[-1]
+                                    ), [DUP_ISSUE], stats
+                                )
                     except Exception as e:
                         stats['errors'].append(f"問題処理エラー: {str(e)}")
             
@@ -114,27 +151,70 @@ class JSONBulkImporter:
             if 'bugs' in data:
                 for bug_data in data['bugs']:
                     try:
-                        project.add_bug(
+                        bug = project.add_bug(
                             bug_data.get('title', ''),
                             bug_data.get('description', ''),
                             bug_data.get('severity', '中')
                         )
                         stats['bugs'] += 1
+                        JSONBulkImporter._check_duplicate(
+                            detector, project, *DuplicateDetector.bug_document(project.project_id, bug),
+                            [DUP_ISSUE, DUP_BUG], stats
+                        )
                     except Exception as e:
                         stats['errors'].append(f"バグ登録エラー: {str(e)}")
             
             # インポート履歴を記録
-            project.add_import_record('json_bulk_import', {
-                'issue_updates': stats['issue_updates'],
-                'issue_creates': stats['issue_creates'],
-                'code_requests': stats['code_requests'],
-                'deployed_files': stats['deployed_files'],
-                'test_results': stats['test_results'],
-                'bugs': stats['bugs']
-            })
+            project.add_import_record(source, {key: stats[key] for key in STAT_KEYS})
             
             # 結果メッセージ
-            message = f"""インポート完了:
+            message = JSONBulkImporter.format_stats_message(stats)
+            
+            return True, message, stats
+            
+        except Exception as e:
+            return False, f"インポートエラー: {str(e)}", None
+    
+    @staticmethod
+    def _check_duplicate(detector: DuplicateDetector, project: ImplementationProject,
+                         key: Tuple, document: Dict, kinds: List[str], stats: Dict):
+        """新規作成した問題・バグに似た既存の文書を記録し、索引に追加"""
+        matches = detector.find_similar_text(
+            document['text'], kinds=kinds, project_id=project.project_id, exclude=[key], limit=1
+        )
+        if matches:
+            match = matches[0]
+            stats['duplicates'].append({
+                'project_id': project.project_id,
+                'kind': document['kind'],
+                'ref': document['ref'],
+                'title': document['title'],
+                'existing_kind': match['kind'],
+                'existing_ref': match['ref'],
+                'existing_title': match['title'],
+                'existing_status': match['status'],
+                'similarity': match['similarity']
+            })
+        detector.add(key, document)
+    
+    @staticmethod
+    def format_duplicate(duplicate: Dict) -> str:
+        """重複候補1件の説明"""
+        def label(kind, ref):
+            return ref if kind == DUP_ISSUE else f"バグ#{ref}"
+        
+        new = label(duplicate['kind'], duplicate['ref'])
+        existing = label(duplicate['existing_kind'], duplicate['existing_ref'])
+        line = (f"{new}「{duplicate['title']}」≒ {existing}「{duplicate['existing_title']}」"
+                f"（類似度 {duplicate['similarity']:.2f}）")
+        if duplicate['existing_kind'] == DUP_ISSUE:
+            line += f" → {existing} を『再発』に更新することを検討"
+        return line
+    
+    @staticmethod
+    def format_stats_message(stats: Dict) -> str:
+        """インポート結果メッセージを生成"""
+        message = f"""インポート完了:
 - 問題更新: {stats['issue_updates']}件
 - 問題新規作成: {stats['issue_creates']}件
 - コード依頼: {stats['code_requests']}件
@@ -142,15 +222,164 @@ class JSONBulkImporter:
 - テスト結果: {stats['test_results']}件
 - バグ: {stats['bugs']}件
 """
+        
+        if stats.get('duplicates'):
+            message += f"\n重複の可能性: {len(stats['duplicates'])}件\n"
+            message += "\n".join(
+                f"- {JSONBulkImporter.format_duplicate(d)}" for d in stats['duplicates'][:5]
+            )
+            message += "\n"
+        
+        if stats['errors']:
+            message += f"\nエラー: {len(stats['errors'])}件\n"
+            message += "\n".join(stats['errors'][:5])
+        
+        return message
+    
+    @staticmethod
+    def load_batch_payloads(path: str) -> List[Tuple[str, str]]:
+        """ディレクトリまたはJSONLファイルからペイロードを読み込み
+        
+        戻り値は (ラベル, JSONテキスト) のリスト。ディレクトリの場合は
+        *.json をファイル名順に、JSONLの場合は空行を除く各行を順に返す。
+        """
+        source = Path(path)
+        payloads = []
+        
+        if source.is_dir():
+            for file in sorted(source.glob('*.json')):
+                payloads.append((file.name, file.read_text(encoding='utf-8-sig')))
+        elif source.is_file():
+            with open(source, 'r', encoding='utf-8-sig') as f:
+                for line_no, line in enumerate(f, 1):
+                    if line.strip():
+                        payloads.append((f"{source.name}:{line_no}", line))
+        else:
+            raise FileNotFoundError(f"パスが見つかりません: {path}")
+        
+        return payloads
+    
+    @staticmethod
+    @timed('json_bulk_importer.validate_batch')
+    def validate_batch(payloads: List[Tuple[str, str]], max_workers: Optional[int] = None) -> List[Tuple[str, bool, str, Dict]]:
+        """複数ペイロードを検証（件数が多い場合はプロセスプールで並列化）
+        
+        戻り値は入力と同じ順序の (ラベル, 検証結果, メッセージ, データ) のリスト。
+        """
+        labels = [label for label, _ in payloads]
+        texts = [text for _, text in payloads]
+        
+        results = None
+        if len(texts) >= PARALLEL_VALIDATION_THRESHOLD and max_workers != 1:
+            # プロセスプールは起動時間に影響するため必要時のみ読み込む
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                workers = max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(texts) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(JSONBulkImporter.validate_json, texts, chunksize=chunksize))
+            except (BrokenProcessPool, OSError):
+                # プロセスを起動できない環境では直列にフォールバック
+                results = None
+        
+        if results is None:
+            results = [JSONBulkImporter.validate_json(text) for text in texts]
+        
+        return [(label, *result) for label, result in zip(labels, results)]
+    
+    @staticmethod
+    @timed('json_bulk_importer.import_batch')
+    def import_batch(projects: List[ImplementationProject], validated: List[Tuple[str, bool, str, Dict]],
+                     default_project: ImplementationProject = None,
+                     detector: DuplicateDetector = None) -> Tuple[bool, str, Dict]:
+        """検証済みペイロードを順番にプロジェクトへ適用
+        
+        ペイロードに "project_id" があればそのプロジェクトへ、なければ
+        default_project へ適用する。保存は行わないため、呼び出し側で
+        全件適用後に一度だけ保存すること。重複検出の索引は全ペイロードで共有する。
+        """
+        if detector is None:
+            detector = DuplicateDetector()
+        project_map = {p.project_id: p for p in projects}
+        stats = {key: 0 for key in STAT_KEYS}
+        stats.update({
+            'payloads': len(validated),
+            'applied': 0,
+            'skipped': 0,
+            'projects': [],
+            'duplicates': [],
+            'errors': []
+        })
+        
+        for label, is_valid, message, data in validated:
+            if not is_valid:
+                stats['skipped'] += 1
+                stats['errors'].append(f"{label}: {message}")
+                continue
             
-            if stats['errors']:
-                message += f"\nエラー: {len(stats['errors'])}件\n"
-                message += "\n".join(stats['errors'][:5])
+            target_id = data.get('project_id')
+            project = project_map.get(target_id) if target_id else default_project
+            if project is None:
+                stats['skipped'] += 1
+                if target_id:
+                    stats['errors'].append(f"{label}: プロジェクト '{target_id}' が見つかりません")
+                else:
+                    stats['errors'].append(f"{label}: 適用先プロジェクトが指定されていません")
+                continue
             
-            return True, message, stats
+            success, message, payload_stats = JSONBulkImporter.import_to_project(
+                project, data, f"json_batch_import:{label}", detector
+            )
+            if not success:
+                stats['skipped'] += 1
+                stats['errors'].append(f"{label}: {message}")
+                continue
             
-        except Exception as e:
-            return False, f"インポートエラー: {str(e)}", None
+            stats['applied'] += 1
+            for key in STAT_KEYS:
+                stats[key] += payload_stats[key]
+            stats['duplicates'].extend(payload_stats['duplicates'])
+            stats['errors'].extend(f"{label}: {e}" for e in payload_stats['errors'])
+            if project.project_id not in stats['projects']:
+                stats['projects'].append(project.project_id)
+        
+        message = f"""一括インポート: {stats['applied']}/{stats['payloads']}件のペイロードを適用
+- 対象プロジェクト: {', '.join(stats['projects']) if stats['projects'] else 'なし'}
+"""
+        message += JSONBulkImporter.format_stats_message(stats)
+        
+        return stats['applied'] > 0, message, stats
+    
+    @staticmethod
+    def generate_batch_preview(validated: List[Tuple[str, bool, str, Dict]]) -> str:
+        """一括インポート内容のプレビューを生成"""
+        valid = [v for v in validated if v[1]]
+        
+        preview = "=== 一括インポート内容プレビュー ===\n\n"
+        preview += f"ペイロード: {len(validated)}件（有効: {len(valid)}件 / 無効: {len(validated) - len(valid)}件）\n\n"
+        
+        totals = {section: 0 for section in ['issue_updates', 'code_requests', 'deployed_files', 'test_results', 'bugs']}
+        for _, _, _, data in valid:
+            for section in totals:
+                totals[section] += len(data.get(section, []))
+        
+        preview += f"【問題更新・作成】 {totals['issue_updates']}件\n"
+        preview += f"【コード依頼】 {totals['code_requests']}件\n"
+        preview += f"【配置ファイル】 {totals['deployed_files']}件\n"
+        preview += f"【テスト結果】 {totals['test_results']}件\n"
+        preview += f"【バグ】 {totals['bugs']}件\n\n"
+        
+        for label, is_valid, message, data in validated[:10]:
+            if is_valid:
+                target = data.get('project_id', '(選択中のプロジェクト)')
+                preview += f"  - ✅ {label} → {target}\n"
+            else:
+                preview += f"  - ❌ {label}: {message}\n"
+        if len(validated) > 10:
+            preview += f"  ... 他 {len(validated) - 10}件\n"
+        
+        return preview
     
     @staticmethod
     def _process_issue_update(project: ImplementationProject, issue_data: Dict) -> bool:
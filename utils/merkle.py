@@ -0,0 +1,185 @@
+"""
+Merkle ツリーによるエクスポートデータのチェックサム
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from utils.validators import Validators
+
+MERKLE_ALGORITHM = 'sha256-merkle'
+
+# 葉と内部ノードのハッシュが衝突しないよう、先頭に種別のバイトを付ける（RFC 6962 と同じ方式）
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+# 要素ごとに分割せず、ヘッダーとしてまとめてハッシュする項目に付ける名前
+HEADER_SECTION = 'header'
+
+
+def leaf_hash(item) -> str:
+    """1要素の正規化 JSON の葉ハッシュ"""
+    return hashlib.sha256(LEAF_PREFIX + Validators.canonical_json(item).encode('utf-8')).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    """2つの子ノードから親ノードのハッシュを計算"""
+    return hashlib.sha256(NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+class MerkleTree:
+    """葉ハッシュの列から作る Merkle ツリー
+
+    奇数個の段では最後のノードをそのまま上の段に送る。葉が0個のときのルートは
+    空文字列の SHA-256。
+    """
+
+    EMPTY_ROOT = hashlib.sha256(b'').hexdigest()
+
+    def __init__(self, leaves: List[str]):
+        self.levels: List[List[str]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parent = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parent.append(level[-1])
+            self.levels.append(parent)
+
+    @property
+    def root(self) -> str:
+        top = self.levels[-1]
+        return top[0] if top else self.EMPTY_ROOT
+
+    def proof(self, index: int) -> List[Dict[str, str]]:
+        """葉 index からルートまでの検証パス（兄弟ノードとその位置）"""
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append({'side': 'left' if sibling < index else 'right', 'hash': level[sibling]})
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(leaf: str, proof: List[Dict[str, str]], root: str) -> bool:
+        """検証パスから葉がルートに含まれることを確認"""
+        current = leaf
+        for step in proof:
+            if step['side'] == 'left':
+                current = node_hash(step['hash'], current)
+            else:
+                current = node_hash(current, step['hash'])
+        return current == root
+
+
+class ExportMerkle:
+    """エクスポートデータの Merkle ツリー（セクションごとの部分木とその上の木）
+
+    リスト型のセクションは要素ごと、それ以外のセクションは1つの葉としてハッシュし、
+    セクション以外の項目はまとめて header セクションの葉にする。ルートは
+    [header, セクション...] の部分木のルートを順に並べた木のルート。
+    """
+
+    @staticmethod
+    def section_leaves(value) -> List[str]:
+        """セクションの葉ハッシュ（リストなら要素ごと）"""
+        if isinstance(value, list):
+            return [leaf_hash(item) for item in value]
+        return [leaf_hash(value)]
+
+    @staticmethod
+    def header(export_data: Dict, sections: Iterable[str], exclude: Iterable[str] = ()) -> Dict:
+        """セクションと除外項目以外の項目"""
+        skipped = set(sections) | set(exclude)
+        return {key: value for key, value in export_data.items() if key not in skipped}
+
+    @staticmethod
+    def compute_leaves(export_data: Dict, sections: Iterable[str], exclude: Iterable[str] = (),
+                       max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """header と各セクションの葉ハッシュをセクションごとに並列に計算"""
+        sections = [name for name in sections if name in export_data]
+        values = [ExportMerkle.header(export_data, sections, exclude)] + [export_data[name] for name in sections]
+        names = [HEADER_SECTION] + sections
+
+        workers = max_workers or min(len(names), os.cpu_count() or 1)
+        if workers <= 1:
+            leaves = [ExportMerkle.section_leaves(value) for value in values]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                leaves = list(executor.map(ExportMerkle.section_leaves, values))
+        return dict(zip(names, leaves))
+
+    @staticmethod
+    def build(leaves: Dict[str, List[str]]) -> Dict:
+        """葉ハッシュからエクスポートに埋め込む Merkle 情報を作成"""
+        section_roots = {name: MerkleTree(hashes).root for name, hashes in leaves.items()}
+        return {
+            'algorithm': MERKLE_ALGORITHM,
+            'root': MerkleTree(list(section_roots.values())).root,
+            'section_roots': section_roots,
+            'leaves': leaves
+        }
+
+    @staticmethod
+    def root_of(merkle: Dict, names: Optional[Iterable[str]] = None) -> str:
+        """埋め込まれた葉ハッシュからルートを計算し直す（Merkle 情報自体の改ざん検出用）
+
+        names を渡すとその順にセクションを並べる（キーを整列して保存されたファイル用）。
+        """
+        leaves = merkle.get('leaves', {})
+        if names is not None:
+            leaves = {name: leaves[name] for name in names if name in leaves}
+        roots = [MerkleTree(hashes).root for hashes in leaves.values()]
+        return MerkleTree(roots).root
+
+    @staticmethod
+    def verify(export_data: Dict, sections: Iterable[str], exclude: Iterable[str] = (),
+               max_workers: Optional[int] = None) -> Dict:
+        """エクスポートデータを埋め込みの Merkle 情報と照合し、改ざんされた要素を特定
+
+        戻り値の tampered はセクション名ごとの不一致の要素番号（header は [0]）。
+        要素数が変わったセクションは added / removed に要素番号を入れる。
+        """
+        merkle = export_data.get('merkle') or {}
+        expected = merkle.get('leaves', {})
+        actual = ExportMerkle.compute_leaves(export_data, sections, exclude, max_workers)
+        diff = ExportMerkle.diff_leaves(expected, actual)
+        root_matches = ExportMerkle.root_of(merkle, actual) == export_data.get('checksum')
+        return {
+            'valid': root_matches and not diff,
+            'root_matches': root_matches,
+            'tampered': {name: d['changed'] for name, d in diff.items() if d['changed']},
+            'added': {name: d['added'] for name, d in diff.items() if d['added']},
+            'removed': {name: d['removed'] for name, d in diff.items() if d['removed']}
+        }
+
+    @staticmethod
+    def diff_leaves(old: Dict[str, List[str]], new: Dict[str, List[str]]) -> Dict[str, Dict[str, List[int]]]:
+        """2つの葉ハッシュ集合を比べ、セクションごとに変更・追加・削除された要素番号を返す"""
+        diff = {}
+        for name in list(old) + [n for n in new if n not in old]:
+            old_hashes = old.get(name, [])
+            new_hashes = new.get(name, [])
+            if old_hashes == new_hashes:
+                continue
+            common = min(len(old_hashes), len(new_hashes))
+            diff[name] = {
+                'changed': [i for i in range(common) if old_hashes[i] != new_hashes[i]],
+                'added': list(range(common, len(new_hashes))),
+                'removed': list(range(common, len(old_hashes)))
+            }
+        return diff
+
+    @staticmethod
+    def diff(old_merkle: Dict, new_merkle: Dict) -> Dict[str, Dict[str, List[int]]]:
+        """2回のエクスポートの Merkle 情報を比べる（ルートが同じセクションは要素を比べない）"""
+        old_roots = old_merkle.get('section_roots', {})
+        new_roots = new_merkle.get('section_roots', {})
+        old_leaves = old_merkle.get('leaves', {})
+        new_leaves = new_merkle.get('leaves', {})
+        names = list(old_roots) + [name for name in new_roots if name not in old_roots]
+        changed = [name for name in names if old_roots.get(name) != new_roots.get(name)]
+        return ExportMerkle.diff_leaves(
+            {name: old_leaves.get(name, []) for name in changed},
+            {name: new_leaves.get(name, []) for name in changed}
+        )
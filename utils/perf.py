@@ -0,0 +1,128 @@
+"""
+処理時間計測ユーティリティ（オプトイン）
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# リングバッファに保持するサンプル数の既定値
+DEFAULT_CAPACITY = 10000
+
+class PerfRecorder:
+    """計測サンプルをリングバッファに蓄積するクラス
+
+    既定では無効で、環境変数 PHASE3_PERF=1 または enable() で有効になる。
+    無効時の計測ポイントのコストはフラグ判定1回のみ。
+    """
+
+    enabled = os.environ.get('PHASE3_PERF') == '1'
+    _samples = deque(maxlen=DEFAULT_CAPACITY)
+    _lock = threading.Lock()
+    _origin = time.perf_counter()
+
+    @classmethod
+    def enable(cls, enabled: bool = True, capacity: int = None):
+        """計測の有効・無効を切り替え"""
+        if capacity and capacity != cls._samples.maxlen:
+            with cls._lock:
+                cls._samples = deque(cls._samples, maxlen=capacity)
+        cls.enabled = enabled
+
+    @classmethod
+    def record(cls, name: str, start: float, duration: float):
+        """サンプルを記録（start / duration は perf_counter 秒）"""
+        with cls._lock:
+            cls._samples.append((name, start, duration, threading.get_ident()))
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str):
+        """with ブロックの所要時間を計測"""
+        if not cls.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record(name, start, time.perf_counter() - start)
+
+    @classmethod
+    def get_samples(cls) -> List[Tuple[str, float, float, int]]:
+        """サンプルのコピーを取得"""
+        with cls._lock:
+            return list(cls._samples)
+
+    @classmethod
+    def clear(cls):
+        """サンプルを全て破棄"""
+        with cls._lock:
+            cls._samples.clear()
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], ratio: float) -> float:
+        index = min(len(sorted_values) - 1, max(0, int(round(ratio * (len(sorted_values) - 1)))))
+        return sorted_values[index]
+
+    @classmethod
+    def summary(cls) -> Dict[str, Dict]:
+        """処理ごとの件数・p50・p95・最大・合計（ミリ秒）を取得"""
+        durations: Dict[str, List[float]] = {}
+        for name, _, duration, _ in cls.get_samples():
+            durations.setdefault(name, []).append(duration * 1000)
+
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'p50_ms': round(cls._percentile(values, 0.5), 3),
+                'p95_ms': round(cls._percentile(values, 0.95), 3),
+                'max_ms': round(values[-1], 3),
+                'total_ms': round(sum(values), 3)
+            }
+        return result
+
+    @classmethod
+    def export_chrome_trace(cls, filepath: str) -> int:
+        """Chrome Trace Event 形式（chrome://tracing, Perfetto）で保存し、件数を返す"""
+        pid = os.getpid()
+        events = []
+        for name, start, duration, tid in cls.get_samples():
+            events.append({
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': round((start - cls._origin) * 1_000_000, 1),
+                'dur': round(duration * 1_000_000, 1),
+                'pid': pid,
+                'tid': tid
+            })
+
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+
+def timed(name: str):
+    """関数の所要時間を PerfRecorder に記録するデコレーター"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PerfRecorder.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PerfRecorder.record(name, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+"""
+プロンプト組み立て・トークン数見積もりユーティリティ
+"""
+from typing import List
+
+def estimate_tokens(text: str) -> int:
+    """トークン数を概算
+
+    日本語などの非ASCII文字はおおよそ1文字1トークン、ASCIIはおおよそ
+    4文字1トークンとして見積もる。予算判定用の目安であり厳密ではない。
+    """
+    ascii_count = len(text.encode('ascii', 'ignore'))
+    return len(text) - ascii_count + (ascii_count + 3) // 4
+
+
+class PromptBuilder:
+    """セクション単位でプロンプトを組み立てるクラス
+
+    文字列の += 連結を避け、パーツをリストに溜めて最後に1回だけ結合する。
+    パーツ追加時にトークン数を積算するため、組み立て途中でも予算判定できる。
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.tokens = 0
+
+    def add(self, text: str, tokens: int = None) -> 'PromptBuilder':
+        """テキストを追加（トークン数が分かっていれば tokens で渡す）"""
+        self.parts.append(text)
+        self.tokens += estimate_tokens(text) if tokens is None else tokens
+        return self
+
+    def add_section(self, text: str, tokens: int = None) -> 'PromptBuilder':
+        """セクションを追加（末尾に空行を入れる）"""
+        self.add(text, tokens)
+        return self.add("\n\n", 1)
+
+    def build(self) -> str:
+        """プロンプトを結合して返す"""
+        return "".join(self.parts)
@@ -1,36 +1,346 @@
 """
 プロンプト自動生成ユーティリティ
 """
+import hashlib
+import json
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
 from models.implementation_project import ImplementationProject
+from models.issue import Issue
+from utils.perf import timed
+from utils.prompt_builder import PromptBuilder, estimate_tokens
+
+# Claude に返してもらう JSON の形式（定数）
+JSON_SCHEMA = '''{
+  "issue_updates": [
+    {
+      "issue_id": "ISS001 または null（新規の場合）",
+      "action": "update または create",
+      "title": "問題タイトル（新規の場合のみ）",
+      "description": "詳細説明（新規の場合のみ）",
+      "impact": "低/中/高",
+      "new_status": "発見/対応中/解決/再発",
+      "notes": "今回の状況説明",
+      "resolution": "解決策（解決時のみ）"
+    }
+  ],
+  "code_requests": [
+    {
+      "function_name": "機能名",
+      "details": "詳細な依頼内容",
+      "related_issues": ["ISS001", "ISS002"],
+      "status": "依頼中"
+    }
+  ],
+  "deployed_files": [
+    {
+      "filename": "ファイル名",
+      "filepath": "配置パス",
+      "status": "OK/NG/未確認",
+      "notes": "備考"
+    }
+  ],
+  "test_results": [
+    {
+      "function_name": "機能名",
+      "result": "OK/NG",
+      "notes": "テスト内容"
+    }
+  ],
+  "bugs": [
+    {
+      "title": "バグタイトル",
+      "description": "詳細",
+      "severity": "低/中/高/致命的",
+      "status": "未対応"
+    }
+  ]
+}'''
+
+PROMPT_HEADER = "# Phase 3 実装管理 - 問題追跡と次の対応依頼\n\n"
+
+PROMPT_FOOTER = "".join([
+    "## 今回の依頼\n\n",
+    "上記の全履歴を踏まえて、以下のJSON形式で次の対応を提案してください：\n\n",
+    "```json\n",
+    JSON_SCHEMA, "\n",
+    "```\n\n",
+    "特に以下の点を確認してください：\n",
+    "1. 未解決の問題に対する具体的な対応策\n",
+    "2. 再発している問題の根本原因分析\n",
+    "3. 新たに必要なコード依頼\n",
+    "4. 実装済み機能のテスト計画\n"
+])
+
+_FIXED_TOKENS = estimate_tokens(PROMPT_HEADER) + estimate_tokens(PROMPT_FOOTER)
+
+DELTA_PROMPT_HEADER = "# Phase 3 実装管理 - 前回からの差分と次の対応依頼\n\n"
+
+DELTA_PROMPT_FOOTER = PROMPT_FOOTER.replace("上記の全履歴を踏まえて", "前回までの内容と上記の差分を踏まえて")
+
+# 差分判定の対象とするレコード一覧（属性名, 見出し）
+DELTA_RECORD_SECTIONS = [
+    ('code_requests', 'コード依頼'),
+    ('test_results', 'テスト結果'),
+    ('bugs', 'バグ'),
+]
+
+
+def _fingerprint(record: Dict) -> str:
+    """レコード内容の指紋（短いハッシュ）を取得"""
+    data = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+class PromptSectionCache:
+    """生成済みのプロンプトセクションをメモ化するクラス
+    
+    プロジェクト単位のセクションは project.revision、問題ブロックは
+    issue.last_updated（と履歴件数）が変わらない限り再利用する。
+    キーは弱参照のため、破棄されたプロジェクト・問題のエントリは自動で消える。
+    """
+    
+    _sections = weakref.WeakKeyDictionary()  # project -> {name: (revision, text, tokens)}
+    _issue_blocks = weakref.WeakKeyDictionary()  # issue -> {kind: (key, text, tokens)}
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+    
+    @classmethod
+    def get_section(cls, project, name: str, render: Callable) -> Tuple[str, int]:
+        """プロジェクト単位のセクションを (テキスト, トークン数) で取得"""
+        with cls._lock:
+            cached = cls._sections.get(project, {}).get(name)
+        if cached and cached[0] == project.revision:
+            cls.hits += 1
+            return cached[1], cached[2]
+        
+        cls.misses += 1
+        text = render(project)
+        entry = (project.revision, text, estimate_tokens(text))
+        with cls._lock:
+            cls._sections.setdefault(project, {})[name] = entry
+        return entry[1], entry[2]
+    
+    @classmethod
+    def get_issue_block(cls, issue: Issue, kind: str, render: Callable) -> Tuple[str, int]:
+        """問題ブロックを (テキスト, トークン数) で取得"""
+        key = (issue.last_updated, len(issue.history))
+        with cls._lock:
+            cached = cls._issue_blocks.get(issue, {}).get(kind)
+        if cached and cached[0] == key:
+            cls.hits += 1
+            return cached[1], cached[2]
+        
+        cls.misses += 1
+        text = render(issue)
+        entry = (key, text, estimate_tokens(text))
+        with cls._lock:
+            cls._issue_blocks.setdefault(issue, {})[kind] = entry
+        return entry[1], entry[2]
+    
+    @classmethod
+    def clear(cls):
+        """キャッシュを全て破棄"""
+        with cls._lock:
+            cls._sections.clear()
+            cls._issue_blocks.clear()
+            cls.hits = 0
+            cls.misses = 0
+    
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """ヒット数・ミス数・保持件数を取得"""
+        with cls._lock:
+            return {
+                'hits': cls.hits,
+                'misses': cls.misses,
+                'projects': len(cls._sections),
+                'issues': len(cls._issue_blocks)
+            }
+
 
 class PromptGenerator:
     """Claude 用プロンプトを自動生成するクラス"""
     
     @staticmethod
-    def generate_full_prompt(project):
-        """完全なプロンプトを生成"""
-        project_info = PromptGenerator._generate_project_info(project)
-        issue_history = PromptGenerator._generate_issue_history(project)
-        request_status = PromptGenerator._generate_request_status(project)
-        json_schema = PromptGenerator._get_json_schema()
-        
-        prompt = "# Phase 3 実装管理 - 問題追跡と次の対応依頼\n\n"
-        prompt += project_info + "\n\n"
-        prompt += issue_history + "\n\n"
-        prompt += request_status + "\n\n"
-        prompt += "## 今回の依頼\n\n"
-        prompt += "上記の全履歴を踏まえて、以下のJSON形式で次の対応を提案してください：\n\n"
-        prompt += "```json\n"
-        prompt += json_schema + "\n"
-        prompt += "```\n\n"
-        prompt += "特に以下の点を確認してください：\n"
-        prompt += "1. 未解決の問題に対する具体的な対応策\n"
-        prompt += "2. 再発している問題の根本原因分析\n"
-        prompt += "3. 新たに必要なコード依頼\n"
-        prompt += "4. 実装済み機能のテスト計画\n"
-        
+    @timed('prompt_generator.generate_full_prompt')
+    def generate_full_prompt(project, token_budget: Optional[int] = None):
+        """完全なプロンプトを生成（token_budget 指定時は予算内に収める）"""
+        prompt, _ = PromptGenerator.generate_budgeted_prompt(project, token_budget)
         return prompt
     
+    @staticmethod
+    def generate_budgeted_prompt(project, token_budget: Optional[int] = None) -> Tuple[str, Dict]:
+        """トークン予算付きでプロンプトを生成し、(プロンプト, 統計) を返す
+        
+        予算を超える場合は、古い解決済みの問題から順に要約し、それでも
+        超える場合は省略する。未解決・再発した問題は常に全履歴を含める。
+        """
+        project_info, info_tokens = PromptSectionCache.get_section(
+            project, 'project_info', PromptGenerator._generate_project_info
+        )
+        request_status, request_tokens = PromptSectionCache.get_section(
+            project, 'request_status', PromptGenerator._generate_request_status
+        )
+        
+        issue_budget = None
+        if token_budget:
+            issue_budget = max(0, token_budget - _FIXED_TOKENS - info_tokens - request_tokens - 10)
+        
+        issue_history, stats = PromptGenerator._generate_issue_section(project, issue_budget)
+        
+        builder = PromptBuilder()
+        builder.add(PROMPT_HEADER)
+        builder.add_section(project_info, info_tokens)
+        builder.add_section(issue_history, stats.pop('section_tokens'))
+        builder.add_section(request_status, request_tokens)
+        builder.add(PROMPT_FOOTER, _FIXED_TOKENS - estimate_tokens(PROMPT_HEADER))
+        
+        stats['tokens'] = builder.tokens
+        stats['token_budget'] = token_budget
+        stats['within_budget'] = not token_budget or builder.tokens <= token_budget
+        return builder.build(), stats
+    
+    @staticmethod
+    def snapshot_state(project) -> Dict:
+        """差分判定用に現在の状態の指紋を取得"""
+        snapshot = {'issues': {issue.issue_id: len(issue.history) for issue in project.issues}}
+        for attr, _ in DELTA_RECORD_SECTIONS:
+            snapshot[attr] = {str(record.get('id')): _fingerprint(record) for record in getattr(project, attr)}
+        return snapshot
+    
+    @staticmethod
+    def record_watermark(project, mode: str = 'full', tokens: int = 0):
+        """プロンプトを送った時点としてウォーターマークを記録"""
+        project.add_prompt_record(mode, tokens, PromptGenerator.snapshot_state(project))
+    
+    @staticmethod
+    @timed('prompt_generator.generate_delta_prompt')
+    def generate_delta_prompt(project) -> Tuple[str, Dict]:
+        """前回のウォーターマーク以降の変更のみのプロンプトを生成し、(プロンプト, 統計) を返す
+        
+        ウォーターマークがない場合は完全なプロンプトを返す（stats['mode'] == 'full'）。
+        """
+        watermark = project.get_prompt_watermark()
+        if not watermark:
+            prompt, stats = PromptGenerator.generate_budgeted_prompt(project)
+            stats['mode'] = 'full'
+            stats['since'] = None
+            return prompt, stats
+        
+        snapshot = watermark.get('snapshot', {})
+        since = watermark.get('timestamp', '')
+        stats = {'mode': 'delta', 'since': since, 'issues_new': [], 'issues_updated': []}
+        
+        project_info, info_tokens = PromptSectionCache.get_section(
+            project, 'project_info', PromptGenerator._generate_project_info
+        )
+        
+        builder = PromptBuilder()
+        builder.add(DELTA_PROMPT_HEADER)
+        builder.add(
+            f"前回のプロンプト（{since[:16].replace('T', ' ')}）以降の変更のみを記載しています。"
+            "それ以前の経緯は前回のプロンプトを参照してください。\n\n"
+        )
+        builder.add_section(project_info, info_tokens)
+        builder.add_section(PromptGenerator._generate_state_summary(project))
+        builder.add_section(PromptGenerator._generate_issue_delta(project, snapshot.get('issues', {}), stats))
+        
+        for attr, label in DELTA_RECORD_SECTIONS:
+            section, count = PromptGenerator._generate_record_delta(project, attr, label, snapshot.get(attr, {}))
+            stats[attr] = count
+            builder.add_section(section)
+        
+        builder.add(DELTA_PROMPT_FOOTER)
+        
+        stats['tokens'] = builder.tokens
+        stats['changed'] = (len(stats['issues_new']) + len(stats['issues_updated'])
+                            + sum(stats[attr] for attr, _ in DELTA_RECORD_SECTIONS))
+        return builder.build(), stats
+    
+    @staticmethod
+    def _generate_state_summary(project):
+        """差分プロンプト用に現在の状態を要約"""
+        unresolved = project.get_unresolved_issues()
+        recurrent = project.get_recurrent_issues()
+        request_counts = {}
+        for request in project.code_requests:
+            request_counts[request['status']] = request_counts.get(request['status'], 0) + 1
+        request_text = '・'.join(f"{status} {count}件" for status, count in request_counts.items()) or 'なし'
+        ng_tests = sum(1 for test in project.test_results if test.get('result') == 'NG')
+        
+        parts = [
+            "## 現在の状況（要約）\n",
+            f"- 問題: 全{len(project.issues)}件（未解決 {len(unresolved)}件・再発あり {len(recurrent)}件）\n",
+            f"- コード依頼: {request_text}\n",
+            f"- テスト結果: 全{len(project.test_results)}件（NG {ng_tests}件）\n",
+            f"- バグ: 全{len(project.bugs)}件（未解決 {project.get_unresolved_bugs_count()}件）\n"
+        ]
+        if unresolved:
+            parts.append("- 未解決の問題: " + ", ".join(f"{i.issue_id} {i.title}" for i in unresolved) + "\n")
+        return "".join(parts)
+    
+    @staticmethod
+    def _generate_issue_delta(project, known_issues: Dict[str, int], stats: Dict):
+        """前回以降に追加・更新された問題のセクションを生成"""
+        parts = ["## 前回以降の問題の変化\n\n"]
+        
+        for issue in project.issues:
+            known_count = known_issues.get(issue.issue_id)
+            if known_count is None:
+                stats['issues_new'].append(issue.issue_id)
+                block, _ = PromptSectionCache.get_issue_block(issue, 'full', PromptGenerator._render_issue_full)
+                parts.append(block.replace("### ", "### 🆕 ", 1))
+            elif len(issue.history) > known_count:
+                stats['issues_updated'].append(issue.issue_id)
+                recurrence_mark = f" ⚠️ 再発{issue.recurrence_count}回" if issue.recurrence_count > 0 else ""
+                status_mark = "🔴" if issue.is_unresolved() else "✅"
+                parts.append(f"### {status_mark} {issue.issue_id}: {issue.title}{recurrence_mark}\n")
+                parts.append(f"- 現在のステータス: {issue.current_status}\n")
+                parts.append("- 前回以降の履歴:\n")
+                for h in issue.history[known_count:]:
+                    date = h.timestamp[:16].replace('T', ' ')
+                    resolution_text = f" - 解決策: {h.resolution}" if h.resolution else ""
+                    parts.append(f"  - {date} [{h.status}] {h.notes}{resolution_text}\n")
+                parts.append("\n")
+        
+        if len(parts) == 1:
+            parts.append("（変更なし）")
+        return "".join(parts).rstrip("\n")
+    
+    @staticmethod
+    def _format_delta_record(attr: str, record: Dict) -> str:
+        """差分レコードを1行にまとめる"""
+        if attr == 'code_requests':
+            related_issues = record.get('related_issues', [])
+            related = f" (関連問題: {', '.join(related_issues)})" if related_issues else ""
+            return f"#{record.get('id')} {record.get('function_name', '')}（{record.get('status', '')}）{related}"
+        if attr == 'test_results':
+            notes = f" - {record['notes']}" if record.get('notes') else ""
+            return f"{record.get('function_name', '')}: {record.get('result', '')}{notes}"
+        return f"#{record.get('id')} {record.get('title', '')}（重要度 {record.get('severity', '')} / {record.get('status', '')}）"
+    
+    @staticmethod
+    def _generate_record_delta(project, attr: str, label: str, known: Dict[str, str]) -> Tuple[str, int]:
+        """前回以降に追加・変更されたレコードのセクションを生成"""
+        lines = []
+        for record in getattr(project, attr):
+            previous = known.get(str(record.get('id')))
+            if previous is None:
+                lines.append(f"- [新規] {PromptGenerator._format_delta_record(attr, record)}\n")
+            elif previous != _fingerprint(record):
+                lines.append(f"- [更新] {PromptGenerator._format_delta_record(attr, record)}\n")
+        
+        body = "".join(lines).rstrip("\n") if lines else "（変更なし）"
+        return f"## 前回以降の{label}\n\n{body}", len(lines)
+    
+    @staticmethod
+    def _generate_footer():
+        """依頼・JSONスキーマ部分を返す"""
+        return PROMPT_FOOTER
+    
     @staticmethod
     def _generate_project_info(project):
         """プロジェクト情報セクションを生成"""
@@ -39,39 +349,110 @@ class PromptGenerator:
         features_str = ', '.join(main_features) if main_features else '未設定'
         import_date = project.import_info.get('import_date', '未設定')[:10]
         
-        info = "## プロジェクト情報\n"
-        info += f"- プロジェクトID: {project.project_id}\n"
-        info += f"- プロジェクト名: {project.project_name}\n"
-        info += f"- Phase 1主要機能: {features_str}\n"
-        info += f"- Phase 2インポート日: {import_date}\n"
-        
-        return info
+        return "".join([
+            "## プロジェクト情報\n",
+            f"- プロジェクトID: {project.project_id}\n",
+            f"- プロジェクト名: {project.project_name}\n",
+            f"- Phase 1主要機能: {features_str}\n",
+            f"- Phase 2インポート日: {import_date}\n"
+        ])
     
     @staticmethod
     def _generate_issue_history(project):
         """問題履歴セクションを生成"""
+        history_text, _ = PromptGenerator._generate_issue_section(project, None)
+        return history_text
+    
+    @staticmethod
+    def _render_issue_full(issue: Issue) -> str:
+        """問題ブロックを全履歴付きで生成"""
+        recurrence_mark = f" ⚠️ 再発{issue.recurrence_count}回" if issue.recurrence_count > 0 else ""
+        status_mark = "🔴" if issue.is_unresolved() else "✅"
+        
+        parts = [
+            f"### {status_mark} {issue.issue_id}: {issue.title}{recurrence_mark}\n",
+            f"- 影響範囲: {issue.impact}\n",
+            f"- 現在のステータス: {issue.current_status}\n",
+            "- 履歴:\n"
+        ]
+        
+        for h in issue.history:
+            date = h.timestamp[:16].replace('T', ' ')
+            resolution_text = f" - 解決策: {h.resolution}" if h.resolution else ""
+            parts.append(f"  - {date} [{h.status}] {h.notes}{resolution_text}\n")
+        
+        parts.append("\n")
+        return "".join(parts)
+    
+    @staticmethod
+    def _render_issue_summary(issue: Issue) -> str:
+        """解決済みの問題を1ブロックに要約"""
+        resolution = next((h.resolution for h in reversed(issue.history) if h.resolution), '')
+        resolution_text = f" - 解決策: {resolution}" if resolution else ""
+        return (
+            f"### ✅ {issue.issue_id}: {issue.title}\n"
+            f"- {issue.current_status}（履歴{len(issue.history)}件・最終更新 {issue.last_updated[:10]}）{resolution_text}\n\n"
+        )
+    
+    @staticmethod
+    def _generate_issue_section(project, issue_budget: Optional[int]) -> Tuple[str, Dict]:
+        """問題履歴セクションを予算内で生成し、(セクション, 統計) を返す"""
+        stats = {'issues_full': 0, 'issues_summarized': [], 'issues_elided': []}
+        
         if not project.issues:
-            return "## これまでの問題履歴\n\n（まだ問題は記録されていません）"
+            text = "## これまでの問題履歴\n\n（まだ問題は記録されていません）"
+            stats['section_tokens'] = estimate_tokens(text)
+            return text, stats
         
-        history_text = "## これまでの問題履歴（全て）\n\n"
+        rendered = [
+            PromptSectionCache.get_issue_block(issue, 'full', PromptGenerator._render_issue_full)
+            for issue in project.issues
+        ]
+        blocks = [text for text, _ in rendered]
+        tokens = [count for _, count in rendered]
+        levels = ['full'] * len(blocks)
         
-        for issue in project.issues:
-            recurrence_mark = f" ⚠️ 再発{issue.recurrence_count}回" if issue.recurrence_count > 0 else ""
-            status_mark = "🔴" if issue.is_unresolved() else "✅"
-            
-            history_text += f"### {status_mark} {issue.issue_id}: {issue.title}{recurrence_mark}\n"
-            history_text += f"- 影響範囲: {issue.impact}\n"
-            history_text += f"- 現在のステータス: {issue.current_status}\n"
-            history_text += "- 履歴:\n"
+        if issue_budget is not None and sum(tokens) > issue_budget:
+            # 要約・省略の対象は解決済みかつ再発なしの問題のみ（古い順）
+            candidates = sorted(
+                (i for i, issue in enumerate(project.issues)
+                 if not issue.is_unresolved() and issue.recurrence_count == 0),
+                key=lambda i: project.issues[i].last_updated
+            )
+            total = sum(tokens)
             
-            for h in issue.history:
-                date = h.timestamp[:16].replace('T', ' ')
-                resolution_text = f" - 解決策: {h.resolution}" if h.resolution else ""
-                history_text += f"  - {date} [{h.status}] {h.notes}{resolution_text}\n"
+            for i in candidates:
+                if total <= issue_budget:
+                    break
+                summary, summary_tokens = PromptSectionCache.get_issue_block(
+                    project.issues[i], 'summary', PromptGenerator._render_issue_summary
+                )
+                total += summary_tokens - tokens[i]
+                blocks[i], tokens[i], levels[i] = summary, summary_tokens, 'summary'
             
-            history_text += "\n"
+            for i in candidates:
+                if total <= issue_budget:
+                    break
+                # 省略した問題はIDのみ末尾に列挙する（1件あたり約3トークン）
+                total -= tokens[i] - 3
+                blocks[i], tokens[i], levels[i] = '', 0, 'elided'
         
-        return history_text
+        for issue, level in zip(project.issues, levels):
+            if level == 'full':
+                stats['issues_full'] += 1
+            elif level == 'summary':
+                stats['issues_summarized'].append(issue.issue_id)
+            else:
+                stats['issues_elided'].append(issue.issue_id)
+        
+        degraded = stats['issues_summarized'] or stats['issues_elided']
+        head = "## これまでの問題履歴（一部要約）\n\n" if degraded else "## これまでの問題履歴（全て）\n\n"
+        if degraded:
+            head += "（トークン予算に合わせて古い解決済みの問題を要約・省略しています。未解決・再発中の問題は全履歴を記載しています）\n\n"
+        tail = f"（省略した解決済みの問題: {', '.join(stats['issues_elided'])}）\n" if stats['issues_elided'] else ""
+        
+        stats['section_tokens'] = estimate_tokens(head) + sum(tokens) + estimate_tokens(tail)
+        return "".join([head, *blocks, tail]), stats
     
     @staticmethod
     def _generate_request_status(project):
@@ -79,70 +460,25 @@ class PromptGenerator:
         if not project.code_requests:
             return "## 現在のコード依頼状況\n\n（まだコード依頼はありません）"
         
-        status_text = "## 現在のコード依頼状況\n\n"
-        
         pending = [r for r in project.code_requests if r['status'] == '依頼中']
         received = [r for r in project.code_requests if r['status'] == '受領済み']
         
-        status_text += f"- 依頼中: {len(pending)}件\n"
-        status_text += f"- 受領済み: {len(received)}件\n\n"
+        parts = [
+            "## 現在のコード依頼状況\n\n",
+            f"- 依頼中: {len(pending)}件\n",
+            f"- 受領済み: {len(received)}件\n\n"
+        ]
         
         if pending:
-            status_text += "### 未受領の依頼\n"
+            parts.append("### 未受領の依頼\n")
             for req in pending:
                 related_issues = req.get('related_issues', [])
                 related = f" (関連問題: {', '.join(related_issues)})" if related_issues else ""
-                status_text += f"- {req['function_name']}{related}\n"
+                parts.append(f"- {req['function_name']}{related}\n")
         
-        return status_text
+        return "".join(parts)
     
     @staticmethod
     def _get_json_schema():
         """JSONスキーマを返す"""
-        schema = '{\n'
-        schema += '  "issue_updates": [\n'
-        schema += '    {\n'
-        schema += '      "issue_id": "ISS001 または null（新規の場合）",\n'
-        schema += '      "action": "update または create",\n'
-        schema += '      "title": "問題タイトル（新規の場合のみ）",\n'
-        schema += '      "description": "詳細説明（新規の場合のみ）",\n'
-        schema += '      "impact": "低/中/高",\n'
-        schema += '      "new_status": "発見/対応中/解決/再発",\n'
-        schema += '      "notes": "今回の状況説明",\n'
-        schema += '      "resolution": "解決策（解決時のみ）"\n'
-        schema += '    }\n'
-        schema += '  ],\n'
-        schema += '  "code_requests": [\n'
-        schema += '    {\n'
-        schema += '      "function_name": "機能名",\n'
-        schema += '      "details": "詳細な依頼内容",\n'
-        schema += '      "related_issues": ["ISS001", "ISS002"],\n'
-        schema += '      "status": "依頼中"\n'
-        schema += '    }\n'
-        schema += '  ],\n'
-        schema += '  "deployed_files": [\n'
-        schema += '    {\n'
-        schema += '      "filename": "ファイル名",\n'
-        schema += '      "filepath": "配置パス",\n'
-        schema += '      "status": "OK/NG/未確認",\n'
-        schema += '      "notes": "備考"\n'
-        schema += '    }\n'
-        schema += '  ],\n'
-        schema += '  "test_results": [\n'
-        schema += '    {\n'
-        schema += '      "function_name": "機能名",\n'
-        schema += '      "result": "OK/NG",\n'
-        schema += '      "notes": "テスト内容"\n'
-        schema += '    }\n'
-        schema += '  ],\n'
-        schema += '  "bugs": [\n'
-        schema += '    {\n'
-        schema += '      "title": "バグタイトル",\n'
-        schema += '      "description": "詳細",\n'
-        schema += '      "severity": "低/中/高/致命的",\n'
-        schema += '      "status": "未対応"\n'
-        schema += '    }\n'
-        schema += '  ]\n'
-        schema += '}'
-        
-        return schema
\ No newline at end of file
+        return JSON_SCHEMA
@@ -0,0 +1,256 @@
+"""
+全プロジェクト横断の全文検索インデックス（問題・履歴・コード依頼・バグ）
+"""
+import bisect
+import heapq
+import math
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.perf import timed
+from utils.text_tokenizer import normalize, tokenize
+
+# 文書の種別
+DOC_ISSUE = 'issue'
+DOC_HISTORY = 'history'
+DOC_REQUEST = 'request'
+DOC_BUG = 'bug'
+
+DOC_LABELS = {
+    DOC_ISSUE: '問題',
+    DOC_HISTORY: '問題履歴',
+    DOC_REQUEST: 'コード依頼',
+    DOC_BUG: 'バグ'
+}
+
+# 日本語を分割する文字 n-gram の長さ
+NGRAM_SIZE = 2
+
+# 検索結果の抜粋でヒット箇所の前後に残す文字数
+SNIPPET_CONTEXT = 30
+
+
+def _join(*parts) -> str:
+    return '\n'.join(str(part) for part in parts if part)
+
+
+class SearchIndex:
+    """文字 n-gram の転置インデックス
+
+    文書は (プロジェクトID, 種別, 参照) をキーに管理する。update_project は
+    プロジェクトの全文書のテキストを前回と比べ、変わった文書だけをトークン化し直すため、
+    1件の追加・編集ではその文書分のコストしかかからない。sync はリビジョンが
+    進んだプロジェクトだけを更新する。
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.docs: Dict[int, Dict] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self.doc_ids: Dict[Tuple, int] = {}
+        # プロジェクトID -> {文書キー: テキスト}
+        self.project_texts: Dict[str, Dict[Tuple, str]] = {}
+        # プロジェクトID -> (プロジェクトへの弱参照, 索引済みのリビジョン)
+        self.revisions: Dict[str, Tuple[weakref.ref, int]] = {}
+        self._next_id = 0
+        # 前方一致・部分一致の展開用に整列した語彙（語が増減したら作り直す）
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def project_documents(project) -> Dict[Tuple, Dict]:
+        """プロジェクトの検索対象文書（キー -> 文書）"""
+        pid = project.project_id
+        documents = {}
+        for issue in project.issues:
+            documents[(pid, DOC_ISSUE, issue.issue_id)] = {
+                'kind': DOC_ISSUE,
+                'ref': issue.issue_id,
+                'title': issue.title,
+                'text': _join(issue.title, issue.description)
+            }
+            for index, history in enumerate(issue.history):
+                text = _join(history.notes, history.resolution)
+                if text:
+                    documents[(pid, DOC_HISTORY, issue.issue_id, index)] = {
+                        'kind': DOC_HISTORY,
+                        'ref': issue.issue_id,
+                        'title': f"{issue.title} [{history.status}] {history.timestamp[:10]}",
+                        'text': text
+                    }
+        for request in project.code_requests:
+            documents[(pid, DOC_REQUEST, request.get('id'))] = {
+                'kind': DOC_REQUEST,
+                'ref': request.get('id'),
+                'title': request.get('function_name', ''),
+                'text': _join(request.get('function_name', ''), request.get('details', ''))
+            }
+        for bug in project.bugs:
+            documents[(pid, DOC_BUG, bug.get('id'))] = {
+                'kind': DOC_BUG,
+                'ref': bug.get('id'),
+                'title': bug.get('title', ''),
+                'text': _join(bug.get('title', ''), bug.get('description', ''))
+            }
+        return documents
+
+    def _add(self, key: Tuple, document: Dict):
+        doc_id = self._next_id
+        self._next_id += 1
+        counts: Dict[str, int] = {}
+        for token in tokenize(document['text'], NGRAM_SIZE):
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                self._vocabulary = None
+            docs[doc_id] = count
+        self.doc_terms[doc_id] = tuple(counts)
+        self.docs[doc_id] = dict(document, project_id=key[0])
+        self.doc_ids[key] = doc_id
+
+    def _remove(self, key: Tuple):
+        doc_id = self.doc_ids.pop(key)
+        for token in self.doc_terms.pop(doc_id):
+            docs = self.postings[token]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[token]
+                self._vocabulary = None
+        del self.docs[doc_id]
+
+    @timed('search_index.update_project')
+    def update_project(self, project) -> Dict[str, int]:
+        """プロジェクトの文書を差分更新し、追加・更新・削除した文書数を返す"""
+        documents = self.project_documents(project)
+        previous = self.project_texts.get(project.project_id, {})
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+
+        for key in previous.keys() - documents.keys():
+            self._remove(key)
+            stats['removed'] += 1
+        for key, document in documents.items():
+            old_text = previous.get(key)
+            if old_text is None:
+                self._add(key, document)
+                stats['added'] += 1
+            elif old_text != document['text']:
+                self._remove(key)
+                self._add(key, document)
+                stats['updated'] += 1
+            else:
+                # 本文が同じでも表示用のタイトル（ステータス等）は最新にする
+                self.docs[self.doc_ids[key]]['title'] = document['title']
+
+        self.project_texts[project.project_id] = {key: d['text'] for key, d in documents.items()}
+        self.revisions[project.project_id] = (weakref.ref(project), project.revision)
+        return stats
+
+    def remove_project(self, project_id: str):
+        """プロジェクトの文書をすべて削除"""
+        for key in self.project_texts.pop(project_id, {}):
+            self._remove(key)
+        self.revisions.pop(project_id, None)
+
+    @timed('search_index.sync')
+    def sync(self, projects: Iterable) -> int:
+        """前回から変更された（リビジョンが進んだ・差し替えられた）プロジェクトだけを更新"""
+        projects = list(projects)
+        updated = 0
+        for project in projects:
+            indexed = self.revisions.get(project.project_id)
+            if indexed is None or indexed[0]() is not project or indexed[1] != project.revision:
+                self.update_project(project)
+                updated += 1
+        current = {p.project_id for p in projects}
+        for project_id in [pid for pid in self.project_texts if pid not in current]:
+            self.remove_project(project_id)
+        return updated
+
+    @staticmethod
+    def snippet(text: str, query: str, width: int = SNIPPET_CONTEXT) -> str:
+        """ヒット箇所の前後を切り出した1行の抜粋"""
+        normalized = normalize(text)
+        # 正規化で文字数が変わった場合は位置がずれるため、正規化後のテキストから切り出す
+        source = text if len(normalized) == len(text) else normalized
+        needle = normalize(query).strip()
+        position = max(normalized.find(needle), 0) if needle else 0
+        start = max(0, position - width)
+        end = min(len(source), position + len(needle) + width)
+        excerpt = source[start:end].replace('\n', ' ')
+        return ('…' if start > 0 else '') + excerpt + ('…' if end < len(source) else '')
+
+    def vocabulary(self) -> List[str]:
+        """整列した語彙"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    def expand(self, token: str) -> Dict[int, int]:
+        """クエリトークンに一致する文書と出現回数
+
+        英数字は前方一致（"type" で "typeerror" も拾う）、n 文字未満の日本語は
+        その文字を含む n-gram すべてに展開する。
+        """
+        if not token.isascii() and (token in self.postings or len(token) >= NGRAM_SIZE):
+            return self.postings.get(token, {})
+        vocabulary = self.vocabulary()
+        if token.isascii():
+            start = bisect.bisect_left(vocabulary, token)
+            end = bisect.bisect_left(vocabulary, token + '\uffff', start)
+            terms = vocabulary[start:end]
+        else:
+            terms = [term for term in vocabulary if token in term]
+        if len(terms) == 1:
+            return self.postings[terms[0]]
+        merged: Dict[int, int] = {}
+        for term in terms:
+            for doc_id, count in self.postings[term].items():
+                merged[doc_id] = merged.get(doc_id, 0) + count
+        return merged
+
+    @timed('search_index.search')
+    def search(self, query: str, limit: int = 50, kinds: Optional[Iterable[str]] = None,
+               project_id: Optional[str] = None) -> List[Dict]:
+        """クエリの全トークンを含む文書をスコア順に返す
+
+        スコアは各トークンの出現回数 × log(1 + 文書数 / 出現文書数) の合計。
+        """
+        matches = [self.expand(token) for token in set(tokenize(query, NGRAM_SIZE))]
+        if not matches or not all(matches):
+            return []
+
+        matches.sort(key=len)
+        candidates = set(matches[0])
+        for docs in matches[1:]:
+            candidates.intersection_update(docs)
+            if not candidates:
+                return []
+
+        if kinds is not None or project_id is not None:
+            kinds = set(kinds) if kinds is not None else None
+            candidates = {
+                doc_id for doc_id in candidates
+                if (kinds is None or self.docs[doc_id]['kind'] in kinds)
+                and (project_id is None or self.docs[doc_id]['project_id'] == project_id)
+            }
+
+        total = len(self.docs)
+        weights = [(docs, math.log(1 + total / len(docs))) for docs in matches]
+        scores = {doc_id: sum(docs[doc_id] * idf for docs, idf in weights) for doc_id in candidates}
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        results = []
+        for doc_id, score in top:
+            document = self.docs[doc_id]
+            results.append({
+                'project_id': document['project_id'],
+                'kind': document['kind'],
+                'ref': document['ref'],
+                'title': document['title'],
+                'snippet': self.snippet(document['text'], query),
+                'score': round(score, 3)
+            })
+        return results
@@ -0,0 +1,63 @@
+"""
+起動時間トレースユーティリティ
+"""
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+class StartupTrace:
+    """起動処理の各段階の経過時間を記録するクラス
+
+    main.py の最初に読み込まれた時点を起点とし、mark() された段階ごとの
+    経過ミリ秒を保持する。全段階が揃ったら logs/startup_trace.log に
+    1行1レコードのJSONとして追記し、回帰の追跡に使う。
+    """
+
+    _origin = time.perf_counter()
+    _marks: List[Tuple[str, float]] = []
+    _written = False
+
+    @classmethod
+    def mark(cls, name: str):
+        """段階を記録（同名の段階は最初の1回のみ）"""
+        if any(n == name for n, _ in cls._marks):
+            return
+        cls._marks.append((name, (time.perf_counter() - cls._origin) * 1000))
+
+    @classmethod
+    def has_mark(cls, name: str) -> bool:
+        """段階が記録済みかどうか"""
+        return any(n == name for n, _ in cls._marks)
+
+    @classmethod
+    def get_marks(cls) -> Dict[str, float]:
+        """段階名と起点からの経過ミリ秒を取得"""
+        return {name: round(elapsed, 1) for name, elapsed in cls._marks}
+
+    @classmethod
+    def summary(cls) -> str:
+        """ステータスバー表示用の要約を取得"""
+        return " / ".join(f"{name}: {elapsed:.0f}ms" for name, elapsed in cls._marks)
+
+    @classmethod
+    def write(cls, log_file: str = 'logs/startup_trace.log'):
+        """トレースをログファイルに追記（1回のみ）"""
+        if cls._written:
+            return
+        cls._written = True
+
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'marks_ms': cls.get_marks()
+        }
+
+        try:
+            log_path = Path(log_file)
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            # トレースの書き込み失敗で起動を妨げない
+            pass
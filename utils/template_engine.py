@@ -0,0 +1,65 @@
+"""
+テンプレートエンジン（外部テンプレートファイルの読み込み・コンパイル・キャッシュ）
+"""
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# リポジトリ直下の templates/ ディレクトリ
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+# {{ name }} 形式のプレースホルダー（制御構文は持たず、値は事前に計算して渡す）
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+
+class CompiledTemplate:
+    """プレースホルダー位置を解析済みのテンプレート
+
+    ソースを「リテラル, 変数名, リテラル, 変数名, ..., リテラル」に分割して
+    保持するため、描画は変数の差し込みと1回の結合だけで済む。
+    """
+
+    def __init__(self, source: str, name: str = ''):
+        self.name = name
+        self.pieces: List[str] = PLACEHOLDER_PATTERN.split(source)
+        self.fields: List[str] = self.pieces[1::2]
+
+    def render(self, context: Dict) -> str:
+        """文脈の値を差し込んで文字列を生成"""
+        parts = self.pieces[:]
+        for i in range(1, len(parts), 2):
+            try:
+                parts[i] = str(context[parts[i]])
+            except KeyError:
+                raise KeyError(f"テンプレート '{self.name}' の変数 '{parts[i]}' が指定されていません") from None
+        return "".join(parts)
+
+
+class TemplateEngine:
+    """テンプレートファイルを1回だけコンパイルしてキャッシュするクラス"""
+
+    _cache: Dict[Path, CompiledTemplate] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str, template_dir: Optional[Path] = None) -> CompiledTemplate:
+        """コンパイル済みテンプレートを取得（例: 'implementation/mvp.md'）"""
+        path = Path(template_dir or TEMPLATE_DIR) / name
+        template = cls._cache.get(path)
+        if template is None:
+            template = CompiledTemplate(path.read_text(encoding='utf-8'), name)
+            with cls._lock:
+                cls._cache[path] = template
+        return template
+
+    @classmethod
+    def render(cls, name: str, context: Dict, template_dir: Optional[Path] = None) -> str:
+        """テンプレートを描画"""
+        return cls.get(name, template_dir).render(context)
+
+    @classmethod
+    def clear_cache(cls):
+        """キャッシュを破棄（テンプレート編集後の再読み込み用）"""
+        with cls._lock:
+            cls._cache.clear()
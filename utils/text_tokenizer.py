@@ -0,0 +1,36 @@
+"""
+検索・類似度計算用のテキスト分割ユーティリティ
+"""
+import re
+import unicodedata
+from typing import List
+
+# ASCII の英数字の連続と、それ以外の文字（日本語など）の連続を別々に切り出す
+TOKEN_PATTERN = re.compile(r'[0-9a-z_]+|[^\W0-9a-z_]+')
+
+
+def normalize(text: str) -> str:
+    """全角英数字などを NFKC で正規化し小文字化"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """文字 n-gram に分割（n 文字未満ならそのまま1つ返す）"""
+    if len(text) <= n:
+        return [text]
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def tokenize(text: str, n: int = 2) -> List[str]:
+    """テキストを検索用トークンに分割
+
+    英数字は単語単位、分かち書きのない日本語は文字 n-gram（既定はバイグラム）にする。
+    形態素解析器に依存しないため、辞書にない固有名詞も部分一致で拾える。
+    """
+    tokens = []
+    for chunk in TOKEN_PATTERN.findall(normalize(text)):
+        if chunk.isascii():
+            tokens.append(chunk)
+        else:
+            tokens.extend(char_ngrams(chunk, n))
+    return tokens
@@ -2,7 +2,14 @@
 バリデーションユーティリティ
 """
 import hashlib
-from typing import Dict, List, Tuple
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# json.dumps(sort_keys=True, ensure_ascii=False) と同じ出力の正規化 JSON エンコーダー
+CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, ensure_ascii=False)
+
+# 正規化 JSON を何階層目まで分割して出力するか（それより深い値は C 実装で一括エンコード）
+CANONICAL_STREAM_DEPTH = 2
 
 class Validators:
     """データ検証を行うクラス"""
@@ -18,6 +25,61 @@ class Validators:
         actual_checksum = Validators.calculate_checksum(data)
         return actual_checksum == expected_checksum
     
+    @staticmethod
+    def canonical_json(value) -> str:
+        """値の正規化 JSON（キー順ソート・非 ASCII はそのまま）"""
+        return CANONICAL_ENCODER.encode(value)
+    
+    @staticmethod
+    def iter_canonical_json(value, depth: int = CANONICAL_STREAM_DEPTH,
+                            exclude: Iterable[str] = ()) -> Iterator[str]:
+        """正規化 JSON を文字列片で生成（連結すると canonical_json と同じ）
+        
+        depth 階層目までの dict / list は要素ごとに分割し、それより深い値は
+        C 実装のエンコーダーで一括変換するため、文書全体の文字列は作らない。
+        exclude に指定した最上位のキーは出力しない（辞書を複製せずにチェックサム欄を除外できる）。
+        """
+        if isinstance(value, dict) and depth > 0 and all(isinstance(key, str) for key in value):
+            excluded = set(exclude)
+            items = [(key, value[key]) for key in sorted(value) if key not in excluded]
+            if not items:
+                yield '{}'
+                return
+            separator = '{'
+            for key, item in items:
+                yield separator + CANONICAL_ENCODER.encode(key) + ': '
+                yield from Validators.iter_canonical_json(item, depth - 1)
+                separator = ', '
+            yield '}'
+        elif isinstance(value, (list, tuple)) and depth > 0:
+            if not value:
+                yield '[]'
+                return
+            separator = '['
+            for item in value:
+                yield separator
+                yield from Validators.iter_canonical_json(item, depth - 1)
+                separator = ', '
+            yield ']'
+        else:
+            yield CANONICAL_ENCODER.encode(value)
+    
+    @staticmethod
+    def calculate_data_checksum(data, exclude: Iterable[str] = (), depth: int = CANONICAL_STREAM_DEPTH) -> str:
+        """正規化 JSON を逐次 SHA-256 に流し込んでチェックサムを計算
+        
+        calculate_checksum(json.dumps(data, sort_keys=True, ensure_ascii=False)) と同じ値になる。
+        """
+        digest = hashlib.sha256()
+        for chunk in Validators.iter_canonical_json(data, depth, exclude):
+            digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def verify_data_checksum(data: Dict, expected_checksum: str, exclude: Iterable[str] = ('checksum',)) -> bool:
+        """チェックサム欄を除いたデータのチェックサムを検証"""
+        return Validators.calculate_data_checksum(data, exclude) == expected_checksum
+    
     @staticmethod
     def validate_phase2_export(data: Dict) -> Tuple[bool, List[str]]:
         """Phase 2エクスポートファイルを検証"""